@@ -1,12 +1,17 @@
 import streamlit as st
-import pickle
 import os
-import re
-import nltk
-from nltk.corpus import stopwords
-from lime.lime_text import LimeTextExplainer
+import sys
 import streamlit.components.v1 as components
 
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from model_assets import find_models_dir, load_model_and_vectorizer, assets_fingerprint
+from compiled_model import compile_verified
+from text_preprocessing import preprocess_text
+from explain import explain, DEFAULT_LIME_SAMPLES
+from prediction_cache import PredictionCache, make_key, DEFAULT_MAX_ENTRIES, DEFAULT_DISK_MAX_ENTRIES, DISK_CACHE_FILENAME
+from model_registry import ModelRegistry
+import profiling
+
 # --- 1. Page Config (Must be first) ---
 st.set_page_config(
     page_title="Suicidal Ideation Detector",
@@ -57,89 +62,23 @@ st.markdown("""
 </style>
 """, unsafe_allow_html=True)
 
-# --- 3. Setup & Preprocessing ---
-@st.cache_resource
-def download_nltk_data():
-    """Download required NLTK data"""
-    try:
-        nltk.data.find('corpora/stopwords')
-    except LookupError:
-        nltk.download('stopwords')
-
-download_nltk_data()
-
-def preprocess_text(text):
-    """
-    Preprocessing pipeline matching training data.
-    Essential for consistent predictions.
-    """
-    if not isinstance(text, str):
-        return ""
-
-    # Lowercasing
-    text = text.lower()
-
-    # URL removal
-    text = re.sub(r'http\S+|www\S+|https\S+', '', text, flags=re.MULTILINE)
-
-    # Reddit-specific cleanup
-    text = re.sub(r'u/\S+', 'USER', text)
-    text = re.sub(r'r/\S+', 'SUBREDDIT', text)
-
-    # Remove special characters/numbers
-    text = re.sub(r'[^a-zA-Z\s]', '', text)
-
-    # Stopword removal with negation preservation
-    stop_words = set(stopwords.words('english'))
-    negations = {'no', 'not', 'nor', 'neither', 'never', "don't", "won't", "can't", "cannot"}
-    final_stop_words = stop_words - negations
-
-    words = text.split()
-    filtered_words = [w for w in words if w not in final_stop_words]
-
-    return " ".join(filtered_words)
-
-# --- 4. Load ML Assets ---
+# --- 3. Load ML Assets ---
 @st.cache_resource
 def load_assets():
     """Load trained model and vectorizer"""
     current_dir = os.path.dirname(os.path.abspath(__file__))
-
-    # Search for models directory
-    possible_paths = [
-        os.path.join(current_dir, 'models'),
-        os.path.join(current_dir, '..', 'models'),
-        os.path.join(current_dir, '..', '..', 'models'),
-    ]
-
-    models_dir = None
-    for path in possible_paths:
-        if os.path.isdir(path):
-            models_dir = path
-            break
+    models_dir = find_models_dir(current_dir)
 
     if models_dir is None:
         st.error(f"❌ Critical Error: Could not find 'models' directory.")
-        st.info(f"Searched: {possible_paths}")
-        return None, None
-
-    model_path = os.path.join(models_dir, 'lr_model.pkl')
-    vec_path = os.path.join(models_dir, 'tfidf_vectorizer.pkl')
-
-    if not os.path.exists(model_path):
-        st.error(f"❌ Model file missing: {model_path}")
-        return None, None
-
-    if not os.path.exists(vec_path):
-        st.error(f"❌ Vectorizer file missing: {vec_path}")
+        st.info(f"Searched relative to: {current_dir}")
         return None, None
 
     try:
-        with open(model_path, 'rb') as f:
-            model = pickle.load(f)
-        with open(vec_path, 'rb') as f:
-            vectorizer = pickle.load(f)
-        return model, vectorizer
+        return load_model_and_vectorizer(models_dir)
+    except FileNotFoundError as e:
+        st.error(f"❌ {str(e)}")
+        return None, None
     except Exception as e:
         st.error(f"❌ Error loading models: {str(e)}")
         return None, None
@@ -148,28 +87,91 @@ model, vectorizer = load_assets()
 if model is None or vectorizer is None:
     st.stop()
 
-# --- 5. LIME Explainability Function ---
+@st.cache_resource
+def load_compiled_model():
+    """Single-text scorer folded from model + vectorizer (None if it does not match sklearn)"""
+    return compile_verified(model, vectorizer)
+
+compiled_model = load_compiled_model()
+
+@st.cache_resource
+def load_assets_fingerprint():
+    """Fingerprint of the loaded model files; part of every cache key"""
+    current_dir = os.path.dirname(os.path.abspath(__file__))
+    return assets_fingerprint(find_models_dir(current_dir))
+
+@st.cache_resource
+def get_prediction_cache():
+    """
+    Process-wide prediction/explanation cache. Set SID_CACHE_DIR to add a
+    disk tier shared by all Streamlit worker processes on the host
+    (bounded by SID_CACHE_DISK_SIZE entries).
+    """
+    max_entries = int(os.getenv('SID_CACHE_SIZE', DEFAULT_MAX_ENTRIES))
+    disk_max_entries = int(os.getenv('SID_CACHE_DISK_SIZE', DEFAULT_DISK_MAX_ENTRIES))
+    cache_dir = os.getenv('SID_CACHE_DIR')
+    disk_path = os.path.join(cache_dir, DISK_CACHE_FILENAME) if cache_dir else None
+    return PredictionCache(max_entries=max_entries, disk_path=disk_path, disk_max_entries=disk_max_entries)
+
+@st.cache_resource
+def get_model_registry():
+    """All models in models/, loaded on first use and sharing one TF-IDF transform"""
+    current_dir = os.path.dirname(os.path.abspath(__file__))
+    return ModelRegistry(find_models_dir(current_dir))
+
+@st.cache_resource
+def load_registry_fingerprint():
+    """Fingerprint of every model the comparison table scores; part of its cache key"""
+    return get_model_registry().fingerprint()
+
+ASSETS_FINGERPRINT = load_assets_fingerprint()
+prediction_cache = get_prediction_cache()
+
+def predict_cached(clean_text):
+    """Class probabilities and predicted label for a preprocessed text, via the cache"""
+    def compute():
+        if compiled_model is not None:
+            probs = compiled_model.predict_proba_clean(clean_text)
+            return [float(p) for p in probs], compiled_model.predict_clean(clean_text)
+        vec_text = vectorizer.transform([clean_text])
+        probs = model.predict_proba(vec_text)[0]
+        return [float(p) for p in probs], model.predict(vec_text)[0]
+
+    key = make_key('predict', clean_text, ASSETS_FINGERPRINT)
+    return prediction_cache.get_or_compute(key, compute)
+
+def compare_models_cached(text):
+    """Every registry model's result for a raw text, via the cache"""
+    key = make_key('compare', text, load_registry_fingerprint())
+    return prediction_cache.get_or_compute(key, lambda: get_model_registry().score(text))
+
+# --- 4. Explainability Function ---
+# Perturbation budget for the LIME fallback (non-linear models only)
+LIME_NUM_SAMPLES = int(os.getenv('SID_LIME_SAMPLES', DEFAULT_LIME_SAMPLES))
+
 def explain_prediction(text, model, vectorizer):
-    """Generate LIME explanation for model prediction"""
-    def predict_proba_func(texts):
-        vectors = vectorizer.transform(texts)
-        return model.predict_proba(vectors)
-
-    explainer = LimeTextExplainer(class_names=model.classes_)
-    exp = explainer.explain_instance(
-        text, 
-        predict_proba_func, 
-        num_features=6, 
-        top_labels=1
+    """
+    Explain the model prediction. Linear TF-IDF models get exact per-word
+    contributions from coef_; other models fall back to LIME sampling.
+    """
+    return explain(text, model, vectorizer, num_features=6, num_samples=LIME_NUM_SAMPLES)
+
+def explain_html_cached(text):
+    """
+    Rendered explanation HTML via the cache. Keyed on the raw text, since
+    the highlight view shows the original wording.
+    """
+    key = make_key('explain', text, ASSETS_FINGERPRINT, 6, LIME_NUM_SAMPLES)
+    return prediction_cache.get_or_compute(
+        key, lambda: explain_prediction(text, model, vectorizer).as_html()
     )
-    return exp
 
-# --- 6. UI Header ---
+# --- 5. UI Header ---
 st.title("🧠 Mental Health Text Analysis")
 st.caption("Research Model v1.0 • NLP with Negation Handling")
 st.markdown("---")
 
-# --- 7. Main Interface ---
+# --- 6. Main Interface ---
 st.subheader("Analyze Text for Risk Indicators")
 
 user_input = st.text_area(
@@ -202,21 +204,20 @@ if analyze_clicked:
     else:
         st.warning("⚠️ Please enter some text to analyze.")
 
-# --- 8. Results Display ---
+# --- 7. Results Display ---
 if st.session_state.analyzed and st.session_state.last_input:
 
     text_to_analyze = st.session_state.last_input
 
-    # Preprocess
-    clean_text = preprocess_text(text_to_analyze)
-
-    # Vectorize & Predict
-    vec_text = vectorizer.transform([clean_text])
-    probs = model.predict_proba(vec_text)[0]
+    # Preprocess, Vectorize & Predict (cached across reruns and users)
+    with profiling.stage('app.score', items=1):
+        clean_text = preprocess_text(text_to_analyze)
+        probs, prediction = predict_cached(clean_text)
+    # Long-running server: refresh the report after each request (no-op unless SID_PROFILE is set)
+    profiling.write_report()
     classes = model.classes_
     si_index = list(classes).index('SI')
     risk_score = probs[si_index]
-    prediction = model.predict(vec_text)[0]
 
     # Results section
     st.markdown("---")
@@ -245,38 +246,63 @@ if st.session_state.analyzed and st.session_state.last_input:
             st.success("✅ **Neutral / Low Risk**")
             st.write("Content appears safe with no significant risk indicators.")
 
+    # Side-by-side comparison across every model in models/
+    with st.expander("📊 Compare All Models", expanded=False):
+        rows = []
+        for name, result in compare_models_cached(text_to_analyze).items():
+            if 'error' in result:
+                rows.append({'Model': name, 'Prediction': '—', 'SI Probability': 'n/a (needs engineered features)'})
+            else:
+                si = result['si_probability']
+                rows.append({
+                    'Model': name,
+                    'Prediction': result['predictions'],
+                    'SI Probability': f"{si:.1%}" if si is not None else 'n/a',
+                })
+        st.table(rows)
+
     # Explainability section
     st.markdown("---")
     st.subheader("🔍 Model Explainability")
 
-    with st.expander("ℹ️ What is LIME?", expanded=False):
+    with st.expander("ℹ️ How are explanations computed?", expanded=False):
         st.write("""
-        **LIME** (Local Interpretable Model-agnostic Explanations) shows which words 
+        For the linear TF-IDF model, each word's contribution is computed exactly
+        from the model weights. Other models fall back to **LIME** (Local
+        Interpretable Model-agnostic Explanations). Both show which words
         influenced the AI's decision:
         - 🟩 **Green highlights**: Words supporting the predicted category
         - 🟥 **Red highlights**: Words opposing the prediction
         - Helps understand the "why" behind AI decisions
         """)
 
-    if st.button("🎯 Generate Explanation (LIME)", use_container_width=True):
+    if st.button("🎯 Generate Explanation", use_container_width=True):
         with st.spinner("Calculating word importance..."):
             try:
-                exp = explain_prediction(text_to_analyze, model, vectorizer)
+                exp_html = explain_html_cached(text_to_analyze)
 
-                # Fix LIME HTML for better visibility
-                lime_html = exp.as_html()
-                lime_html = lime_html.replace(
+                # Force a light background for better visibility
+                exp_html = exp_html.replace(
                     "<head>",
                     "<head><style>body{background:#ffffff !important; color:#111111 !important; padding:15px;}</style>"
                 )
 
                 st.write("**Word Importance Visualization:**")
-                components.html(lime_html, height=450, scrolling=True)
+                components.html(exp_html, height=450, scrolling=True)
 
                 st.success("✅ Explanation generated successfully!")
             except Exception as e:
                 st.error(f"❌ Error generating explanation: {str(e)}")
 
+# --- 8. Cache Statistics ---
+with st.sidebar:
+    stats = prediction_cache.stats()
+    st.caption("**Prediction cache**")
+    st.caption(
+        f"Hits: {stats['hits']} (disk: {stats['disk_hits']}) • Misses: {stats['misses']} • "
+        f"Hit rate: {stats['hit_rate']:.0%} • Entries: {stats['entries']}/{stats['max_entries']}"
+    )
+
 # --- 9. Footer ---
 st.markdown("---")
 st.caption("""
@@ -0,0 +1,189 @@
+import os
+import sys
+import json
+import time
+import pickle
+import argparse
+import tempfile
+import contextlib
+import subprocess
+
+SRC_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_SIZES = [10000, 100000, 1000000]
+SCALE_SIZES = [10000, 100000, 1000000, 10000000]
+# Above this many docs the in-memory stages (full TF-IDF fit, LR/SVM fit) are skipped
+DEFAULT_MAX_IN_MEMORY = 1000000
+EXPLAIN_SAMPLE = 200
+
+STAGES = ['load', 'preprocess', 'tfidf_fit', 'lr_fit', 'svm_fit', 'batch_score', 'explain', 'streaming_train']
+
+
+@contextlib.contextmanager
+def _quiet():
+    """Silence the progress output of the scripts being benchmarked"""
+    with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+        yield
+
+
+def run_scenario(corpus_path, n_docs, n_jobs=1, max_in_memory=DEFAULT_MAX_IN_MEMORY, streaming=True):
+    """
+    Time every pipeline stage on one corpus, in this process, using the
+    project's own code paths. Returns {stage: measurements}.
+    """
+    import pandas as pd
+    from sklearn.feature_extraction.text import TfidfVectorizer
+    from sklearn.svm import LinearSVC
+
+    import profiling
+    from text_preprocessing import preprocess_parallel
+    from train_deploy_models import build_model
+    from explain import explain
+    from score import score_file
+    from streaming_train import train_streaming
+    from model_assets import MODEL_FILENAME, VECTORIZER_FILENAME
+    sys.path.append(os.path.join(SRC_DIR, 'data_collection'))
+    from vectorizer_data import VECTORIZER_PARAMS
+
+    profiling.enable(output_dir=tempfile.gettempdir(), run_name=f'benchmark_{n_docs}')
+
+    with tempfile.TemporaryDirectory() as tmp:
+        if n_docs <= max_in_memory:
+            with profiling.stage('load', items=n_docs):
+                df = pd.read_csv(corpus_path)
+            with profiling.stage('preprocess', items=n_docs):
+                clean = preprocess_parallel(df['combined_text'], n_jobs=n_jobs)
+            with profiling.stage('tfidf_fit', items=n_docs):
+                vectorizer = TfidfVectorizer(**VECTORIZER_PARAMS)
+                X = vectorizer.fit_transform(clean)
+
+            train = (df['split'] == 'train').values
+            y = df['prelim_label'].values
+            with profiling.stage('lr_fit', items=int(train.sum())):
+                model = build_model().fit(X[train], y[train])
+            with profiling.stage('svm_fit', items=int(train.sum())):
+                LinearSVC(random_state=42).fit(X[train], y[train])
+
+            for name, obj in ((MODEL_FILENAME, model), (VECTORIZER_FILENAME, vectorizer)):
+                with open(os.path.join(tmp, name), 'wb') as f:
+                    pickle.dump(obj, f)
+            sample = df['combined_text'].head(EXPLAIN_SAMPLE).tolist()
+            del df, clean, X
+
+            with profiling.stage('batch_score', items=n_docs), _quiet():
+                score_file(corpus_path, os.path.join(tmp, 'scored.csv'), n_jobs=n_jobs, models_dir=tmp)
+            with profiling.stage('explain', items=len(sample)):
+                for text in sample:
+                    explain(text, model, vectorizer)
+
+        if streaming:
+            with profiling.stage('streaming_train', items=n_docs), _quiet():
+                train_streaming(corpus_path, epochs=1, spill_dir=tmp)
+
+    results = {}
+    for name, entry in profiling.report()['stages'].items():
+        results[name] = {
+            'seconds': entry['wall_seconds'],
+            'cpu_seconds': entry['cpu_seconds'],
+            'items': entry['items'],
+            'items_per_second': entry['items_per_second'],
+            # Each scenario runs in a fresh process, so this is the high-water mark up to this stage
+            'peak_rss_mb': entry['process_peak_rss_bytes'] / 1e6,
+        }
+    return results
+
+
+def ensure_corpus(work_dir, n_docs, seed):
+    """Generate (once) and return the synthetic corpus for this size"""
+    from synthetic_corpus import generate_corpus
+
+    path = os.path.join(work_dir, f'synthetic_{n_docs}_seed{seed}.csv')
+    if not os.path.exists(path):
+        start = time.perf_counter()
+        generate_corpus(path + '.tmp', n_docs, seed)
+        os.replace(path + '.tmp', path)
+        print(f"   Generated {n_docs:,} posts in {time.perf_counter() - start:.1f}s")
+    return path
+
+
+def run_scale(sizes, work_dir, seed=0, n_jobs=1, max_in_memory=DEFAULT_MAX_IN_MEMORY, streaming=True):
+    """
+    Run each size in a fresh interpreter so peak RSS is per scenario
+    rather than the high-water mark of everything run before it.
+    """
+    os.makedirs(work_dir, exist_ok=True)
+    results = {}
+    for n_docs in sizes:
+        print(f"⏳ Scenario: {n_docs:,} documents")
+        corpus = ensure_corpus(work_dir, n_docs, seed)
+        out_json = os.path.join(work_dir, f'result_{n_docs}.json')
+        cmd = [sys.executable, os.path.abspath(__file__), '--scenario', str(n_docs), '--corpus', corpus,
+               '--result', out_json, '--jobs', str(n_jobs), '--max-in-memory', str(max_in_memory)]
+        if not streaming:
+            cmd.append('--no-streaming')
+        subprocess.run(cmd, check=True, cwd=SRC_DIR)
+        with open(out_json, 'r', encoding='utf-8') as f:
+            results[n_docs] = json.load(f)
+    return results
+
+
+def print_curves(results):
+    sizes = list(results)
+    header = f"   {'stage':<16}" + "".join(f"{n:>14,}" for n in sizes)
+
+    print("\n" + "=" * len(header))
+    print("THROUGHPUT (items/s)")
+    print("=" * len(header))
+    print(header)
+    for stage in STAGES:
+        cells = [results[n].get(stage) for n in sizes]
+        if any(cells):
+            print(f"   {stage:<16}" + "".join(
+                f"{c['items_per_second']:>14,.0f}" if c else f"{'-':>14}" for c in cells))
+
+    print("\n" + "=" * len(header))
+    print("PEAK RSS AFTER STAGE (MB)")
+    print("=" * len(header))
+    print(header)
+    for stage in STAGES:
+        cells = [results[n].get(stage) for n in sizes]
+        if any(cells):
+            print(f"   {stage:<16}" + "".join(
+                f"{c['peak_rss_mb']:>14,.0f}" if c else f"{'-':>14}" for c in cells))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Scaling benchmark over synthetic Reddit-like corpora.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES,
+                        help=f"Corpus sizes to run (full scale: {' '.join(map(str, SCALE_SIZES))}).")
+    parser.add_argument("--work-dir", default=os.path.join(tempfile.gettempdir(), 'sid_benchmark'),
+                        help="Where corpora and per-scenario results are kept.")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--jobs", type=int, default=1, help="Worker processes for preprocessing and scoring.")
+    parser.add_argument("--max-in-memory", type=int, default=DEFAULT_MAX_IN_MEMORY,
+                        help="Skip in-memory stages for corpora larger than this.")
+    parser.add_argument("--no-streaming", action="store_true", help="Skip the out-of-core training stage.")
+    parser.add_argument("--json", default=None, help="Write all results as JSON to this path.")
+    # Internal: run a single scenario in this process
+    parser.add_argument("--scenario", type=int, default=None, help=argparse.SUPPRESS)
+    parser.add_argument("--corpus", default=None, help=argparse.SUPPRESS)
+    parser.add_argument("--result", default=None, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.scenario is not None:
+        results = run_scenario(args.corpus, args.scenario, args.jobs, args.max_in_memory, not args.no_streaming)
+        with open(args.result, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+        return
+
+    results = run_scale(args.sizes, args.work_dir, args.seed, args.jobs, args.max_in_memory,
+                        not args.no_streaming)
+    print_curves(results)
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump({str(n): r for n, r in results.items()}, f, indent=2)
+        print(f"\n💾 Results written to: {args.json}")
+
+
+if __name__ == "__main__":
+    main()
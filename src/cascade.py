@@ -0,0 +1,147 @@
+import time
+import argparse
+
+import numpy as np
+import pandas as pd
+
+from model_assets import load_model_and_vectorizer
+from text_preprocessing import preprocess_batch
+from score import iter_chunks, extract_texts, write_chunk, detect_format, DEFAULT_CHUNK_SIZE
+from transformer_inference import TransformerClassifier, DEFAULT_MAX_LENGTH, DEFAULT_BATCH_SIZE
+
+DEFAULT_BAND = (0.3, 0.7)
+
+
+class CascadeScorer:
+    """
+    Two-tier scorer: the TF-IDF LR scores everything, and only posts whose
+    SI probability falls inside the uncertainty band [low, high] are
+    forwarded (batched) to the transformer. Confident LR calls are kept.
+    """
+
+    def __init__(self, model, vectorizer, transformer, band=DEFAULT_BAND):
+        low, high = band
+        if not 0.0 <= low <= high <= 1.0:
+            raise ValueError(f"Invalid uncertainty band: {band}")
+        self.model = model
+        self.vectorizer = vectorizer
+        self.transformer = transformer
+        self.band = (low, high)
+        self.classes = [str(c) for c in model.classes_]
+        self.si_index = self.classes.index('SI')
+        self.transformer_si_index = list(transformer.classes_).index('SI')
+        self.total = 0
+        self.escalated = 0
+        self.lr_seconds = 0.0
+        self.transformer_seconds = 0.0
+
+    def _merge_prediction(self, lr_probs, transformer_probs):
+        """
+        Final label for an escalated post. A multi-class transformer decides
+        outright; a binary (SAFE/SI) one decides SI vs not, and the LR picks
+        the most likely non-SI class otherwise.
+        """
+        transformer_classes = list(self.transformer.classes_)
+        if len(transformer_classes) > 2:
+            return str(transformer_classes[int(np.argmax(transformer_probs))])
+        if transformer_probs[self.transformer_si_index] >= 0.5:
+            return 'SI'
+        non_si = [i for i in range(len(self.classes)) if i != self.si_index]
+        return self.classes[max(non_si, key=lambda i: lr_probs[i])]
+
+    def score(self, texts):
+        """
+        Score raw texts. Returns (predictions, si_probability, tier) arrays,
+        where tier is 'lr' or 'transformer' for each post.
+        """
+        texts = list(texts)
+
+        start = time.perf_counter()
+        probs = self.model.predict_proba(self.vectorizer.transform(preprocess_batch(texts)))
+        self.lr_seconds += time.perf_counter() - start
+
+        si_probability = probs[:, self.si_index].copy()
+        predictions = np.array([self.classes[i] for i in np.argmax(probs, axis=1)], dtype=object)
+        tier = np.full(len(texts), 'lr', dtype=object)
+
+        low, high = self.band
+        uncertain = np.flatnonzero((si_probability >= low) & (si_probability <= high))
+        if len(uncertain):
+            start = time.perf_counter()
+            transformer_probs = self.transformer.predict_proba([texts[i] for i in uncertain])
+            self.transformer_seconds += time.perf_counter() - start
+
+            for row, i in enumerate(uncertain):
+                si_probability[i] = transformer_probs[row, self.transformer_si_index]
+                predictions[i] = self._merge_prediction(probs[i], transformer_probs[row])
+                tier[i] = 'transformer'
+
+        self.total += len(texts)
+        self.escalated += len(uncertain)
+        return predictions, si_probability, tier
+
+    def stats(self):
+        lr_ms = self.lr_seconds * 1000
+        transformer_ms = self.transformer_seconds * 1000
+        return {
+            'total': self.total,
+            'escalated': self.escalated,
+            'escalation_rate': self.escalated / self.total if self.total else 0.0,
+            'band': list(self.band),
+            'lr_ms_total': round(lr_ms, 2),
+            'lr_ms_per_post': lr_ms / self.total if self.total else 0.0,
+            'transformer_ms_total': round(transformer_ms, 2),
+            'transformer_ms_per_post': transformer_ms / self.escalated if self.escalated else 0.0,
+        }
+
+
+def print_stats(stats):
+    print("\n" + "=" * 60)
+    print("CASCADE SUMMARY")
+    print("=" * 60)
+    print(f"   Posts scored:     {stats['total']:,}")
+    print(f"   Escalated:        {stats['escalated']:,} ({stats['escalation_rate']:.1%}) "
+          f"in band {stats['band'][0]:.2f}-{stats['band'][1]:.2f}")
+    print(f"   LR tier:          {stats['lr_ms_total']:,.1f} ms total, {stats['lr_ms_per_post']:.3f} ms/post")
+    print(f"   Transformer tier: {stats['transformer_ms_total']:,.1f} ms total, "
+          f"{stats['transformer_ms_per_post']:.3f} ms/post")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="LR -> DistilBERT cascade that escalates only uncertain posts.")
+    parser.add_argument("input", help="Input .csv or .jsonl file")
+    parser.add_argument("output", help="Output .csv or .jsonl file")
+    parser.add_argument("--transformer-dir", required=True, help="Directory of the fine-tuned DistilBERT model.")
+    parser.add_argument("--band", type=float, nargs=2, default=list(DEFAULT_BAND), metavar=("LOW", "HIGH"),
+                        help="Escalate posts whose LR SI probability lies in [LOW, HIGH].")
+    parser.add_argument("--text-column", default="combined_text", help="Column holding the raw text.")
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE, help="Rows per LR batch.")
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE, help="Transformer batch size.")
+    parser.add_argument("--max-length", type=int, default=DEFAULT_MAX_LENGTH, help="Transformer max tokens.")
+    parser.add_argument("--threads", type=int, default=None, help="torch intra-op threads for the transformer.")
+    parser.add_argument("--models-dir", default=None, help="Directory holding the LR pickles.")
+    args = parser.parse_args()
+
+    print("⏳ Loading LR model and transformer...")
+    model, vectorizer = load_model_and_vectorizer(args.models_dir)
+    transformer = TransformerClassifier(args.transformer_dir, max_length=args.max_length,
+                                        batch_size=args.batch_size, num_threads=args.threads)
+    cascade = CascadeScorer(model, vectorizer, transformer, band=tuple(args.band))
+
+    out_fmt = detect_format(args.output)
+    first = True
+    for chunk in iter_chunks(args.input, args.chunk_size):
+        predictions, si_probability, tier = cascade.score(extract_texts(chunk, args.text_column))
+        out = pd.DataFrame({'prediction': predictions, 'si_probability': si_probability, 'tier': tier})
+        if 'id' in chunk.columns:
+            out.insert(0, 'id', chunk['id'].values)
+        write_chunk(out, args.output, out_fmt, first)
+        first = False
+        print(f"   Scored {cascade.total:,} posts ({cascade.escalated:,} escalated)...")
+
+    print_stats(cascade.stats())
+    print(f"💾 Predictions written to: {args.output}")
+
+
+if __name__ == "__main__":
+    main()
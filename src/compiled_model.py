@@ -0,0 +1,321 @@
+import os
+import re
+import math
+import time
+import pickle
+import argparse
+from collections import Counter
+
+from model_assets import load_artifact, file_fingerprint, MODEL_FILENAME, VECTORIZER_FILENAME
+from text_preprocessing import preprocess_text
+
+COMPILED_FORMAT = 'sid-compiled-linear'
+COMPILED_VERSION = 1
+DEFAULT_COMPILED_FILENAME = 'lr_model.compiled.pkl'
+# Compiled scores must match sklearn to within float rounding before they are served
+PARITY_TOLERANCE = 1e-9
+PARITY_TEXTS = [
+    "I don't want to live anymore, I have planned everything",
+    "finals week is killing me lol, my college roommate is the worst",
+    "when the meme is so dank you forget to breathe",
+    "I've been feeling really low and anxious for weeks now",
+]
+
+
+def is_ovr(model):
+    """Mirror sklearn's choice between one-vs-rest and multinomial probabilities"""
+    multi_class = getattr(model, 'multi_class', 'auto')
+    if multi_class == 'ovr':
+        return True
+    if multi_class == 'multinomial':
+        return False
+    return getattr(model, 'solver', None) == 'liblinear'
+
+
+def compile_linear_model(model, vectorizer, sources=None):
+    """
+    Fold a fitted TfidfVectorizer + linear classifier into one table:
+    term -> (idf, idf * coef_[0, j], ..., idf * coef_[k, j]).
+    Returns a CompiledLinearModel. Raises ValueError for vectorizer settings
+    the fast path cannot reproduce exactly.
+    """
+    if getattr(vectorizer, 'analyzer', 'word') != 'word':
+        raise ValueError("Only word analyzers can be compiled.")
+    if getattr(vectorizer, 'preprocessor', None) is not None or getattr(vectorizer, 'tokenizer', None) is not None:
+        raise ValueError("Custom preprocessors/tokenizers cannot be compiled.")
+    if getattr(vectorizer, 'stop_words', None) is not None:
+        raise ValueError("Vectorizer stop_words cannot be compiled.")
+    if getattr(vectorizer, 'strip_accents', None) is not None:
+        raise ValueError("strip_accents cannot be compiled.")
+    if not hasattr(model, 'coef_'):
+        raise ValueError("Model has no coef_; only linear models can be compiled.")
+
+    coef = model.coef_
+    if hasattr(coef, 'toarray'):
+        coef = coef.toarray()
+    n_features = coef.shape[1]
+    if n_features != len(vectorizer.vocabulary_):
+        raise ValueError(
+            f"Model expects {n_features} features but vectorizer has {len(vectorizer.vocabulary_)}."
+        )
+
+    use_idf = getattr(vectorizer, 'use_idf', True)
+    idf = vectorizer.idf_ if use_idf else None
+
+    table = {}
+    for term, j in vectorizer.vocabulary_.items():
+        term_idf = float(idf[j]) if use_idf else 1.0
+        table[term] = (term_idf,) + tuple(float(term_idf * c) for c in coef[:, j])
+
+    if not hasattr(model, 'predict_proba'):
+        proba = None
+    elif coef.shape[0] == 1:
+        proba = 'binary'
+    elif is_ovr(model):
+        proba = 'ovr'
+    else:
+        proba = 'multinomial'
+
+    return CompiledLinearModel({
+        'format': COMPILED_FORMAT,
+        'version': COMPILED_VERSION,
+        'classes': [c.item() if hasattr(c, 'item') else c for c in model.classes_],
+        'intercept': [float(b) for b in getattr(model, 'intercept_', [0.0] * coef.shape[0])],
+        'table': table,
+        'token_pattern': vectorizer.token_pattern,
+        'lowercase': vectorizer.lowercase,
+        'ngram_range': tuple(vectorizer.ngram_range),
+        'sublinear_tf': vectorizer.sublinear_tf,
+        'norm': vectorizer.norm,
+        'proba': proba,
+        'sources': sources or {},
+    })
+
+
+def word_ngrams(text, token_re, lowercase, min_n, max_n):
+    """Tokenize and build n-grams exactly like TfidfVectorizer's word analyzer"""
+    if lowercase:
+        text = text.lower()
+    tokens = token_re.findall(text)
+    if max_n == 1:
+        return tokens
+
+    grams = list(tokens) if min_n == 1 else []
+    n_tokens = len(tokens)
+    for n in range(max(min_n, 2), min(max_n, n_tokens) + 1):
+        for i in range(n_tokens - n + 1):
+            grams.append(" ".join(tokens[i:i + n]))
+    return grams
+
+
+def scores_to_proba(scores, proba):
+    """Turn decision scores into probabilities the way the source model would"""
+    if proba is None:
+        raise AttributeError("This model does not support probabilities.")
+
+    if proba == 'binary':
+        p = 1.0 / (1.0 + math.exp(-scores[0]))
+        return [1.0 - p, p]
+
+    if proba == 'ovr':
+        probs = [1.0 / (1.0 + math.exp(-s)) for s in scores]
+    else:
+        top = max(scores)
+        probs = [math.exp(s - top) for s in scores]
+    total = sum(probs)
+    return [p / total for p in probs]
+
+
+class CompiledLinearModel:
+    """
+    Pure-Python scorer for a compiled TF-IDF + linear model.
+    Scores one document by tokenizing, looking up and summing in a single
+    pass - no scipy sparse matrix and no sklearn input validation.
+    """
+
+    def __init__(self, state):
+        if state.get('format') != COMPILED_FORMAT:
+            raise ValueError("Not a compiled linear model artifact.")
+        self.state = state
+        self.classes_ = list(state['classes'])
+        self.intercept = list(state['intercept'])
+        self.table = state['table']
+        self.token_re = re.compile(state['token_pattern'])
+        self.lowercase = state['lowercase']
+        self.min_n, self.max_n = state['ngram_range']
+        self.sublinear_tf = state['sublinear_tf']
+        self.norm = state['norm']
+        self.proba = state['proba']
+        self.sources = state.get('sources', {})
+
+    def ngrams(self, clean_text):
+        return word_ngrams(clean_text, self.token_re, self.lowercase, self.min_n, self.max_n)
+
+    def term_weights(self, clean_text):
+        """
+        Per-term weights of a cleaned document, as {term: (scaled_tf, row)}
+        where row is the table entry. scaled_tf * row[0] is the normalized
+        TF-IDF value the vectorizer would produce for that term.
+        """
+        table = self.table
+        counts = Counter(g for g in self.ngrams(clean_text) if g in table)
+
+        weights = {}
+        norm_acc = 0.0
+        for term, tf in counts.items():
+            if self.sublinear_tf:
+                tf = 1.0 + math.log(tf)
+            row = table[term]
+            w = tf * row[0]
+            weights[term] = (tf, row)
+            norm_acc += w * w if self.norm == 'l2' else abs(w)
+
+        if self.norm == 'l2':
+            scale = 1.0 / math.sqrt(norm_acc) if norm_acc > 0 else 0.0
+        elif self.norm == 'l1':
+            scale = 1.0 / norm_acc if norm_acc > 0 else 0.0
+        else:
+            scale = 1.0
+        return {term: (tf * scale, row) for term, (tf, row) in weights.items()}
+
+    # --- Scoring ---
+    def decision_function_clean(self, clean_text):
+        """Raw class scores for an already-preprocessed document"""
+        scores = list(self.intercept)
+        n_scores = len(scores)
+        for tf, row in self.term_weights(clean_text).values():
+            for k in range(n_scores):
+                scores[k] += tf * row[k + 1]
+        return scores
+
+    def predict_proba_clean(self, clean_text):
+        """Class probabilities for an already-preprocessed document"""
+        return scores_to_proba(self.decision_function_clean(clean_text), self.proba)
+
+    def predict_clean(self, clean_text):
+        scores = self.decision_function_clean(clean_text)
+        if len(scores) == 1:
+            return self.classes_[1 if scores[0] > 0 else 0]
+        return self.classes_[max(range(len(scores)), key=scores.__getitem__)]
+
+    def predict_proba_text(self, text):
+        """Preprocess a raw post and return class probabilities"""
+        return self.predict_proba_clean(preprocess_text(text))
+
+    def predict_text(self, text):
+        """Preprocess a raw post and return the predicted class"""
+        return self.predict_clean(preprocess_text(text))
+
+    def si_probability(self, text):
+        """Probability of the 'SI' class for a raw post"""
+        return self.predict_proba_text(text)[self.classes_.index('SI')]
+
+    # --- Persistence ---
+    def save(self, path):
+        with open(path, 'wb') as f:
+            pickle.dump(self.state, f, protocol=pickle.HIGHEST_PROTOCOL)
+
+    @classmethod
+    def load(cls, path):
+        with open(path, 'rb') as f:
+            return cls(pickle.load(f))
+
+    def is_stale(self, model_path, vectorizer_path):
+        """True if either source pickle changed since this artifact was compiled"""
+        return (self.sources.get('model') != file_fingerprint(model_path)
+                or self.sources.get('vectorizer') != file_fingerprint(vectorizer_path))
+
+
+def compile_from_files(model_path, vectorizer_path, output_path):
+    """Compile pickled model + vectorizer into output_path"""
+    model = load_artifact(model_path)
+    vectorizer = load_artifact(vectorizer_path)
+
+    sources = {
+        'model': file_fingerprint(model_path),
+        'vectorizer': file_fingerprint(vectorizer_path),
+    }
+    compiled = compile_linear_model(model, vectorizer, sources=sources)
+    compiled.save(output_path)
+    return compiled, model, vectorizer
+
+
+def max_abs_difference(compiled, model, vectorizer, texts):
+    """Largest absolute gap between compiled and sklearn scores over texts"""
+    import numpy as np
+
+    clean = [preprocess_text(t) for t in texts]
+    if compiled.proba is not None:
+        expected = model.predict_proba(vectorizer.transform(clean))
+        got = np.array([compiled.predict_proba_clean(c) for c in clean])
+    else:
+        expected = model.decision_function(vectorizer.transform(clean))
+        got = np.array([compiled.decision_function_clean(c) for c in clean])
+    return float(np.max(np.abs(expected.reshape(got.shape) - got)))
+
+
+def compile_verified(model, vectorizer, texts=PARITY_TEXTS, tolerance=PARITY_TOLERANCE):
+    """
+    Compile a loaded model + vectorizer for single-text scoring and check
+    it against sklearn on texts. Returns None (callers keep the sklearn
+    path) if the pair cannot be compiled, has no probabilities or disagrees.
+    """
+    try:
+        compiled = compile_linear_model(model, vectorizer)
+    except ValueError as e:
+        print(f"⚠️ Compiled scorer unavailable: {e}")
+        return None
+    if compiled.proba is None:
+        return None
+
+    max_diff = max_abs_difference(compiled, model, vectorizer, texts)
+    if max_diff > tolerance:
+        print(f"⚠️ Compiled scorer differs from sklearn by {max_diff:.2e}; using sklearn")
+        return None
+    return compiled
+
+
+def verify_and_benchmark(compiled, model, vectorizer, texts, repeats=200):
+    """Compare compiled scores with sklearn and time single-text latency for both"""
+    max_diff = max_abs_difference(compiled, model, vectorizer, texts)
+
+    sample = texts[0]
+    sklearn_score = model.predict_proba if compiled.proba else model.decision_function
+    compiled_score = compiled.predict_proba_clean if compiled.proba else compiled.decision_function_clean
+
+    start = time.perf_counter()
+    for _ in range(repeats):
+        sklearn_score(vectorizer.transform([preprocess_text(sample)]))
+    sklearn_ms = (time.perf_counter() - start) / repeats * 1000
+
+    start = time.perf_counter()
+    for _ in range(repeats):
+        compiled_score(preprocess_text(sample))
+    compiled_ms = (time.perf_counter() - start) / repeats * 1000
+
+    return max_diff, sklearn_ms, compiled_ms
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compile a TF-IDF + linear model into a fast single-text scorer.")
+    parser.add_argument("--models-dir", default=os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'models'))
+    parser.add_argument("--model", default=MODEL_FILENAME, help="Model filename inside models dir.")
+    parser.add_argument("--vectorizer", default=VECTORIZER_FILENAME, help="Vectorizer filename inside models dir.")
+    parser.add_argument("--output", default=None, help=f"Output path (default: models/{DEFAULT_COMPILED_FILENAME}).")
+    args = parser.parse_args()
+
+    model_path = os.path.join(args.models_dir, args.model)
+    vec_path = os.path.join(args.models_dir, args.vectorizer)
+    output_path = args.output or os.path.join(args.models_dir, DEFAULT_COMPILED_FILENAME)
+
+    print(f"⏳ Compiling {args.model} + {args.vectorizer}...")
+    compiled, model, vectorizer = compile_from_files(model_path, vec_path, output_path)
+    print(f"💾 Saved compiled model to: {output_path} ({len(compiled.table):,} terms)")
+
+    max_diff, sklearn_ms, compiled_ms = verify_and_benchmark(compiled, model, vectorizer, PARITY_TEXTS)
+    print(f"🔍 Max abs difference vs sklearn: {max_diff:.2e}")
+    print(f"⏱️ Single-text latency: sklearn {sklearn_ms:.3f} ms, compiled {compiled_ms:.3f} ms")
+
+
+if __name__ == "__main__":
+    main()
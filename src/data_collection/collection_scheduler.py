@@ -0,0 +1,303 @@
+import os
+import sys
+import time
+import random
+import argparse
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+# Reddit's free OAuth tier: 100 queries per minute per client ID
+DEFAULT_QPM = 100
+DEFAULT_BURST = 10
+DEFAULT_WORKERS = 4
+MAX_RETRIES = 6
+MAX_BACKOFF = 120.0
+PAGE_SIZE = 100  # items per listing request
+
+
+class TokenBucket:
+    """
+    Thread-safe token bucket: `rate` tokens per second up to `capacity`.
+    acquire() blocks until a token is available; pause_until() holds every
+    caller back (used after a 429).
+    """
+
+    def __init__(self, rate, capacity=DEFAULT_BURST):
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = float(capacity)
+        self._updated = time.monotonic()
+        self._paused_until = 0.0
+        self._lock = threading.Lock()
+
+    def _refill(self, now):
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def acquire(self):
+        """Take one token; returns the seconds spent waiting"""
+        waited = 0.0
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._refill(now)
+                if now < self._paused_until:
+                    delay = self._paused_until - now
+                elif self._tokens >= 1:
+                    self._tokens -= 1
+                    return waited
+                else:
+                    delay = (1 - self._tokens) / self.rate
+            time.sleep(delay)
+            waited += delay
+
+    def try_acquire(self):
+        """Non-blocking acquire: (True, 0) or (False, seconds until a token is due)"""
+        with self._lock:
+            self._refill(time.monotonic())
+            if self._tokens >= 1:
+                self._tokens -= 1
+                return True, 0.0
+            return False, (1 - self._tokens) / self.rate
+
+    def set_rate(self, rate):
+        with self._lock:
+            self._refill(time.monotonic())
+            self.rate = rate
+
+    def pause_until(self, deadline):
+        with self._lock:
+            self._paused_until = max(self._paused_until, deadline)
+            self._tokens = 0.0
+
+
+class AdaptiveRateLimiter:
+    """
+    Shared limiter for every API request. Paces requests with a token
+    bucket sized to the quota. On a 429 it pauses all callers for the
+    Retry-After time (or an exponential backoff with jitter) and halves the
+    rate; each success then adds back a step of the rate (AIMD), up to the
+    quota.
+
+        limiter = AdaptiveRateLimiter(qpm=100)
+        response = limiter.call(lambda: session.get(url))
+
+    `send` returns anything with .status_code and .headers.
+    """
+
+    def __init__(self, qpm=DEFAULT_QPM, burst=DEFAULT_BURST, min_qpm=6, max_retries=MAX_RETRIES):
+        self.max_rate = qpm / 60.0
+        self.min_rate = min_qpm / 60.0
+        self.max_retries = max_retries
+        self.bucket = TokenBucket(self.max_rate, burst)
+        self._lock = threading.Lock()
+        self._streak = 0
+        self.stats = {'requests': 0, 'throttled': 0, 'wait_seconds': 0.0}
+
+    @property
+    def rate(self):
+        return self.bucket.rate
+
+    def _backoff(self, response):
+        retry_after = response.headers.get('Retry-After') if response.headers else None
+        try:
+            return min(float(retry_after), MAX_BACKOFF)
+        except (TypeError, ValueError):
+            return min(2.0 ** self._streak, MAX_BACKOFF) * (0.5 + random.random() / 2)
+
+    def _on_throttled(self, response):
+        with self._lock:
+            self._streak += 1
+            self.stats['throttled'] += 1
+            delay = self._backoff(response)
+            self.bucket.set_rate(max(self.min_rate, self.bucket.rate / 2))
+        self.bucket.pause_until(time.monotonic() + delay)
+        print(f"⏳ 429 from API: backing off {delay:.1f}s, rate now {self.rate * 60:.0f}/min")
+
+    def _on_success(self):
+        with self._lock:
+            self._streak = 0
+            if self.bucket.rate < self.max_rate:
+                self.bucket.set_rate(min(self.max_rate, self.bucket.rate + self.max_rate / 20))
+
+    def call(self, send):
+        for _ in range(self.max_retries + 1):
+            waited = self.bucket.acquire()
+            with self._lock:
+                self.stats['requests'] += 1
+                self.stats['wait_seconds'] += waited
+            response = send()
+            if getattr(response, 'status_code', None) != 429:
+                self._on_success()
+                return response
+            self._on_throttled(response)
+        return response
+
+
+def collect_concurrently(reddit_factory, jobs, collect, workers=DEFAULT_WORKERS, on_done=None, **collect_kwargs):
+    """
+    Run collect(reddit, subreddit_name, sorting_modes=..., **collect_kwargs)
+    for every (subreddit_name, sorting_modes) job on `workers` threads.
+    PRAW instances are not thread-safe, so each thread builds its own with
+    reddit_factory(); pacing comes from the limiter they share. A factory
+    that returns None (e.g. failed authentication) fails that job and is
+    retried on the thread's next job.
+    on_done(subreddit_name, posts) runs in the calling thread as each
+    subreddit finishes. Returns {subreddit_name: posts} in job order.
+    """
+    local = threading.local()
+
+    def run(subreddit_name, sorting_modes):
+        reddit = getattr(local, 'reddit', None)
+        if reddit is None:
+            reddit = reddit_factory()
+            if reddit is None:
+                raise RuntimeError("could not create a Reddit client")
+            local.reddit = reddit
+        return collect(reddit, subreddit_name, sorting_modes=sorting_modes, **collect_kwargs)
+
+    results = {}
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix='collect') as executor:
+        futures = {executor.submit(run, name, modes): name for name, modes in jobs}
+        for future in as_completed(futures):
+            name = futures[future]
+            try:
+                results[name] = future.result()
+            except Exception as e:
+                print(f"Unexpected error for r/{name}: {e}")
+                results[name] = []
+            if on_done is not None:
+                on_done(name, results[name])
+    return {name: results[name] for name, _ in jobs}
+
+
+### Offline stand-in for benchmarking without network ###
+class FakeResponse:
+    def __init__(self, status_code, headers=None, items=None):
+        self.status_code = status_code
+        self.headers = headers or {}
+        self.items = items or []
+
+
+class FakeRedditServer:
+    """
+    Shared fake API: enforces its own per-minute quota (429 + Retry-After
+    when exceeded) and answers listing requests after `latency` seconds
+    with deterministic synthetic submissions.
+    """
+
+    def __init__(self, qpm=DEFAULT_QPM, burst=DEFAULT_BURST, latency=0.3, image_rate=0.0, seed=0):
+        self.latency = latency
+        self.image_rate = image_rate
+        self.seed = seed
+        self._quota = TokenBucket(qpm / 60.0, burst)
+        self._lock = threading.Lock()
+        self.requests = 0
+        self.rejected = 0
+
+    def listing(self, subreddit_name, mode, after, count):
+        time.sleep(self.latency)
+        allowed, retry_after = self._quota.try_acquire()
+        with self._lock:
+            self.requests += 1
+            self.rejected += not allowed
+        if not allowed:
+            return FakeResponse(429, {'Retry-After': f"{retry_after:.2f}"})
+        return FakeResponse(200, items=[self._submission(subreddit_name, mode, after + i) for i in range(count)])
+
+    def _submission(self, subreddit_name, mode, index):
+        from types import SimpleNamespace
+
+        rng = random.Random(f"{self.seed}:{subreddit_name}:{mode}:{index}")
+        words = ("i feel like nothing works anymore and college is exhausting but my friends are "
+                 "there for me today was a good day honestly lol this meme is me").split()
+        body = " ".join(rng.choice(words) for _ in range(rng.randint(5, 120)))
+        is_image = rng.random() < self.image_rate
+        post_id = f"{subreddit_name[:3].lower()}{mode[0]}{index:06d}"
+        return SimpleNamespace(
+            id=post_id,
+            title=" ".join(rng.choice(words) for _ in range(rng.randint(3, 12))),
+            selftext="" if is_image else body,
+            url=f"https://i.example.com/{post_id}.jpg" if is_image else f"https://reddit.com/{post_id}",
+            created_utc=1700000000 + index,
+            score=rng.randint(0, 5000),
+            num_comments=rng.randint(0, 300),
+        )
+
+
+class FakeSubreddit:
+    def __init__(self, reddit, name):
+        self._reddit = reddit
+        self.display_name = name
+
+    def _listing(self, mode, limit):
+        fetched = 0
+        while fetched < limit:
+            count = min(PAGE_SIZE, limit - fetched)
+            response = self._reddit.limiter.call(
+                lambda: self._reddit.server.listing(self.display_name, mode, fetched, count))
+            if response.status_code != 200:
+                raise RuntimeError(f"fake API returned {response.status_code}")
+            yield from response.items
+            fetched += count
+
+    def hot(self, limit=100):
+        return self._listing('hot', limit)
+
+    def new(self, limit=100):
+        return self._listing('new', limit)
+
+    def top(self, time_filter='all', limit=100):
+        return self._listing('top', limit)
+
+
+class FakeReddit:
+    """Just enough of praw.Reddit for collect_subreddit_posts, paced by the same limiter"""
+
+    def __init__(self, server, limiter):
+        self.server = server
+        self.limiter = limiter
+
+    def subreddit(self, name):
+        return FakeSubreddit(self, name)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark concurrent collection against an offline fake Reddit.")
+    parser.add_argument("--subreddits", type=int, default=20)
+    parser.add_argument("--limit", type=int, default=300, help="Posts requested per subreddit and sorting mode.")
+    parser.add_argument("--workers", type=int, default=DEFAULT_WORKERS)
+    parser.add_argument("--qpm", type=float, default=DEFAULT_QPM, help="Fake server quota (requests/minute).")
+    parser.add_argument("--limiter-qpm", type=float, default=None,
+                        help="Client limiter rate (default: --qpm; set higher to exercise 429 backoff).")
+    parser.add_argument("--latency", type=float, default=0.3, help="Fake per-request latency in seconds.")
+    args = parser.parse_args()
+
+    sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+    from reddit_api_wrapper import collect_subreddit_posts
+
+    server = FakeRedditServer(args.qpm, latency=args.latency)
+    limiter = AdaptiveRateLimiter(args.limiter_qpm or args.qpm)
+    jobs = [(f"fake{i:02d}", ['hot']) for i in range(args.subreddits)]
+
+    start = time.perf_counter()
+    with open(os.devnull, 'w') as devnull:
+        stdout, sys.stdout = sys.stdout, devnull
+        try:
+            results = collect_concurrently(lambda: FakeReddit(server, limiter), jobs, collect_subreddit_posts,
+                                           workers=args.workers, limit=args.limit, delay=0)
+        finally:
+            sys.stdout = stdout
+    elapsed = time.perf_counter() - start
+
+    posts = sum(len(p) for p in results.values())
+    # The sequential loop this replaces slept 0.5s per accepted post and 2s per subreddit on top of the requests
+    sequential = server.requests * args.latency + posts * 0.5 + args.subreddits * 2
+    print(f"📥 {posts:,} posts from {args.subreddits} subreddits in {elapsed:.1f}s ({posts / elapsed:.1f} posts/s)")
+    print(f"   {server.requests} API requests ({server.requests / elapsed * 60:.0f}/min vs quota {args.qpm:.0f}/min), "
+          f"{limiter.stats['throttled']} throttled (429), {limiter.stats['wait_seconds']:.1f}s waited on the limiter")
+    print(f"🐢 Sequential loop with fixed sleeps would take ~{sequential:.0f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,9 +1,13 @@
 import json
 import os
+import sys
 from datetime import datetime
 from collections import defaultdict
 import random
 
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from profiling import profiled
+
 def load_all_json_files(data_dir="data/raw"):
     """
     Load all JSON files from the data directory recursively
@@ -127,6 +131,7 @@ def stratified_sample(posts_by_label, target_count, priority_labels=None):
     return sampled
 
 
+@profiled('merge_datasets_with_strategy', count=len)
 def merge_datasets_with_strategy(existing_dataset_path=None, target_si_ratio=0.25):
     """
     Main merging function that implements the selective merging strategy
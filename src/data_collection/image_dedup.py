@@ -0,0 +1,360 @@
+import os
+import time
+import sqlite3
+import argparse
+import threading
+from itertools import combinations
+from concurrent.futures import Future
+
+import numpy as np
+from PIL import Image
+
+DEFAULT_INDEX_PATH = 'data/processed/image_index.sqlite'
+HASH_BITS = 64
+# Reposts that were resized, recompressed or lightly cropped land within a few bits
+DEFAULT_MAX_DISTANCE = 8
+# Multi-index hashing: the 64-bit hash is split into CHUNKS substrings, each
+# indexed separately. Two hashes within r bits must agree to within r // CHUNKS
+# bits on at least one substring (pigeonhole), so a lookup only probes those
+# substring neighborhoods instead of scanning every image.
+CHUNKS = 4
+CHUNK_BITS = HASH_BITS // CHUNKS
+CHUNK_MASK = (1 << CHUNK_BITS) - 1
+# Hashes added since the last re-sort are checked by a linear scan up to this many
+PENDING_REBUILD = 4096
+CHUNK_DTYPE = np.min_scalar_type(CHUNK_MASK)
+
+
+def dhash(img, hash_size=8):
+    """
+    64-bit difference hash: grayscale, shrink to 9x8 and record whether
+    each pixel is brighter than its right neighbor. Survives rescaling,
+    recompression and small edits, which is what reposts go through.
+    """
+    small = img.convert('L').resize((hash_size + 1, hash_size), Image.LANCZOS)
+    pixels = list(small.getdata())
+    value = 0
+    for row in range(hash_size):
+        offset = row * (hash_size + 1)
+        for col in range(hash_size):
+            value = (value << 1) | (pixels[offset + col] > pixels[offset + col + 1])
+    return value
+
+
+def hash_file(image_path):
+    """dhash of an image file, or None if it cannot be decoded"""
+    try:
+        with Image.open(image_path) as img:
+            return dhash(img)
+    except Exception:
+        # Truncated/corrupt files, unsupported formats and decompression bombs alike
+        return None
+
+
+def hamming(a, b):
+    return bin(a ^ b).count('1')
+
+
+def _chunks(value):
+    return [(value >> (CHUNK_BITS * i)) & CHUNK_MASK for i in range(CHUNKS)]
+
+
+def _popcount(x):
+    """Set bits per element of a uint64 array"""
+    if hasattr(np, 'bitwise_count'):
+        return np.bitwise_count(x)
+    return np.unpackbits(x.view(np.uint8)).reshape(-1, HASH_BITS).sum(axis=1)
+
+
+_flip_masks = {}
+
+
+def _chunk_neighborhood(radius):
+    """XOR masks (uint64) of every CHUNK_BITS-bit value within `radius` bits of zero"""
+    if radius not in _flip_masks:
+        masks = []
+        for r in range(radius + 1):
+            for bits in combinations(range(CHUNK_BITS), r):
+                masks.append(sum(1 << bit for bit in bits))
+        _flip_masks[radius] = np.array(masks, dtype=np.uint64)
+    return _flip_masks[radius]
+
+
+class DedupIndex:
+    """
+    Persistent perceptual-hash index with multi-index-hashing lookup.
+    Hashes and keys are stored in SQLite; on open the hashes are loaded
+    into per-substring sorted arrays, so a lookup is a few vectorized
+    binary searches plus a popcount over the (small) candidate set.
+    Keys are whatever identifies an image in the dataset, e.g.
+    "memes_abc123".
+
+        with DedupIndex() as index:
+            match = index.check_and_add(hash_file(path), key)
+            if match:   # (distance, key of the earlier near-duplicate)
+                ...
+
+    All methods are thread-safe; check_and_add is atomic, so two copies of
+    a meme downloaded at once cannot both get in.
+    """
+
+    def __init__(self, path=DEFAULT_INDEX_PATH, max_distance=DEFAULT_MAX_DISTANCE):
+        self.path = path
+        self.max_distance = max_distance
+        out_dir = os.path.dirname(path)
+        if out_dir:
+            os.makedirs(out_dir, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        # WAL + NORMAL sync: a commit per checked image stays cheap and a crash loses at most the last few
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute("CREATE TABLE IF NOT EXISTS images (id INTEGER PRIMARY KEY, key TEXT NOT NULL, "
+                           "hash INTEGER NOT NULL, added REAL NOT NULL)")
+        self._conn.commit()
+        self.stats = {'checked': 0, 'duplicates': 0, 'unreadable': 0}
+        self.duplicates = {}
+
+        rows = self._conn.execute("SELECT id, hash FROM images ORDER BY id").fetchall()
+        self._ids = np.array([row[0] for row in rows], dtype=np.int64)
+        # SQLite integers are signed 64-bit; reinterpret the same bits as unsigned
+        self._hashes = np.array([row[1] for row in rows], dtype=np.int64).view(np.uint64)
+        self._pending_ids, self._pending_hashes = [], []
+        self._build()
+
+    def _build(self):
+        """(Re)build the per-substring sorted arrays, folding in recently added hashes"""
+        if self._pending_ids:
+            self._ids = np.concatenate([self._ids, np.array(self._pending_ids, dtype=np.int64)])
+            self._hashes = np.concatenate([self._hashes, np.array(self._pending_hashes, dtype=np.uint64)])
+            self._pending_ids, self._pending_hashes = [], []
+        self._tables = []
+        for i in range(CHUNKS):
+            chunk = ((self._hashes >> np.uint64(CHUNK_BITS * i)) & np.uint64(CHUNK_MASK)).astype(CHUNK_DTYPE)
+            order = np.argsort(chunk, kind='stable')
+            self._tables.append((chunk[order], order))
+
+    def _lookup(self, value, max_distance):
+        probes = _chunk_neighborhood(max_distance // CHUNKS)
+        target = np.uint64(value)
+        candidates = []
+        for i, chunk in enumerate(_chunks(value)):
+            values, order = self._tables[i]
+            keys = (np.uint64(chunk) ^ probes).astype(CHUNK_DTYPE)
+            lo = np.searchsorted(values, keys, side='left')
+            hi = np.searchsorted(values, keys, side='right')
+            hit = hi > lo
+            if hit.any():
+                lo, hi = lo[hit], hi[hit]
+                lengths = hi - lo
+                positions = np.repeat(lo - np.concatenate([[0], np.cumsum(lengths)[:-1]]), lengths) \
+                    + np.arange(lengths.sum())
+                candidates.append(order[positions])
+
+        matches = []
+        if candidates:
+            rows = np.concatenate(candidates)
+            distance = _popcount(self._hashes[rows] ^ target)
+            close = distance <= max_distance
+            # A match can be found through several substrings; dedupe the (few) survivors only
+            matches.extend(set(zip(distance[close].tolist(), self._ids[rows[close]].tolist())))
+        if self._pending_ids:
+            distance = _popcount(np.array(self._pending_hashes, dtype=np.uint64) ^ target)
+            close = np.flatnonzero(distance <= max_distance)
+            matches.extend((int(distance[j]), self._pending_ids[j]) for j in close)
+        if not matches:
+            return []
+
+        matches.sort()
+        ids = [row_id for _, row_id in matches]
+        keys = dict(self._conn.execute(f"SELECT id, key FROM images WHERE id IN ({','.join('?' * len(ids))})", ids))
+        return [(distance, keys[row_id]) for distance, row_id in matches]
+
+    def lookup(self, value, max_distance=None):
+        """[(distance, key), ...] of indexed images within max_distance bits, closest first"""
+        with self._lock:
+            return self._lookup(value, self.max_distance if max_distance is None else max_distance)
+
+    def _insert(self, items):
+        now = time.time()
+        cursor = self._conn.cursor()
+        for value, key in items:
+            signed = value - (1 << HASH_BITS) if value >= 1 << (HASH_BITS - 1) else value
+            cursor.execute("INSERT INTO images (key, hash, added) VALUES (?, ?, ?)", (key, signed, now))
+            self._pending_ids.append(cursor.lastrowid)
+            self._pending_hashes.append(value)
+        self._conn.commit()
+        # New hashes are scanned linearly until there are enough to be worth re-sorting
+        if len(self._pending_ids) > max(PENDING_REBUILD, len(self._ids) // 100):
+            self._build()
+
+    def add(self, value, key):
+        with self._lock:
+            self._insert([(value, key)])
+
+    def add_many(self, items):
+        """Bulk insert (hash, key) pairs, e.g. to backfill from an existing image folder"""
+        with self._lock:
+            self._insert(items)
+            self._build()
+
+    def check_and_add(self, value, key):
+        """Closest earlier near-duplicate as (distance, key), or None after indexing this image"""
+        with self._lock:
+            self.stats['checked'] += 1
+            matches = self._lookup(value, self.max_distance)
+            if matches:
+                self.stats['duplicates'] += 1
+                self.duplicates[key] = matches[0]
+                return matches[0]
+            self._insert([(value, key)])
+            return None
+
+    def check_file(self, image_path, key):
+        """check_and_add for an image file; undecodable images are never flagged"""
+        value = hash_file(image_path)
+        if value is None:
+            with self._lock:
+                self.stats['unreadable'] += 1
+            return None
+        return self.check_and_add(value, key)
+
+    def screen(self, download_future, key):
+        """
+        Chain after an ImageDownloader future: resolves to the image path,
+        or to None (file deleted) when it near-duplicates an indexed image.
+        If the check itself fails the image passes through unscreened.
+        """
+        result = Future()
+
+        def check(download):
+            # Runs as a done-callback: anything raised here would be swallowed
+            # and leave `result` unresolved, so every path must resolve it
+            image_path = None
+            try:
+                image_path = download.result() if download.exception() is None else None
+                if image_path and self.check_file(image_path, key):
+                    try:
+                        os.remove(image_path)
+                    except OSError as e:
+                        print(f"Error deleting image: {e}")
+                    image_path = None
+            except Exception as e:
+                print(f"Dedup check failed for {key}: {e}")
+            finally:
+                result.set_result(image_path)
+
+        download_future.add_done_callback(check)
+        return result
+
+    def is_duplicate(self, key):
+        with self._lock:
+            return key in self.duplicates
+
+    def print_stats(self):
+        print(f"🧬 Image dedup: {self.stats['checked']} checked, {self.stats['duplicates']} near-duplicates "
+              f"(<= {self.max_distance} bits), {len(self):,} images indexed")
+
+    def __len__(self):
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM images").fetchone()[0]
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+        return False
+
+
+def _benchmark(n_images, n_queries, max_distance, seed=0):
+    """Lookup latency at scale on random hashes, against a brute-force scan"""
+    import tempfile
+
+    rng = np.random.default_rng(seed)
+    hashes = [int(h) for h in rng.integers(0, 2 ** 64, n_images, dtype=np.uint64)]
+    # Half the queries are reposts (a few bits flipped), half are new images
+    queries = []
+    for q in range(n_queries):
+        if q % 2 == 0:
+            value = hashes[rng.integers(n_images)]
+            for bit in rng.choice(HASH_BITS, rng.integers(0, max_distance + 1), replace=False):
+                value ^= 1 << int(bit)
+        else:
+            value = int(rng.integers(0, 2 ** 64, dtype=np.uint64))
+        queries.append(value)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'index.sqlite')
+        start = time.perf_counter()
+        with DedupIndex(path, max_distance) as index:
+            for i in range(0, n_images, 100000):
+                index.add_many((h, f"img{i + j}") for j, h in enumerate(hashes[i:i + 100000]))
+        print(f"📥 Indexed {n_images:,} hashes in {time.perf_counter() - start:.1f}s")
+
+        start = time.perf_counter()
+        with DedupIndex(path, max_distance) as index:
+            print(f"📂 Reopened in {time.perf_counter() - start:.1f}s")
+            start = time.perf_counter()
+            found = [index.lookup(value) for value in queries]
+            per_query = (time.perf_counter() - start) / n_queries
+            print(f"🔎 Multi-index lookup: {per_query * 1000:.3f} ms/query, "
+                  f"{sum(bool(f) for f in found)}/{n_queries} matched")
+
+            start = time.perf_counter()
+            for q, value in enumerate(queries):
+                index.check_and_add(value, f"new{q}")
+            print(f"➕ check_and_add: {(time.perf_counter() - start) / n_queries * 1000:.3f} ms/image")
+
+    table = np.array(hashes, dtype=np.uint64)
+    start = time.perf_counter()
+    for value in queries[:100]:
+        np.flatnonzero(_popcount(table ^ np.uint64(value)) <= max_distance)
+    print(f"🐢 Brute-force scan: {(time.perf_counter() - start) / 100 * 1000:.2f} ms/query")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Perceptual-hash near-duplicate index for collected images.")
+    sub = parser.add_subparsers(dest="command", required=True)
+    add = sub.add_parser("add", help="Index every image in a directory, reporting near-duplicates.")
+    add.add_argument("image_dir")
+    query = sub.add_parser("query", help="List indexed near-duplicates of an image.")
+    query.add_argument("image")
+    bench = sub.add_parser("benchmark", help="Lookup latency at scale on synthetic hashes.")
+    bench.add_argument("--images", type=int, default=1000000)
+    bench.add_argument("--queries", type=int, default=1000)
+    for p in (add, query, bench):
+        p.add_argument("--max-distance", type=int, default=DEFAULT_MAX_DISTANCE)
+    for p in (add, query):
+        p.add_argument("--index", default=DEFAULT_INDEX_PATH)
+    args = parser.parse_args()
+
+    if args.command == "benchmark":
+        _benchmark(args.images, args.queries, args.max_distance)
+        return
+
+    with DedupIndex(args.index, args.max_distance) as index:
+        if args.command == "query":
+            value = hash_file(args.image)
+            if value is None:
+                print(f"❌ Cannot decode {args.image}")
+                return
+            for distance, key in index.lookup(value):
+                print(f"   {distance:>2} bits  {key}")
+            return
+
+        extensions = ('.jpg', '.jpeg', '.png', '.gif', '.webp')
+        names = sorted(name for name in os.listdir(args.image_dir) if name.lower().endswith(extensions))
+        for name in names:
+            match = index.check_file(os.path.join(args.image_dir, name), os.path.splitext(name)[0])
+            if match:
+                print(f"   {name} ~ {match[1]} ({match[0]} bits)")
+        index.print_stats()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,289 @@
+import os
+import time
+import argparse
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+DEFAULT_IMAGE_DIR = 'data/images'
+DEFAULT_WORKERS = 8
+DEFAULT_MAX_BYTES = 20 * 1024 * 1024
+DEFAULT_TIMEOUT = 10
+CHUNK_BYTES = 64 * 1024
+USER_AGENT = 'sid-image-downloader/1.0'
+
+RESULTS = ('downloaded', 'skipped', 'too_large', 'failed')
+
+
+def make_session(pool_size=DEFAULT_WORKERS, retries=2):
+    """Session whose connection pool holds one keep-alive connection per worker and host"""
+    session = requests.Session()
+    adapter = HTTPAdapter(
+        pool_connections=pool_size,
+        pool_maxsize=pool_size,
+        max_retries=Retry(total=retries, backoff_factor=0.5, status_forcelist=(500, 502, 503, 504),
+                          allowed_methods=('GET',)),
+    )
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+    session.headers['User-Agent'] = USER_AGENT
+    return session
+
+
+_shared_session = None
+_shared_lock = threading.Lock()
+
+
+def shared_session():
+    """Process-wide pooled session for one-off downloads"""
+    global _shared_session
+    with _shared_lock:
+        if _shared_session is None:
+            _shared_session = make_session()
+        return _shared_session
+
+
+def image_path(url, subreddit_name, post_id, image_dir=DEFAULT_IMAGE_DIR):
+    """Where the image for a post is stored (same naming as the original downloader)"""
+    return os.path.join(image_dir, f"{subreddit_name}_{post_id}{os.path.splitext(url)[-1]}")
+
+
+def fetch(session, url, filepath, max_bytes=DEFAULT_MAX_BYTES, timeout=DEFAULT_TIMEOUT):
+    """
+    Stream one URL to filepath. Returns (result, bytes written) with result
+    one of RESULTS. The body goes to a .part file that is renamed on
+    success, so a partial or oversized download never looks like an image.
+    """
+    if os.path.exists(filepath):
+        return 'skipped', 0
+
+    tmp_path = filepath + '.part'
+    try:
+        with session.get(url, timeout=timeout, stream=True) as response:
+            if response.status_code != 200:
+                return 'failed', 0
+            declared = response.headers.get('Content-Length')
+            if declared is not None and declared.isdigit() and int(declared) > max_bytes:
+                return 'too_large', 0
+
+            written = 0
+            with open(tmp_path, 'wb') as f:
+                for chunk in response.iter_content(CHUNK_BYTES):
+                    written += len(chunk)
+                    if written > max_bytes:
+                        break
+                    f.write(chunk)
+            if written > max_bytes:
+                os.remove(tmp_path)
+                return 'too_large', 0
+        os.replace(tmp_path, filepath)
+        return 'downloaded', written
+
+    except (requests.RequestException, OSError) as e:
+        print(f"Error downloading image: {e}")
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        return 'failed', 0
+
+
+class ImageDownloader:
+    """
+    Bounded pool of download threads sharing one pooled Session.
+
+        with ImageDownloader(workers=8) as downloader:
+            future = downloader.submit(url, 'memes', post_id)
+            ...
+            path = future.result()   # file path, or None if not downloaded
+
+    submit() blocks once max_pending downloads are queued or running, so a
+    fast producer cannot pile up unbounded work.
+    """
+
+    def __init__(self, workers=DEFAULT_WORKERS, image_dir=DEFAULT_IMAGE_DIR, max_bytes=DEFAULT_MAX_BYTES,
+                 timeout=DEFAULT_TIMEOUT, max_pending=None, session=None):
+        self.image_dir = image_dir
+        self.max_bytes = max_bytes
+        self.timeout = timeout
+        self.session = session or make_session(workers)
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='image-download')
+        self._slots = threading.BoundedSemaphore(max_pending or workers * 4)
+        self._lock = threading.Lock()
+        self._counts = dict.fromkeys(RESULTS, 0)
+        self._bytes = 0
+        self._started = None
+        self._finished = None
+        os.makedirs(image_dir, exist_ok=True)
+
+    def _download(self, url, filepath):
+        try:
+            result, written = fetch(self.session, url, filepath, self.max_bytes, self.timeout)
+        finally:
+            self._slots.release()
+        with self._lock:
+            self._counts[result] += 1
+            self._bytes += written
+            self._finished = time.perf_counter()
+        return filepath if result in ('downloaded', 'skipped') else None
+
+    def submit(self, url, subreddit_name, post_id):
+        filepath = image_path(url, subreddit_name, post_id, self.image_dir)
+        self._slots.acquire()
+        with self._lock:
+            if self._started is None:
+                self._started = time.perf_counter()
+        return self._executor.submit(self._download, url, filepath)
+
+    def download_all(self, jobs):
+        """Download (url, subreddit_name, post_id) jobs; returns paths (or None) in job order"""
+        futures = [self.submit(*job) for job in jobs]
+        return [future.result() for future in futures]
+
+    def stats(self):
+        with self._lock:
+            counts = dict(self._counts)
+            total_bytes = self._bytes
+            elapsed = (self._finished - self._started) if self._started and self._finished else 0.0
+        attempted = sum(counts.values())
+        return {
+            **counts,
+            'attempted': attempted,
+            'bytes': total_bytes,
+            'seconds': elapsed,
+            'images_per_second': counts['downloaded'] / elapsed if elapsed else 0.0,
+            'mb_per_second': total_bytes / 1e6 / elapsed if elapsed else 0.0,
+            'failure_rate': (counts['failed'] + counts['too_large']) / attempted if attempted else 0.0,
+        }
+
+    def print_stats(self):
+        s = self.stats()
+        print(f"🖼️ Images: {s['downloaded']} downloaded, {s['skipped']} already on disk, "
+              f"{s['too_large']} over size cap, {s['failed']} failed")
+        print(f"   {s['bytes'] / 1e6:.1f} MB in {s['seconds']:.1f}s "
+              f"({s['images_per_second']:.1f} images/s, {s['mb_per_second']:.2f} MB/s)")
+
+    def close(self):
+        self._executor.shutdown(wait=True)
+        self.session.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+        return False
+
+
+### Local stand-in server for testing without Reddit/imgur ###
+def start_stand_in_server(n_images, image_bytes=200 * 1024, latency=0.05, missing_every=20, large_every=25,
+                          large_bytes=None):
+    """
+    Serve /img/<i>.jpg on 127.0.0.1 in a background thread with keep-alive
+    and a fixed per-request latency. Every missing_every-th image is a 404
+    and every large_every-th one is larger than large_bytes. Returns
+    (server, base_url); server.connections counts TCP connections opened.
+    """
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+    payload = os.urandom(image_bytes)
+    large_payload = os.urandom(large_bytes or DEFAULT_MAX_BYTES + CHUNK_BYTES)
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'
+
+        def setup(self):
+            super().setup()
+            with server.lock:
+                server.connections += 1
+
+        def handle(self):
+            try:
+                super().handle()
+            except ConnectionError:
+                pass  # client dropped the connection (e.g. gave up on an oversized body)
+
+        def do_GET(self):
+            time.sleep(latency)
+            name = os.path.basename(self.path)
+            index = int(name.split('.')[0]) if name.split('.')[0].isdigit() else -1
+            if index < 0 or index >= n_images or (missing_every and index % missing_every == missing_every - 1):
+                body, status = b'not found', 404
+            elif large_every and index % large_every == large_every - 1:
+                body, status = large_payload, 200
+            else:
+                body, status = payload, 200
+            self.send_response(status)
+            self.send_header('Content-Type', 'image/jpeg' if status == 200 else 'text/plain')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+    server.daemon_threads = True
+    server.lock = threading.Lock()
+    server.connections = 0
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}"
+
+
+def _sequential_baseline(jobs, image_dir, timeout=DEFAULT_TIMEOUT):
+    """The original per-image requests.get loop, for comparison"""
+    start = time.perf_counter()
+    for url, subreddit_name, post_id in jobs:
+        filepath = image_path(url, subreddit_name, post_id, image_dir)
+        try:
+            response = requests.get(url, timeout=timeout)
+            if response.status_code == 200:
+                with open(filepath, 'wb') as f:
+                    f.write(response.content)
+        except Exception as e:
+            print(f"Error downloading image: {e}")
+    return time.perf_counter() - start
+
+
+def main():
+    import tempfile
+
+    parser = argparse.ArgumentParser(description="Benchmark pooled image downloads against a local HTTP stand-in.")
+    parser.add_argument("--images", type=int, default=200)
+    parser.add_argument("--image-kb", type=int, default=200)
+    parser.add_argument("--latency", type=float, default=0.05, help="Per-request server latency in seconds.")
+    parser.add_argument("--workers", type=int, default=DEFAULT_WORKERS)
+    parser.add_argument("--max-mb", type=float, default=DEFAULT_MAX_BYTES / 1024 / 1024, help="Per-image size cap.")
+    parser.add_argument("--no-baseline", action="store_true", help="Skip the sequential requests.get run.")
+    args = parser.parse_args()
+
+    max_bytes = int(args.max_mb * 1024 * 1024)
+    server, base_url = start_stand_in_server(args.images, args.image_kb * 1024, args.latency,
+                                             large_bytes=max_bytes + CHUNK_BYTES)
+    jobs = [(f"{base_url}/img/{i}.jpg", 'standin', f"p{i:06d}") for i in range(args.images)]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        if not args.no_baseline:
+            baseline_dir = os.path.join(tmp, 'baseline')
+            os.makedirs(baseline_dir)
+            connections = server.connections
+            elapsed = _sequential_baseline(jobs, baseline_dir)
+            print(f"🐢 Sequential requests.get: {elapsed:.1f}s ({args.images / elapsed:.1f} requests/s, "
+                  f"{server.connections - connections} connections)")
+
+        connections = server.connections
+        with ImageDownloader(workers=args.workers, image_dir=os.path.join(tmp, 'pooled'), max_bytes=max_bytes) as d:
+            d.download_all(jobs)
+            d.print_stats()
+            print(f"   {server.connections - connections} connections for {args.images} requests")
+
+            # Second pass: everything that succeeded is already on disk
+            d.download_all(jobs)
+            print(f"   Re-run skipped {d.stats()['skipped']} images already on disk")
+
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,285 @@
+import os
+import time
+import json
+import argparse
+
+import numpy as np
+
+### Labeling lexicons ###
+SI_KEYWORDS = {
+    # Direct/Active SI expressions
+    'direct': [
+        'kill myself', 'end my life', 'suicidal', 'suicide', 'take my own life',
+        'end it all', 'attempted suicide', 'plan to die', 'commit suicide',
+        'killing myself', 'hang myself', 'shoot myself', 'overdose'
+    ],
+
+    # Passive SI expressions (death wishes without active plan)
+    'passive': [
+        'don\'t want to live', 'no reason to live', 'better off dead',
+        'wish i was dead', 'wish i were dead', 'hope i don\'t wake up',
+        'don\'t want to exist', 'don\'t want to be here', 'no longer here',
+        'cease to exist', 'sleep forever', 'not wake up', 'leave this world',
+        'want to disappear', 'just disappear', 'don\'t see the point',
+        'no point in living', 'life has no meaning', 'no purpose',
+        'tired of living', 'exhausted from living', 'can\'t keep living'
+    ],
+
+    # Indirect/coded expressions
+    'indirect': [
+        'unalive', 'final message', 'goodbye note', 'last post',
+        'this is it', 'end tonight', 'won\'t be here tomorrow',
+        'just want to be done', 'want it all to stop', 'can\'t do this anymore',
+        'can\'t keep doing this', 'give up on life', 'checked out',
+        'want to go home', 'ready to go', 'time to go'
+    ],
+
+    # Worthlessness and burden themes (strong SI indicators)
+    'burden': [
+        'life isn\'t worth it', 'better off without me', 'burden to everyone',
+        'nobody needs me', 'waste of space', 'ruin everything', 'world without me',
+        'everyone would be better', 'shouldn\'t exist', 'mistake to be born'
+    ],
+
+    # Preparation/planning behaviors
+    'preparation': [
+        'planned everything', 'set date', 'can\'t be stopped',
+        'giving away things', 'delete account', 'last day',
+        'made arrangements', 'got everything ready', 'writing goodbye'
+    ],
+
+    # Regional language phrases
+    'hindi': [
+        'chhod dena hai sab', 'khatam karna hai', 'ab aur nahi',
+        'mar jaunga', 'mar jaungi', 'jaane ka time aa gaya',
+        'jee nahi sakta', 'zinda nahi rehna'
+    ]
+}
+
+NSSI_KEYWORDS = [
+    'cutting myself', 'burned myself', 'scratched myself',
+    'hit myself', 'pulled my hair', 'bruised myself',
+    'harm scars', 'self injury tools', 'cutting tools',
+    'fresh cuts', 'blood from'
+]
+
+NSSI_CATEGORY = 'nssi'
+SI_CATEGORIES = tuple(SI_KEYWORDS)
+LABEL_LEXICON = {**SI_KEYWORDS, NSSI_CATEGORY: NSSI_KEYWORDS}
+
+MAX_CATEGORIES = 64
+DEFAULT_BATCH_SIZE = 8192
+
+
+class KeywordMatcher:
+    """
+    Aho-Corasick automaton over a {category: [phrases]} lexicon. One pass
+    over the lowercased text reports every category with at least one
+    phrase occurring as a substring, i.e. the same answer as
+    `any(phrase in text.lower() for phrase in phrases)` per category.
+
+    Results are bitmasks (bit i = categories[i]). The automaton is compiled
+    to a dense transition table, so scan_batch() can step thousands of
+    posts through it at once with numpy.
+    """
+
+    def __init__(self, lexicon):
+        self.categories = list(lexicon)
+        if len(self.categories) > MAX_CATEGORIES:
+            raise ValueError(f"At most {MAX_CATEGORIES} categories are supported, got {len(self.categories)}")
+
+        # Trie
+        goto, output = [{}], [0]
+        for bit, category in enumerate(self.categories):
+            for phrase in lexicon[category]:
+                phrase = phrase.lower()
+                if not phrase:
+                    continue
+                state = 0
+                for ch in phrase:
+                    if ch not in goto[state]:
+                        goto.append({})
+                        output.append(0)
+                        goto[state][ch] = len(goto) - 1
+                    state = goto[state][ch]
+                output[state] |= 1 << bit
+
+        self.alphabet = sorted({ch for edges in goto for ch in edges})
+        symbol = {ch: i + 1 for i, ch in enumerate(self.alphabet)}  # 0 = any other character
+
+        # Failure links in BFS order, folded straight into a complete DFA
+        delta = [dict() for _ in goto]
+        fail = [0] * len(goto)
+        queue = []
+        for ch, child in goto[0].items():
+            delta[0][ch] = child
+            queue.append(child)
+        for state in queue:
+            output[state] |= output[fail[state]]
+            for ch in self.alphabet:
+                child = goto[state].get(ch)
+                if child is None:
+                    target = delta[fail[state]].get(ch, 0)
+                    if target:
+                        delta[state][ch] = target
+                else:
+                    fail[child] = delta[fail[state]].get(ch, 0)
+                    delta[state][ch] = child
+                    queue.append(child)
+
+        self.n_states = len(goto)
+        self._delta = delta
+        self._output = output
+
+        # Dense form for scan_batch: transitions[state, symbol] and output bits per state
+        self._n_symbols = len(self.alphabet) + 1
+        self._transitions = np.zeros((self.n_states, self._n_symbols), dtype=np.int32)
+        for state, edges in enumerate(delta):
+            for ch, target in edges.items():
+                self._transitions[state, symbol[ch]] = target
+        # Store targets pre-multiplied by the row width, so a step is one add + one gather
+        self._transitions = (self._transitions * self._n_symbols).ravel().astype(np.int64)
+        self._output_bits = np.repeat(np.array(output, dtype=np.uint64), self._n_symbols)
+        max_code = max(map(ord, self.alphabet), default=0)
+        self._symbol_of_code = np.zeros(max_code + 1, dtype=np.int32)
+        for ch, i in symbol.items():
+            self._symbol_of_code[ord(ch)] = i
+
+    @classmethod
+    def from_json(cls, path):
+        """Matcher for a lexicon file of the form {"category": ["phrase", ...], ...}"""
+        with open(path, 'r', encoding='utf-8') as f:
+            return cls(json.load(f))
+
+    def mask_of(self, categories):
+        """Bitmask selecting the given category names"""
+        mask = 0
+        for category in categories:
+            mask |= 1 << self.categories.index(category)
+        return mask
+
+    def decode(self, mask):
+        """Category names set in a bitmask, in lexicon order"""
+        mask = int(mask)
+        return [category for bit, category in enumerate(self.categories) if mask >> bit & 1]
+
+    def scan(self, text):
+        """Bitmask of the categories found in one text"""
+        delta, output = self._delta, self._output
+        state, found = 0, 0
+        for ch in text.lower():
+            state = delta[state].get(ch, 0)
+            found |= output[state]
+        return found
+
+    def matches(self, text):
+        """Category names found in one text, in lexicon order"""
+        return self.decode(self.scan(text))
+
+    def scan_batch(self, texts, batch_size=DEFAULT_BATCH_SIZE):
+        """
+        Bitmasks (uint64 array) for many texts. Texts are sorted by length
+        and scanned in batches, so each step advances every still-running
+        text in the batch by one character in a single numpy gather.
+        Missing values (NaN/None) scan as empty text.
+        """
+        lowered = [text.lower() if isinstance(text, str) else '' for text in texts]
+        lengths = np.fromiter(map(len, lowered), dtype=np.int64, count=len(lowered))
+        masks = np.zeros(len(lowered), dtype=np.uint64)
+        order = np.argsort(lengths, kind='stable')
+
+        for start in range(0, len(order), batch_size):
+            rows = order[start:start + batch_size]
+            row_lengths = lengths[rows]
+            width = int(row_lengths[-1]) if len(rows) else 0
+            if width == 0:
+                continue
+
+            codes = np.frombuffer("".join(lowered[i] for i in rows).encode('utf-32-le'), dtype=np.uint32)
+            symbols = np.zeros(len(codes), dtype=np.int32)
+            known = codes < len(self._symbol_of_code)
+            symbols[known] = self._symbol_of_code[codes[known]]
+
+            # Texts stay packed end to end (memory is linear in the characters,
+            # however long one post is). Rows are shortest first, so the rows
+            # still running at a position are always a suffix.
+            offsets = np.concatenate([[0], np.cumsum(row_lengths)[:-1]])
+            first_active = np.searchsorted(row_lengths, np.arange(width), side='right')
+
+            state = np.zeros(len(rows), dtype=np.int64)  # state * n_symbols
+            found = np.zeros(len(rows), dtype=np.uint64)
+            for pos in range(width):
+                lo = first_active[pos]
+                active = state[lo:]
+                active += symbols.take(offsets[lo:] + pos)
+                state[lo:] = self._transitions.take(active)
+                found[lo:] |= self._output_bits.take(state[lo:])
+            masks[rows] = found
+        return masks
+
+
+_default_matcher = None
+
+
+def default_matcher():
+    """Shared matcher for the built-in SI + NSSI lexicon (built on first use)"""
+    global _default_matcher
+    if _default_matcher is None:
+        _default_matcher = KeywordMatcher(LABEL_LEXICON)
+    return _default_matcher
+
+
+def relabel_frame(df, matcher, text_column='combined_text', batch_size=DEFAULT_BATCH_SIZE):
+    """Add si_categories (';'-joined), has_si and has_nssi columns to a DataFrame of posts"""
+    masks = matcher.scan_batch(df[text_column].tolist(), batch_size)
+    si_mask = np.uint64(matcher.mask_of([c for c in matcher.categories if c != NSSI_CATEGORY]))
+    nssi_mask = np.uint64(matcher.mask_of([NSSI_CATEGORY]) if NSSI_CATEGORY in matcher.categories else 0)
+
+    decoded = {}
+    for mask in np.unique(masks):
+        decoded[mask] = ";".join(c for c in matcher.decode(mask) if c != NSSI_CATEGORY)
+    df = df.copy()
+    df['si_categories'] = [decoded[mask] for mask in masks]
+    df['has_si'] = (masks & si_mask) != 0
+    df['has_nssi'] = (masks & nssi_mask) != 0
+    return df
+
+
+def main():
+    import pandas as pd
+
+    parser = argparse.ArgumentParser(description="Re-run SI/NSSI keyword matching over a CSV of posts.")
+    parser.add_argument("input", help="CSV with a text column.")
+    parser.add_argument("output", help="Output CSV (input columns + si_categories, has_si, has_nssi).")
+    parser.add_argument("--lexicon", default=None,
+                        help="JSON {category: [phrases]} to use instead of the built-in lexicon "
+                             f"(the '{NSSI_CATEGORY}' category feeds has_nssi).")
+    parser.add_argument("--text-column", default="combined_text")
+    parser.add_argument("--chunk-size", type=int, default=200000, help="Rows read per chunk.")
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE)
+    args = parser.parse_args()
+
+    matcher = KeywordMatcher.from_json(args.lexicon) if args.lexicon else default_matcher()
+    print(f"🔎 {len(matcher.categories)} categories, {matcher.n_states:,} automaton states")
+
+    out_dir = os.path.dirname(args.output)
+    if out_dir:
+        os.makedirs(out_dir, exist_ok=True)
+
+    start = time.perf_counter()
+    total, with_si, with_nssi = 0, 0, 0
+    for i, chunk in enumerate(pd.read_csv(args.input, chunksize=args.chunk_size)):
+        labeled = relabel_frame(chunk, matcher, args.text_column, args.batch_size)
+        labeled.to_csv(args.output, mode='w' if i == 0 else 'a', header=(i == 0), index=False)
+        total += len(labeled)
+        with_si += int(labeled['has_si'].sum())
+        with_nssi += int(labeled['has_nssi'].sum())
+    elapsed = time.perf_counter() - start
+
+    print(f"✅ Matched {total:,} posts in {elapsed:.1f}s ({total / elapsed if elapsed else 0:,.0f} posts/s)")
+    print(f"   SI keywords: {with_si:,}, NSSI keywords: {with_nssi:,}")
+    print(f"💾 Saved to: {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,6 +1,9 @@
 import os, json, glob, argparse, sys
 from datetime import datetime
 
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from profiling import profiled
+
 RAW_DIR = "/home/paras9o9/my-code/data/raw"
 MERGED_JSON = "data/merged/all_posts.json"
 
@@ -129,6 +132,7 @@ def find_raw_files():
     
     return json_files
     
+@profiled('merge_incremental', count=lambda new_count: new_count)
 def merge_incremental(export_csv_flag=False):
     existing = load_existing_merged()
     meta= load_meta()
@@ -183,6 +187,7 @@ def merge_incremental(export_csv_flag=False):
             print(f"CSV written: {MERGED_CSV}")
     else:
         print(f"No new posts found. Total remains: {len(merged)}")
+    return new_count
 
 def main():
     parser = argparse.ArgumentParser(description="Incrementally merge raw Reddit collections into a single dateset.")
@@ -0,0 +1,268 @@
+import os
+import time
+import sqlite3
+import hashlib
+import argparse
+import threading
+from concurrent.futures import Future, ProcessPoolExecutor
+
+from PIL import Image
+import pytesseract
+
+DEFAULT_CACHE_PATH = 'data/processed/ocr_cache.sqlite'
+DEFAULT_WORKERS = max(1, (os.cpu_count() or 2) - 1)
+
+
+def content_hash(image_path):
+    """sha256 of the image bytes: the same meme reposted under another URL/post ID hashes the same"""
+    digest = hashlib.sha256()
+    with open(image_path, 'rb') as f:
+        for block in iter(lambda: f.read(1024 * 1024), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def prepare_image(img, max_side=None, grayscale=False):
+    """Optionally shrink so the longer side is at most max_side and drop color before OCR"""
+    if grayscale:
+        img = img.convert('L')
+    if max_side and max(img.size) > max_side:
+        img = img.copy()
+        img.thumbnail((max_side, max_side), Image.LANCZOS)
+    return img
+
+
+def ocr_file(image_path, max_side=None, grayscale=False):
+    """Run in a worker process: open, prepare and OCR one image"""
+    with Image.open(image_path) as img:
+        return pytesseract.image_to_string(prepare_image(img, max_side, grayscale))
+
+
+class OCRCache:
+    """
+    Persistent {content hash + OCR options: text} store in SQLite, so a
+    repost is never OCR'd twice, across runs as well as within one.
+    """
+
+    def __init__(self, path=DEFAULT_CACHE_PATH):
+        self.path = path
+        out_dir = os.path.dirname(path)
+        if out_dir:
+            os.makedirs(out_dir, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("CREATE TABLE IF NOT EXISTS ocr (key TEXT PRIMARY KEY, text TEXT NOT NULL, "
+                           "created REAL NOT NULL)")
+        self._conn.commit()
+
+    def get(self, key):
+        with self._lock:
+            row = self._conn.execute("SELECT text FROM ocr WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else None
+
+    def put(self, key, text):
+        with self._lock:
+            self._conn.execute("INSERT OR REPLACE INTO ocr (key, text, created) VALUES (?, ?, ?)",
+                               (key, text, time.time()))
+            self._conn.commit()
+
+    def __len__(self):
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM ocr").fetchone()[0]
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+class OCRPipeline:
+    """
+    OCR stage that runs beside collection:
+
+        ocr = OCRPipeline(workers=3, max_side=1600, grayscale=True)
+        text_future = ocr.submit(path)                       # or
+        text_future = ocr.submit_download(download_future)   # chain after ImageDownloader
+        ...
+        meme_text = text_future.result()
+
+    Images go to a process pool through a bounded queue (submit() blocks
+    while max_pending images are waiting or being OCR'd). Results are
+    cached by content hash; identical images submitted while one is still
+    in flight share its result. Returned futures never raise: an OCR error
+    resolves to "" (as extract_text_from_image does) and a failed
+    download to None.
+    """
+
+    def __init__(self, workers=DEFAULT_WORKERS, max_pending=None, max_side=None, grayscale=False,
+                 cache_path=DEFAULT_CACHE_PATH, delete_after=True):
+        self.max_side = max_side
+        self.grayscale = grayscale
+        self.delete_after = delete_after
+        self.cache = OCRCache(cache_path) if cache_path else None
+        self._executor = ProcessPoolExecutor(max_workers=workers)
+        self._slots = threading.BoundedSemaphore(max_pending or workers * 2)
+        self._lock = threading.Lock()
+        self._in_flight = {}
+        self._stats = {'submitted': 0, 'cache_hits': 0, 'shared_in_flight': 0, 'ocr_runs': 0, 'errors': 0}
+        self._ocr_seconds = 0.0
+
+    def _key(self, digest):
+        return f"{digest}:{self.max_side or 0}:{int(self.grayscale)}"
+
+    def _count(self, name):
+        with self._lock:
+            self._stats[name] += 1
+
+    def _discard(self, image_path):
+        if self.delete_after and os.path.exists(image_path):
+            try:
+                os.remove(image_path)
+            except OSError as e:
+                print(f"Error deleting image: {e}")
+
+    def submit(self, image_path):
+        result = Future()
+        self._count('submitted')
+        try:
+            key = self._key(content_hash(image_path))
+        except OSError as e:
+            print(f"OCR error for {image_path}: {e}")
+            self._count('errors')
+            result.set_result("")
+            return result
+
+        cached = self.cache.get(key) if self.cache is not None else None
+        if cached is not None:
+            self._count('cache_hits')
+            self._discard(image_path)
+            result.set_result(cached)
+            return result
+
+        # Claim the key before waiting for a slot, so a duplicate submitted meanwhile shares this result
+        with self._lock:
+            shared = self._in_flight.get(key)
+            if shared is None:
+                self._in_flight[key] = result
+            else:
+                self._stats['shared_in_flight'] += 1
+        if shared is not None:
+            self._discard(image_path)
+            return shared
+
+        self._slots.acquire()
+        started = time.perf_counter()
+        try:
+            task = self._executor.submit(ocr_file, image_path, self.max_side, self.grayscale)
+        except Exception as e:
+            # Resolve the claimed key too, or duplicates sharing it would wait forever
+            self._slots.release()
+            print(f"OCR error for {image_path}: {e}")
+            self._count('errors')
+            with self._lock:
+                self._in_flight.pop(key, None)
+            result.set_result("")
+            return result
+
+        def done(task):
+            self._slots.release()
+            try:
+                text = task.result()
+                if self.cache is not None:
+                    self.cache.put(key, text)
+                self._count('ocr_runs')
+            except Exception as e:
+                print(f"OCR error for {image_path}: {e}")
+                self._count('errors')
+                text = ""
+            with self._lock:
+                self._ocr_seconds += time.perf_counter() - started
+                self._in_flight.pop(key, None)
+            self._discard(image_path)
+            result.set_result(text)
+
+        task.add_done_callback(done)
+        return result
+
+    def submit_download(self, download_future):
+        """
+        OCR the file a download future produces, as soon as it lands.
+        The hand-off runs as the download future's callback, i.e. in the
+        downloader's worker thread: it hashes the file there and, while
+        max_pending images are already queued for OCR, blocks that thread
+        until a slot frees. That stall is the intended backpressure - the
+        downloader cannot run ahead of OCR and fill the disk with images.
+        """
+        result = Future()
+
+        def chain(download):
+            image_path = download.result() if download.exception() is None else None
+            if not image_path:
+                result.set_result(None)
+                return
+            try:
+                ocr = self.submit(image_path)
+            except Exception as e:
+                print(f"OCR error for {image_path}: {e}")
+                self._count('errors')
+                result.set_result("")
+                return
+            ocr.add_done_callback(lambda ocr: result.set_result(ocr.result()))
+
+        download_future.add_done_callback(chain)
+        return result
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self._stats)
+            stats['ocr_seconds'] = self._ocr_seconds
+        stats['cache_hit_rate'] = (stats['cache_hits'] + stats['shared_in_flight']) / stats['submitted'] \
+            if stats['submitted'] else 0.0
+        return stats
+
+    def print_stats(self):
+        s = self.stats()
+        print(f"🔤 OCR: {s['submitted']} images, {s['ocr_runs']} OCR'd, {s['cache_hits']} cached, "
+              f"{s['shared_in_flight']} duplicates in flight, {s['errors']} errors "
+              f"({s['cache_hit_rate']:.0%} reused)")
+
+    def close(self):
+        self._executor.shutdown(wait=True)
+        if self.cache is not None:
+            self.cache.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+        return False
+
+
+def main():
+    parser = argparse.ArgumentParser(description="OCR a directory of images through the cached OCR pool.")
+    parser.add_argument("image_dir", help="Directory of images (files are kept).")
+    parser.add_argument("--workers", type=int, default=DEFAULT_WORKERS)
+    parser.add_argument("--max-side", type=int, default=None, help="Downscale so the longer side is at most this.")
+    parser.add_argument("--grayscale", action="store_true")
+    parser.add_argument("--cache", default=DEFAULT_CACHE_PATH, help="SQLite cache path ('' to disable).")
+    args = parser.parse_args()
+
+    extensions = ('.jpg', '.jpeg', '.png', '.gif', '.webp')
+    paths = sorted(os.path.join(args.image_dir, name) for name in os.listdir(args.image_dir)
+                   if name.lower().endswith(extensions))
+    print(f"🖼️ {len(paths)} images in {args.image_dir}")
+
+    start = time.perf_counter()
+    with OCRPipeline(args.workers, max_side=args.max_side, grayscale=args.grayscale,
+                     cache_path=args.cache or None, delete_after=False) as ocr:
+        futures = [ocr.submit(path) for path in paths]
+        texts = [future.result() for future in futures]
+        elapsed = time.perf_counter() - start
+        ocr.print_stats()
+
+    print(f"✅ {sum(bool(t and t.strip()) for t in texts)} images with text in {elapsed:.1f}s "
+          f"({len(paths) / elapsed if elapsed else 0:.1f} images/s)")
+
+
+if __name__ == "__main__":
+    main()
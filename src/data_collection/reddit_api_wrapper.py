@@ -1,22 +1,41 @@
 import praw
-import requests
 from PIL import Image
 import pytesseract
-import os, time, json
+import os, sys, time, json
 from datetime import datetime
 from dotenv import load_dotenv
-from prawcore import ResponseException, RequestException
+from prawcore import ResponseException, RequestException, Requestor
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from profiling import profiled
+from keyword_matcher import default_matcher, NSSI_CATEGORY
+from image_downloader import ImageDownloader, fetch, image_path, shared_session
+from ocr_pipeline import OCRPipeline
+from image_dedup import DedupIndex
+from collection_scheduler import AdaptiveRateLimiter, collect_concurrently
 
 ### Loading environment var ###
 load_dotenv()
 
+### Routing every Reddit API request through a shared rate limiter ###
+class RateLimitedRequestor(Requestor):
+    def __init__(self, *args, limiter=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.limiter = limiter
+
+    def request(self, *args, **kwargs):
+        send = lambda: super(RateLimitedRequestor, self).request(*args, **kwargs)
+        return self.limiter.call(send) if self.limiter is not None else send()
+
 ### Authenticating Reddit API ###
-def get_reddit_instance():
+def get_reddit_instance(limiter=None):
     try:
         reddit = praw.Reddit(
             client_id=os.getenv('REDDIT_CLIENT_ID'),
             client_secret=os.getenv('REDDIT_CLIENT_SECRET'),
-            user_agent=os.getenv('REDDIT_USER_AGENT')
+            user_agent=os.getenv('REDDIT_USER_AGENT'),
+            requestor_class=RateLimitedRequestor,
+            requestor_kwargs={'limiter': limiter}
         )
         reddit.user.me()
         print("Reddit authentication successful")
@@ -28,71 +47,16 @@ def get_reddit_instance():
 
 ### SI keywords filtering for r/depression ###
 def contains_si_keywords(text):
-    si_keywords = {
-        # Direct/Active SI expressions
-        'direct': [
-            'kill myself', 'end my life', 'suicidal', 'suicide', 'take my own life', 
-            'end it all', 'attempted suicide', 'plan to die', 'commit suicide',
-            'killing myself', 'hang myself', 'shoot myself', 'overdose'
-        ],
-        
-        # Passive SI expressions (death wishes without active plan)
-        'passive': [
-            'don\'t want to live', 'no reason to live', 'better off dead',
-            'wish i was dead', 'wish i were dead', 'hope i don\'t wake up',
-            'don\'t want to exist', 'don\'t want to be here', 'no longer here',
-            'cease to exist', 'sleep forever', 'not wake up', 'leave this world',
-            'want to disappear', 'just disappear', 'don\'t see the point',
-            'no point in living', 'life has no meaning', 'no purpose', 
-            'tired of living', 'exhausted from living', 'can\'t keep living'
-        ],
-        
-        # Indirect/coded expressions
-        'indirect': [
-            'unalive', 'final message', 'goodbye note', 'last post',
-            'this is it', 'end tonight', 'won\'t be here tomorrow',
-            'just want to be done', 'want it all to stop', 'can\'t do this anymore',
-            'can\'t keep doing this', 'give up on life', 'checked out',
-            'want to go home', 'ready to go', 'time to go'
-        ],
-        
-        # Worthlessness and burden themes (strong SI indicators)
-        'burden': [
-            'life isn\'t worth it', 'better off without me', 'burden to everyone',
-            'nobody needs me', 'waste of space', 'ruin everything', 'world without me',
-            'everyone would be better', 'shouldn\'t exist', 'mistake to be born'
-        ],
-        
-        # Preparation/planning behaviors
-        'preparation': [
-            'planned everything', 'set date', 'can\'t be stopped',
-            'giving away things', 'delete account', 'last day',
-            'made arrangements', 'got everything ready', 'writing goodbye'
-        ],
-        
-        # Regional language phrases
-        'hindi': [
-            'chhod dena hai sab', 'khatam karna hai', 'ab aur nahi',
-            'mar jaunga', 'mar jaungi', 'jaane ka time aa gaya',
-            'jee nahi sakta', 'zinda nahi rehna'
-        ]
-    }
-
-    text_lower = text.lower()
-    matched_categories = []
-
-    for category, keywords in si_keywords.items():
-        for keyword in keywords:
-            if keyword in text_lower:
-                matched_categories.append(category)
-                break
+    matched_categories = [category for category in default_matcher().matches(text)
+                          if category != NSSI_CATEGORY]
     return len(matched_categories) > 0, matched_categories
 
 def calculate_si_confidence(text, title, subreddit_name):
-    combined_text = f"{title} {text}".lower()
-    has_si, categories = contains_si_keywords(combined_text)
+    _, categories = contains_si_keywords(f"{title} {text}")
+    return si_confidence_from_categories(categories, subreddit_name)
 
-    if not has_si:
+def si_confidence_from_categories(categories, subreddit_name):
+    if not categories:
         return 0.0
 
     weights = {
@@ -123,30 +87,20 @@ def calculate_si_confidence(text, title, subreddit_name):
     return round(confidence, 2)
 
 def contains_graphic_selfharm(text):
-
-    nssi_only_keywords = [
-        'cutting myself', 'burned myself', 'scratched myself',
-        'hit myself', 'pulled my hair', 'bruised myself',
-        'harm scars', 'self injury tools', 'cutting tools',
-        'fresh cuts', 'blood from'
-    ]
-
-    text_lower = text.lower()
-
-    has_nssi = any(keyword in text_lower for keyword in nssi_only_keywords)
-    has_si, _ = contains_si_keywords(text)
-
-    return has_nssi and not has_si
+    categories = default_matcher().matches(text)
+    return categories == [NSSI_CATEGORY]
 
 ### Assigning preliminary label based on subreddit and content ###
 def get_preliminary_label(subreddit_name, title, text):
 
-    combined_text = f"{title} {text}"
+    # One scan of the post finds both the SI categories and NSSI phrases
+    categories = default_matcher().matches(f"{title} {text}")
+    si_categories = [category for category in categories if category != NSSI_CATEGORY]
 
-    si_confidence = calculate_si_confidence(text, title, subreddit_name)
+    si_confidence = si_confidence_from_categories(si_categories, subreddit_name)
 
     if subreddit_name in ['selfharm', 'AdultSelfHarm']:
-        if contains_graphic_selfharm(combined_text):
+        if categories == [NSSI_CATEGORY]:
             return 'NSSI_FILTERED', 0.0
         
     if subreddit_name == 'SuicideWatch':
@@ -191,17 +145,9 @@ def is_image_url(url):
 
 def download_image(url, subreddit_name, post_id, image_dir='data/images'):
     os.makedirs(image_dir, exist_ok=True)
-    filename = f"{subreddit_name}_{post_id}{os.path.splitext(url)[-1]}"
-    filepath = os.path.join(image_dir, filename)
-    try:
-        response = requests.get(url, timeout=10)
-        if response.status_code == 200:
-            with open(filepath, 'wb') as f:
-                f.write(response.content)
-            return filepath
-    except Exception as e:
-        print(f"Error downloading image: {e}")
-    return None
+    filepath = image_path(url, subreddit_name, post_id, image_dir)
+    result, _ = fetch(shared_session(), url, filepath)
+    return filepath if result in ('downloaded', 'skipped') else None
 
 def extract_text_from_image(image_path):
     if not image_path or not os.path.exists(image_path):
@@ -233,8 +179,12 @@ def extract_text_from_image(image_path):
         return ""
 
 ### Collecting subreddit posts ###
-def collect_subreddit_posts(reddit, subreddit_name, limit=10, delay=0.5, sorting_modes=['hot', 'new']):
+@profiled('collect_subreddit_posts', count=len)
+def collect_subreddit_posts(reddit, subreddit_name, limit=10, delay=0.5, sorting_modes=['hot', 'new'],
+                            downloader=None, ocr=None, dedup=None):
     posts = []
+    pending_images = []
+    image_only_ids = set()
 
     min_lengths = {
         'SuicideWatch': 100,
@@ -310,10 +260,29 @@ def collect_subreddit_posts(reddit, subreddit_name, limit=10, delay=0.5, sorting
 
                 # Handle images
                 meme_text = None
+                image_future = None
                 if is_image_post:
-                    image_file = download_image(submission.url, subreddit_name, submission.id)
-                    if image_file:
-                        meme_text = extract_text_from_image(image_file)
+                    image_key = f"{subreddit_name}_{submission.id}"
+                    if not has_valid_text:
+                        image_only_ids.add(submission.id)
+                    if downloader is not None:
+                        image_future = downloader.submit(submission.url, subreddit_name, submission.id)
+                        if dedup is not None:
+                            image_future = dedup.screen(image_future, image_key)
+                        if ocr is not None:
+                            image_future = ocr.submit_download(image_future)
+                    else:
+                        image_file = download_image(submission.url, subreddit_name, submission.id)
+                        if image_file and dedup is not None and dedup.check_file(image_file, image_key):
+                            os.remove(image_file)
+                            image_file = None
+                            if not has_valid_text:
+                                print(f"Filtered: DUPLICATE_IMAGE - {submission.title[:50]}...")
+                                continue
+                        if image_file and ocr is not None:
+                            image_future = ocr.submit(image_file)
+                        elif image_file:
+                            meme_text = extract_text_from_image(image_file)
 
                 post_text = submission.selftext if submission.selftext else ""
 
@@ -336,6 +305,8 @@ def collect_subreddit_posts(reddit, subreddit_name, limit=10, delay=0.5, sorting
                 'collection_date': datetime.now().isoformat()
                 }
                 posts.append(post_data)
+                if image_future is not None:
+                    pending_images.append((post_data, image_future))
                 
                 confidence_marker = f"[{confidence:.2f}]" if confidence > 0 else ""
                 print(f"[{prelim_label}]{confidence_marker} Title: {submission.title[:60]}...")
@@ -351,6 +322,23 @@ def collect_subreddit_posts(reddit, subreddit_name, limit=10, delay=0.5, sorting
         print(f"API Error for r/{subreddit_name}: {e}")
     except Exception as e:
         print(f"Unexpected error for r/{subreddit_name}: {e}")
+
+    # Images were downloaded (and OCR'd, with an OCR pool) in the background while posts were fetched
+    for post_data, image_future in pending_images:
+        result = image_future.result()
+        if ocr is not None:
+            post_data['meme_text'] = result
+        elif result:
+            post_data['meme_text'] = extract_text_from_image(result)
+
+    # Image-only posts whose image near-duplicates one already collected add nothing new
+    if dedup is not None:
+        duplicates = {post['id'] for post in posts
+                      if post['id'] in image_only_ids and dedup.is_duplicate(f"{subreddit_name}_{post['id']}")}
+        if duplicates:
+            print(f"Filtered: {len(duplicates)} DUPLICATE_IMAGE posts")
+            posts = [post for post in posts if post['id'] not in duplicates]
+
     print(f"Collected {len(posts)} valid posts from r/{subreddit_name}")
     return posts
 
@@ -396,7 +384,9 @@ def save_posts_to_json(posts, subreddit_name, data_dir="data/raw"):
 
 ### Main function to collect posts from multiple subreddit 
 def main():
-    reddit = get_reddit_instance()
+    # One limiter sized to the API quota paces every request from every worker
+    limiter = AdaptiveRateLimiter()
+    reddit = get_reddit_instance(limiter)
     if not reddit:
         print("Cannot proceed without Reddit connection")
         return
@@ -416,11 +406,27 @@ def main():
 
 
     all_collected_posts = {}
+    downloader = ImageDownloader()
+    ocr = OCRPipeline()
+    dedup = DedupIndex()
 
-    for subreddit_name in all_subreddit:
+    jobs = [(subreddit_name, ['hot', 'new'] if subreddit_name in ['SuicideWatch', 'selfharm', 'AdultSelfHarm'] else ['hot'])
+            for subreddit_name in all_subreddit]
+    # PRAW instances are not thread-safe: each worker gets its own, all sharing the limiter.
+    # The instance that passed the connection check above goes to the first worker.
+    spare = [reddit]
+
+    def reddit_factory():
+        try:
+            return spare.pop()
+        except IndexError:
+            return get_reddit_instance(limiter)
+
+    results = collect_concurrently(reddit_factory, jobs, collect_subreddit_posts,
+                                   limit=50, delay=0, downloader=downloader, ocr=ocr, dedup=dedup)
 
-        sorting_modes = ['hot', 'new'] if subreddit_name in ['SuicideWatch', 'selfharm', 'AdultSelfHarm'] else ['hot']
-        posts = collect_subreddit_posts(reddit, subreddit_name, limit=50, sorting_modes=sorting_modes)
+    for subreddit_name in all_subreddit:
+        posts = results[subreddit_name]
 
         if posts:
             filepath = save_posts_to_json(posts, subreddit_name)
@@ -446,7 +452,8 @@ def main():
                 'si_candidates': 0
             }
 
-        time.sleep(2)
+    downloader.close()
+    ocr.close()
 
     print("\n" + "="*70)
     print("COLLECTION SUMMARY")
@@ -481,6 +488,11 @@ def main():
         print("   These posts show SI signals and should be manually validated.")
 
     print(f"\nTotal posts collected: {total_posts}")
+    downloader.print_stats()
+    ocr.print_stats()
+    dedup.print_stats()
+    dedup.close()
+    print(f"🌐 API: {limiter.stats['requests']} requests, {limiter.stats['throttled']} throttled (429)")
     print("="*70)
     print("Data collection complete!")
 
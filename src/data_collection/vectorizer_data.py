@@ -1,57 +1,47 @@
 import pandas as pd
 import numpy as np
-import re
 import pickle
-import nltk
+import sys
+import time
+import argparse
 from sklearn.feature_extraction.text import TfidfVectorizer
-from nltk.corpus import stopwords
 import os # Import the os module for directory operations
 
-# Ensure NLTK resources are available
-nltk.download('stopwords')
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from text_preprocessing import preprocess_parallel, DEFAULT_PREPROCESS_CHUNK_SIZE
+from feature_cache import FeatureCache, DEFAULT_CACHE_DIR
+from feature_store import save_features, DEFAULT_STORE_PATH, LEGACY_PICKLE_PATH
+import profiling
 
-def preprocess_text(text):
-    """
-    Implements the cleaning logic from your README:
-    - Lowercasing
-    - URL removal
-    - Preserving negations (clinical priority)
-    """
-    if not isinstance(text, str):
-        return ""
+# Config from your report: 5000 features, unigrams + bigrams
+VECTORIZER_PARAMS = dict(
+    max_features=5000,
+    ngram_range=(1, 2),
+    sublinear_tf=True  # Usually improves performance on text
+)
+VECTORIZER_PATH = 'models/tfidf_vectorizer.pkl'
 
-    # 1. Lowercasing
-    text = text.lower()
-
-    # 2. URL Removal
-    text = re.sub(r'http\S+|www\S+|https\S+', '', text, flags=re.MULTILINE)
-
-    # 3. User Mention/Reddit Cleanup (Basic)
-    text = re.sub(r'u/\S+', 'USER', text)
-    text = re.sub(r'r/\S+', 'SUBREDDIT', text)
-
-    # 4. Remove special characters/numbers (keep words only)
-    text = re.sub(r'[^a-zA-Z\s]', '', text)
-
-    # 5. Stopword Handling with Negation Preservation
-    # Standard English stopwords
-    stop_words = set(stopwords.words('english'))
-    # List of negations to KEEP (Critical for SI detection: "I do NOT want to live")
-    negations = {'no', 'not', 'nor', 'neither', 'never', "don't", "won't", "can't", "cannot"}
-
-    # Final stopword list = Standard - Negations
-    final_stop_words = stop_words - negations
-
-    words = text.split()
-    filtered_words = [w for w in words if w not in final_stop_words]
-
-    return " ".join(filtered_words)
+DEFAULT_INPUT = '/home/paras9o9/my-code/Suicidal-Ideation-Detection-using-Machine-Learning-/data/csv/SID_DATA_WITH_SPLITS.csv'
 
 def main():
+    parser = argparse.ArgumentParser(description="Preprocess and TF-IDF vectorize the labeled dataset.")
+    parser.add_argument("--input", default=DEFAULT_INPUT, help="Raw labeled CSV.")
+    parser.add_argument("--jobs", type=int, default=None, help="Preprocessing worker processes (default: all cores).")
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_PREPROCESS_CHUNK_SIZE,
+                        help="Maximum rows per preprocessing chunk.")
+    parser.add_argument("--legacy-pickle", action="store_true",
+                        help="Also write the old single-file features_tfidf.pkl.")
+    parser.add_argument("--cache-dir", default=DEFAULT_CACHE_DIR,
+                        help="Cache of cleaned text, fitted vectorizers and matrices.")
+    parser.add_argument("--no-cache", action="store_true", help="Always recompute everything.")
+    args = parser.parse_args()
+
     print("⏳ Loading Dataset...")
-    # REPLACE THIS with the path to your actual raw CSV
+    # REPLACE THIS with the path to your actual raw CSV (or pass --input)
     # Your dataset likely has columns like 'title' and 'body' or 'combined_text'
-    df = pd.read_csv('/home/paras9o9/my-code/Suicidal-Ideation-Detection-using-Machine-Learning-/data/csv/SID_DATA_WITH_SPLITS.csv')
+    with profiling.stage('vectorizer_data.load') as s:
+        df = pd.read_csv(args.input)
+        s.items = len(df)
 
     # Basic check: Ensure we have the text column
     # If your column is named 'text' or 'selftext', change 'combined_text' below
@@ -59,9 +49,6 @@ def main():
         print("⚠️ 'combined_text' column not found. Creating it from Title + Body...")
         df['combined_text'] = df['title'].fillna('') + " " + df['body'].fillna('')
 
-    print("🧹 Preprocessing Text (Preserving Negations)...")
-    df['clean_text'] = df['combined_text'].apply(preprocess_text)
-
     # Create directories if they don't exist
     os.makedirs('data/raw', exist_ok=True)
     os.makedirs('data/processed', exist_ok=True)
@@ -80,36 +67,64 @@ def main():
     print("✅ Saved 'data/raw/post_ids.csv'")
 
     # --- 2. TF-IDF Vectorization ---
-    print("🧮 Vectorizing Data (TF-IDF)...")
-    # Config from your report: 5000 features, unigrams + bigrams
-    vectorizer = TfidfVectorizer(
-        max_features=5000,
-        ngram_range=(1, 2),
-        sublinear_tf=True  # Usually improves performance on text
-    )
-
-    X = vectorizer.fit_transform(df['clean_text'])
-    y = df['prelim_label'].values
-
-    # --- 3. Save Features (Safe to Share) ---
-    print("💾 Saving Vectorized Features...")
-    output_path = 'data/processed/features_tfidf.pkl'
-
-    with open(output_path, 'wb') as f:
-        pickle.dump({
-            'X': X,
-            'y': y,
-            'feature_names': vectorizer.get_feature_names_out(),
-            'vocab': vectorizer.vocabulary_
-        }, f)
-
-    # Also save the vectorizer itself so you can use it on NEW data (demo)
-    with open('models/tfidf_vectorizer.pkl', 'wb') as f:
-        pickle.dump(vectorizer, f)
+    # Separate .npy arrays + manifest, memory-mappable by training and CV
+    output_path = DEFAULT_STORE_PATH
+    cache = None if args.no_cache else FeatureCache(VECTORIZER_PARAMS, args.cache_dir)
+    entry = cache.lookup(args.input) if cache else None
+
+    if entry:
+        # Same input file and same preprocessing/vectorizer config: nothing to recompute
+        print(f"♻️ Reusing cached features from {entry}")
+        data = FeatureCache.restore(entry, output_path, VECTORIZER_PATH)
+        X, y, feature_names = data['X'], data['y'], data['feature_names']
+        with open(VECTORIZER_PATH, 'rb') as f:
+            vectorizer = pickle.load(f)
+    else:
+        print("🧹 Preprocessing Text (Preserving Negations)...")
+        start = time.perf_counter()
+        with profiling.stage('vectorizer_data.preprocess') as s:
+            if cache:
+                df['clean_text'] = cache.clean(df['combined_text'], n_jobs=args.jobs, chunk_size=args.chunk_size)
+                s.items = cache.cleaned
+                print(f"   Cleaned {cache.cleaned:,} new posts, reused {cache.reused:,} cached "
+                      f"in {time.perf_counter() - start:.1f}s")
+            else:
+                df['clean_text'] = preprocess_parallel(df['combined_text'], n_jobs=args.jobs, chunk_size=args.chunk_size)
+                s.items = len(df)
+                print(f"   Cleaned {len(df):,} posts in {time.perf_counter() - start:.1f}s")
+
+        print("🧮 Vectorizing Data (TF-IDF)...")
+        with profiling.stage('vectorizer_data.vectorize', items=len(df)):
+            vectorizer = TfidfVectorizer(**VECTORIZER_PARAMS)
+            X = vectorizer.fit_transform(df['clean_text'])
+        y = df['prelim_label'].values
+        feature_names = vectorizer.get_feature_names_out()
+
+        # --- 3. Save Features (Safe to Share) ---
+        print("💾 Saving Vectorized Features...")
+        with profiling.stage('vectorizer_data.save', items=X.shape[0]):
+            save_features(output_path, X, y, feature_names)
+
+        # Also save the vectorizer itself so you can use it on NEW data (demo)
+        with open(VECTORIZER_PATH, 'wb') as f:
+            pickle.dump(vectorizer, f)
+
+        if cache:
+            cache.store(args.input, vectorizer, X, y, feature_names)
+
+    if args.legacy_pickle:
+        with open(LEGACY_PICKLE_PATH, 'wb') as f:
+            pickle.dump({
+                'X': X,
+                'y': y,
+                'feature_names': feature_names,
+                'vocab': vectorizer.vocabulary_
+            }, f)
+        print(f"✅ Saved legacy pickle to '{LEGACY_PICKLE_PATH}'")
 
     print(f"✅ Saved features to '{output_path}'")
     print(f"   Matrix Shape: {X.shape}")
-    print("🎉 Done! You can now safely upload 'post_ids.csv' and 'features_tfidf.pkl'.")
+    print("🎉 Done! You can now safely upload 'post_ids.csv' and 'features_tfidf/'.")
 
 if __name__ == "__main__":
     main()
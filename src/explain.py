@@ -0,0 +1,212 @@
+import html
+import re
+
+import numpy as np
+
+from compiled_model import is_ovr
+from text_preprocessing import preprocess_text, NON_ALPHA_PATTERN
+
+DEFAULT_NUM_FEATURES = 6
+DEFAULT_LIME_SAMPLES = 5000
+
+WORD_PATTERN = re.compile(r'\S+')
+
+
+def is_linear_model(model, vectorizer):
+    """Exact attribution is possible for linear models over a TF-IDF vectorizer"""
+    return hasattr(model, 'coef_') and hasattr(vectorizer, 'transform') and hasattr(vectorizer, 'vocabulary_')
+
+
+class Explanation:
+    """
+    Per-feature contributions toward one predicted label.
+    Mirrors the bits of lime's Explanation the app uses (as_list / as_html).
+    """
+
+    def __init__(self, text, label, probability, features, word_weights, method):
+        self.text = text
+        self.label = label
+        self.probability = probability
+        self.features = features          # [(feature, weight)] sorted by |weight|
+        self.word_weights = word_weights  # {normalized word: weight} for highlighting
+        self.method = method
+
+    def as_list(self):
+        return list(self.features)
+
+    def as_html(self):
+        return render_html(self)
+
+
+def linear_contributions(clean_text, model, vectorizer, label_index):
+    """
+    Exact per-feature contributions to the decision score of label_index:
+    tfidf_j * coef_[k, j]. For multinomial models, coefficients are centered
+    across classes (softmax is shift-invariant) so the weights read as
+    evidence for the label versus the others.
+    """
+    x = vectorizer.transform([clean_text]).tocsr()
+    coef = model.coef_
+    if hasattr(coef, 'toarray'):
+        coef = coef.toarray()
+
+    if coef.shape[0] == 1:
+        # Binary model: positive weights push toward classes_[1]
+        sign = 1.0 if label_index == 1 else -1.0
+        class_coef = sign * coef[0]
+    elif hasattr(model, 'predict_proba') and not is_ovr(model):
+        class_coef = coef[label_index] - coef.mean(axis=0)
+    else:
+        class_coef = coef[label_index]
+
+    feature_names = vectorizer.get_feature_names_out()
+    return [(feature_names[j], float(v * class_coef[j])) for j, v in zip(x.indices, x.data)]
+
+
+def _word_weights(features):
+    """Spread n-gram weights over their words (bigrams split evenly)"""
+    weights = {}
+    for feature, weight in features:
+        words = feature.split()
+        for word in words:
+            weights[word] = weights.get(word, 0.0) + weight / len(words)
+    return weights
+
+
+def explain_linear(text, model, vectorizer, num_features=DEFAULT_NUM_FEATURES, label=None):
+    """Exact attribution explanation for a linear TF-IDF model, in milliseconds"""
+    clean_text = preprocess_text(text)
+    probs = model.predict_proba(vectorizer.transform([clean_text]))[0]
+    classes = list(model.classes_)
+    label_index = int(np.argmax(probs)) if label is None else classes.index(label)
+
+    contributions = linear_contributions(clean_text, model, vectorizer, label_index)
+    contributions.sort(key=lambda fw: abs(fw[1]), reverse=True)
+
+    return Explanation(
+        text=text,
+        label=classes[label_index],
+        probability=float(probs[label_index]),
+        features=contributions[:num_features],
+        word_weights=_word_weights(contributions),
+        method='exact',
+    )
+
+
+_LIME_EXPLAINERS = {}
+
+
+def _get_lime_explainer(class_names):
+    """Reuse one LimeTextExplainer per class set instead of building one per click"""
+    key = tuple(class_names)
+    if key not in _LIME_EXPLAINERS:
+        from lime.lime_text import LimeTextExplainer
+        _LIME_EXPLAINERS[key] = LimeTextExplainer(class_names=list(class_names))
+    return _LIME_EXPLAINERS[key]
+
+
+def explain_lime(text, predict_proba_func, class_names, num_features=DEFAULT_NUM_FEATURES,
+                 num_samples=DEFAULT_LIME_SAMPLES):
+    """
+    Sampling-based LIME explanation for non-linear models (e.g. DistilBERT).
+    predict_proba_func maps a list of raw texts to a probability matrix.
+    num_samples is the perturbation budget; lower it to trade accuracy for speed.
+    """
+    explainer = _get_lime_explainer(class_names)
+    exp = explainer.explain_instance(
+        text,
+        predict_proba_func,
+        num_features=num_features,
+        top_labels=1,
+        num_samples=num_samples,
+    )
+    label_index = exp.available_labels()[0]
+    features = exp.as_list(label=label_index)
+    probs = exp.predict_proba
+
+    return Explanation(
+        text=text,
+        label=class_names[label_index],
+        probability=float(probs[label_index]),
+        features=features,
+        word_weights={w.lower(): weight for w, weight in features},
+        method='lime',
+    )
+
+
+def explain(text, model, vectorizer=None, num_features=DEFAULT_NUM_FEATURES,
+            num_samples=DEFAULT_LIME_SAMPLES, predict_proba_func=None):
+    """
+    Explain a prediction. Linear TF-IDF models get exact attributions;
+    anything else falls back to LIME with the given sample budget.
+    """
+    if predict_proba_func is None and vectorizer is not None and is_linear_model(model, vectorizer):
+        return explain_linear(text, model, vectorizer, num_features=num_features)
+
+    if predict_proba_func is None:
+        def predict_proba_func(texts):
+            return model.predict_proba(vectorizer.transform([preprocess_text(t) for t in texts]))
+
+    return explain_lime(text, predict_proba_func, list(model.classes_),
+                        num_features=num_features, num_samples=num_samples)
+
+
+def _color(weight, max_abs):
+    """Green for words supporting the label, red for words opposing it"""
+    alpha = 0.15 + 0.75 * (abs(weight) / max_abs) if max_abs > 0 else 0.0
+    if weight > 0:
+        return f"rgba(46, 160, 67, {alpha:.2f})"
+    return f"rgba(218, 54, 51, {alpha:.2f})"
+
+
+def render_html(explanation):
+    """Word-importance bars plus the highlighted text, as a standalone HTML page"""
+    features = explanation.features
+    max_abs = max((abs(w) for _, w in features), default=0.0)
+
+    bars = []
+    for feature, weight in features:
+        width = int(100 * abs(weight) / max_abs) if max_abs > 0 else 0
+        bars.append(
+            f'<tr><td class="feat">{html.escape(feature)}</td>'
+            f'<td><div class="bar" style="width:{width}%;background:{_color(weight, max_abs)}"></div></td>'
+            f'<td class="num">{weight:+.3f}</td></tr>'
+        )
+
+    highlight_weights = explanation.word_weights
+    top_words = set()
+    for feature, _ in features:
+        top_words.update(feature.lower().split())
+    max_word = max((abs(highlight_weights.get(w, 0.0)) for w in top_words), default=0.0)
+
+    pieces = []
+    last = 0
+    for match in WORD_PATTERN.finditer(explanation.text):
+        word = match.group()
+        key = NON_ALPHA_PATTERN.sub('', word.lower())
+        pieces.append(html.escape(explanation.text[last:match.start()]))
+        if key in top_words and key in highlight_weights:
+            weight = highlight_weights[key]
+            pieces.append(
+                f'<span style="background:{_color(weight, max_word)}" '
+                f'title="{weight:+.3f}">{html.escape(word)}</span>'
+            )
+        else:
+            pieces.append(html.escape(word))
+        last = match.end()
+    pieces.append(html.escape(explanation.text[last:]))
+
+    method = "exact linear attribution" if explanation.method == 'exact' else "LIME"
+    return f"""<html><head><meta charset="utf-8"><style>
+body {{ font-family: sans-serif; font-size: 14px; }}
+table {{ border-collapse: collapse; width: 100%; }}
+td {{ padding: 3px 6px; }}
+td.feat {{ white-space: nowrap; width: 25%; }}
+td.num {{ text-align: right; width: 10%; font-family: monospace; }}
+.bar {{ height: 14px; border-radius: 3px; }}
+.text {{ line-height: 1.8; margin-top: 12px; white-space: pre-wrap; }}
+</style></head><body>
+<div><b>Prediction:</b> {html.escape(str(explanation.label))} ({explanation.probability:.1%}) &middot; <i>{method}</i></div>
+<table>{''.join(bars)}</table>
+<div class="text">{''.join(pieces)}</div>
+</body></html>"""
@@ -0,0 +1,127 @@
+import os
+import json
+import pickle
+import shutil
+import hashlib
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+import text_preprocessing
+from text_preprocessing import preprocess_parallel, DEFAULT_PREPROCESS_CHUNK_SIZE
+from model_assets import file_fingerprint
+from feature_store import save_features, load_features, is_feature_store
+
+DEFAULT_CACHE_DIR = os.path.join('data', 'processed', 'vectorizer_cache')
+CLEAN_TEXT_FILENAME = 'clean_text.pkl'
+VECTORIZER_FILENAME = 'vectorizer.pkl'
+FEATURES_DIRNAME = 'features'
+
+
+def preprocessing_config():
+    """Everything that determines preprocess_text's output"""
+    return {
+        'url_pattern': text_preprocessing.URL_PATTERN.pattern,
+        'user_pattern': text_preprocessing.USER_PATTERN.pattern,
+        'subreddit_pattern': text_preprocessing.SUBREDDIT_PATTERN.pattern,
+        'non_alpha_pattern': text_preprocessing.NON_ALPHA_PATTERN.pattern,
+        'stop_words': sorted(text_preprocessing.STOP_WORDS),
+    }
+
+
+def config_key(config):
+    payload = json.dumps(config, sort_keys=True, default=list)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()[:16]
+
+
+def row_hashes(texts):
+    """64-bit content hash of every raw text (position independent)"""
+    return pd.util.hash_pandas_object(pd.Series(texts).fillna('').astype(str), index=False).values
+
+
+class FeatureCache:
+    """
+    Content-addressed cache for vectorizer_data.py.
+
+    Cleaned text is stored per preprocessing config and keyed by each raw
+    row's content hash, so when the input grows (or a few rows change) only
+    the new rows are cleaned. Fitted vectorizer + feature matrix are stored
+    per (preprocessing + vectorizer config, input file fingerprint) and
+    reused as-is on an exact hit.
+    """
+
+    def __init__(self, vectorizer_params, cache_dir=DEFAULT_CACHE_DIR):
+        preprocessing = preprocessing_config()
+        self.clean_dir = os.path.join(cache_dir, config_key(preprocessing))
+        self.config = {'preprocessing': preprocessing, 'vectorizer': vectorizer_params}
+        self.features_root = os.path.join(self.clean_dir, config_key(self.config))
+        self.cleaned = 0
+        self.reused = 0
+
+    def _entry_dir(self, input_fingerprint):
+        return os.path.join(self.features_root, input_fingerprint[:16])
+
+    def lookup(self, input_path):
+        """Cache entry dir for this exact input + config, or None on a miss"""
+        entry = self._entry_dir(file_fingerprint(input_path))
+        if is_feature_store(os.path.join(entry, FEATURES_DIRNAME)) and \
+                os.path.exists(os.path.join(entry, VECTORIZER_FILENAME)):
+            return entry
+        return None
+
+    def _load_clean_map(self):
+        path = os.path.join(self.clean_dir, CLEAN_TEXT_FILENAME)
+        if not os.path.exists(path):
+            return {}
+        with open(path, 'rb') as f:
+            return pickle.load(f)
+
+    def _save_clean_map(self, clean_map):
+        os.makedirs(self.clean_dir, exist_ok=True)
+        path = os.path.join(self.clean_dir, CLEAN_TEXT_FILENAME)
+        tmp_path = path + '.tmp'
+        with open(tmp_path, 'wb') as f:
+            pickle.dump(clean_map, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, path)
+
+    def clean(self, texts, n_jobs=None, chunk_size=DEFAULT_PREPROCESS_CHUNK_SIZE):
+        """
+        Cleaned texts in input order (Series with the same index). Rows whose
+        raw content was cleaned before are reused; only the rest go through
+        preprocess_parallel.
+        """
+        texts = pd.Series(texts)
+        hashes = row_hashes(texts)
+        clean_map = self._load_clean_map()
+
+        missing = np.array([h not in clean_map for h in hashes.tolist()], dtype=bool)
+        if missing.any():
+            # Clean each unseen text once, even if it repeats in the input
+            new_hashes, first = np.unique(hashes[missing], return_index=True)
+            new_texts = texts[missing].iloc[first]
+            new_clean = preprocess_parallel(new_texts.reset_index(drop=True), n_jobs=n_jobs, chunk_size=chunk_size)
+            clean_map.update(zip(new_hashes.tolist(), new_clean.tolist()))
+            self._save_clean_map(clean_map)
+
+        self.cleaned = int(missing.sum())
+        self.reused = len(texts) - self.cleaned
+        return pd.Series([clean_map[h] for h in hashes.tolist()], index=texts.index)
+
+    def store(self, input_path, vectorizer, X, y, feature_names):
+        entry = self._entry_dir(file_fingerprint(input_path))
+        os.makedirs(entry, exist_ok=True)
+        save_features(os.path.join(entry, FEATURES_DIRNAME), X, y, feature_names)
+        with open(os.path.join(entry, VECTORIZER_FILENAME), 'wb') as f:
+            pickle.dump(vectorizer, f)
+        with open(os.path.join(entry, 'config.json'), 'w', encoding='utf-8') as f:
+            json.dump({'input': os.path.abspath(input_path), 'created': datetime.now().isoformat(),
+                       'vectorizer': self.config['vectorizer']}, f, indent=2, default=list)
+        return entry
+
+    @staticmethod
+    def restore(entry, features_path, vectorizer_path):
+        """Copy a cached entry's features and vectorizer to their usual output paths"""
+        shutil.copytree(os.path.join(entry, FEATURES_DIRNAME), features_path, dirs_exist_ok=True)
+        shutil.copyfile(os.path.join(entry, VECTORIZER_FILENAME), vectorizer_path)
+        return load_features(features_path)
@@ -0,0 +1,141 @@
+import os
+import json
+import pickle
+import argparse
+from datetime import datetime
+
+import numpy as np
+import scipy.sparse as sp
+
+FEATURE_STORE_FORMAT = 'sid-feature-store'
+FEATURE_STORE_VERSION = 1
+MANIFEST_FILENAME = 'manifest.json'
+DEFAULT_STORE_PATH = os.path.join('data', 'processed', 'features_tfidf')
+LEGACY_PICKLE_PATH = os.path.join('data', 'processed', 'features_tfidf.pkl')
+
+
+def save_features(path, X, y, feature_names=None, extra=None):
+    """
+    Write a feature matrix as a directory of flat arrays:
+    data (float32), indices (int32), indptr (int32/int64), labels (int32
+    codes into manifest['classes']) and feature_names, plus a manifest.
+    Every array can be memory-mapped back without unpickling anything.
+    """
+    X = sp.csr_matrix(X)
+    os.makedirs(path, exist_ok=True)
+
+    classes, codes = np.unique(np.asarray(y).astype(str), return_inverse=True)
+    indptr_dtype = np.int32 if X.nnz < np.iinfo(np.int32).max else np.int64
+    arrays = {
+        'data': X.data.astype(np.float32),
+        'indices': X.indices.astype(np.int32),
+        'indptr': X.indptr.astype(indptr_dtype),
+        'labels': codes.astype(np.int32),
+    }
+    if feature_names is not None:
+        arrays['feature_names'] = np.asarray(feature_names).astype(str)
+
+    for name, array in arrays.items():
+        np.save(os.path.join(path, f'{name}.npy'), array)
+
+    manifest = {
+        'format': FEATURE_STORE_FORMAT,
+        'version': FEATURE_STORE_VERSION,
+        'created': datetime.now().isoformat(),
+        'shape': list(X.shape),
+        'nnz': int(X.nnz),
+        'classes': classes.tolist(),
+        'arrays': {name: str(array.dtype) for name, array in arrays.items()},
+    }
+    manifest.update(extra or {})
+    with open(os.path.join(path, MANIFEST_FILENAME), 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=2)
+    return manifest
+
+
+def load_manifest(path):
+    with open(os.path.join(path, MANIFEST_FILENAME), 'r', encoding='utf-8') as f:
+        manifest = json.load(f)
+    if manifest.get('format') != FEATURE_STORE_FORMAT:
+        raise ValueError(f"{path} is not a feature store (format={manifest.get('format')!r})")
+    return manifest
+
+
+def is_feature_store(path):
+    return os.path.isfile(os.path.join(path, MANIFEST_FILENAME))
+
+
+def _load_store(path, mmap_mode):
+    manifest = load_manifest(path)
+
+    def array(name, mode=mmap_mode):
+        return np.load(os.path.join(path, f'{name}.npy'), mmap_mode=mode)
+
+    X = sp.csr_matrix((array('data'), array('indices'), array('indptr')),
+                      shape=tuple(manifest['shape']), copy=False)
+    classes = np.asarray(manifest['classes'], dtype=object)
+    codes = array('labels')
+    features = {
+        'X': X,
+        'y': classes[np.asarray(codes)],
+        'label_codes': codes,
+        'classes': classes,
+        'manifest': manifest,
+    }
+    if 'feature_names' in manifest['arrays']:
+        # Unicode arrays are small next to X; load them normally
+        features['feature_names'] = array('feature_names', mode=None)
+    return features
+
+
+def load_features(path=None, mmap_mode='r'):
+    """
+    Load features from a feature store directory (memory-mapped by default)
+    or from a legacy features_tfidf.pkl. Always returns a dict with 'X' and
+    'y', plus 'feature_names' when available. The store no longer keeps a
+    separate vocab; use vocabulary(features) to rebuild it.
+    """
+    if path is None:
+        path = DEFAULT_STORE_PATH if is_feature_store(DEFAULT_STORE_PATH) else LEGACY_PICKLE_PATH
+
+    if os.path.isdir(path):
+        return _load_store(path, mmap_mode)
+
+    with open(path, 'rb') as f:
+        return pickle.load(f)
+
+
+def vocabulary(features):
+    """{term: column} mapping (the legacy pickle's 'vocab'), rebuilt from feature_names"""
+    if 'vocab' in features:
+        return features['vocab']
+    return {str(term): i for i, term in enumerate(features['feature_names'])}
+
+
+def convert_pickle(pickle_path=LEGACY_PICKLE_PATH, store_path=DEFAULT_STORE_PATH):
+    """Rewrite a legacy features_tfidf.pkl as a feature store"""
+    with open(pickle_path, 'rb') as f:
+        data = pickle.load(f)
+    return save_features(store_path, data['X'], data['y'], data.get('feature_names'),
+                         extra={'source': os.path.basename(pickle_path)})
+
+
+def _dir_size(path):
+    return sum(os.path.getsize(os.path.join(path, f)) for f in os.listdir(path))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Convert features_tfidf.pkl into a memory-mappable feature store.")
+    parser.add_argument("pickle_path", nargs="?", default=LEGACY_PICKLE_PATH)
+    parser.add_argument("store_path", nargs="?", default=DEFAULT_STORE_PATH)
+    args = parser.parse_args()
+
+    manifest = convert_pickle(args.pickle_path, args.store_path)
+    print(f"✅ Wrote feature store to: {args.store_path}")
+    print(f"   Matrix Shape: {tuple(manifest['shape'])}, nnz {manifest['nnz']:,}")
+    print(f"   Size: {os.path.getsize(args.pickle_path) / 1e6:.1f} MB pickle -> "
+          f"{_dir_size(args.store_path) / 1e6:.1f} MB store")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+import numpy as np
+from sklearn.feature_extraction.text import HashingVectorizer
+from sklearn.preprocessing import normalize
+
+DEFAULT_N_FEATURES = 2 ** 20
+
+
+class HashingTfidfVectorizer:
+    """
+    Stateless stand-in for TfidfVectorizer: terms are hashed (no vocabulary
+    held in memory) and IDF is estimated from document frequencies streamed
+    in with partial_fit. Output matches TfidfVectorizer's weighting
+    (unigrams + bigrams, sublinear tf, smoothed idf, l2 norm), so it can be
+    passed anywhere a fitted vectorizer's transform() is used.
+    """
+
+    def __init__(self, n_features=DEFAULT_N_FEATURES, ngram_range=(1, 2)):
+        self.n_features = n_features
+        self.ngram_range = ngram_range
+        self.hasher = HashingVectorizer(
+            n_features=n_features,
+            ngram_range=ngram_range,
+            alternate_sign=False,
+            norm=None,
+        )
+        self.document_counts = np.zeros(n_features, dtype=np.int64)
+        self.n_documents = 0
+        self.idf_ = None
+
+    def hash_counts(self, clean_texts):
+        """Raw term counts for already-preprocessed texts"""
+        return self.hasher.transform(clean_texts).tocsr()
+
+    def partial_fit_counts(self, counts):
+        """Accumulate document frequencies from a hash_counts() matrix"""
+        self.document_counts += np.bincount(counts.indices, minlength=self.n_features)
+        self.n_documents += counts.shape[0]
+        self.idf_ = None
+        return self
+
+    def partial_fit(self, clean_texts):
+        return self.partial_fit_counts(self.hash_counts(clean_texts))
+
+    def finalize(self):
+        """Freeze IDF from the documents seen so far (smooth_idf, as in TfidfVectorizer)"""
+        self.idf_ = np.log((1 + self.n_documents) / (1 + self.document_counts)) + 1.0
+        return self
+
+    def transform_counts(self, counts):
+        if self.idf_ is None:
+            self.finalize()
+        X = counts.astype(np.float64, copy=True)
+        np.log(X.data, X.data)
+        X.data += 1.0
+        X.data *= self.idf_[X.indices]
+        return normalize(X, norm='l2', copy=False)
+
+    def transform(self, clean_texts):
+        return self.transform_counts(self.hash_counts(clean_texts))
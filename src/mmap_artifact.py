@@ -0,0 +1,217 @@
+import os
+import re
+import json
+import glob
+import time
+import argparse
+
+import numpy as np
+
+from compiled_model import compile_linear_model, word_ngrams, scores_to_proba
+from model_assets import load_artifact, file_fingerprint, mmap_artifact_dir, VECTORIZER_FILENAME
+from text_preprocessing import preprocess_text
+
+MMAP_FORMAT = 'sid-mmap-linear'
+MMAP_VERSION = 1
+MMAP_SUFFIX = '.mmap'
+
+MANIFEST_FILE = 'manifest.json'
+TERMS_FILE = 'terms.npy'
+WEIGHTS_FILE = 'weights.npy'
+
+
+def export_mmap(compiled, out_dir):
+    """
+    Write a CompiledLinearModel as flat arrays:
+    - terms.npy: sorted fixed-width UTF-8 string table
+    - weights.npy: (n_terms, 1 + n_classes) float64 rows of (idf, idf * coef_)
+    - manifest.json: classes, intercepts and vectorizer settings
+    """
+    os.makedirs(out_dir, exist_ok=True)
+    state = compiled.state
+
+    items = sorted((term.encode('utf-8'), row) for term, row in state['table'].items())
+    width = max(len(t) for t, _ in items)
+    terms = np.array([t for t, _ in items], dtype=f'S{width}')
+    weights = np.array([row for _, row in items], dtype=np.float64)
+
+    np.save(os.path.join(out_dir, TERMS_FILE), terms)
+    np.save(os.path.join(out_dir, WEIGHTS_FILE), weights)
+
+    manifest = {
+        'format': MMAP_FORMAT,
+        'version': MMAP_VERSION,
+        'classes': state['classes'],
+        'intercept': state['intercept'],
+        'token_pattern': state['token_pattern'],
+        'lowercase': state['lowercase'],
+        'ngram_range': list(state['ngram_range']),
+        'sublinear_tf': state['sublinear_tf'],
+        'norm': state['norm'],
+        'proba': state['proba'],
+        'n_terms': int(len(terms)),
+        'sources': state.get('sources', {}),
+    }
+    with open(os.path.join(out_dir, MANIFEST_FILE), 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=2)
+    return out_dir
+
+
+class MappedLinearModel:
+    """
+    TF-IDF + linear model backed by memory-mapped arrays.
+    Loading only parses a small JSON manifest and maps two .npy files, so
+    workers start in milliseconds and share the pages through the OS cache.
+    """
+
+    def __init__(self, path, mmap_mode='r'):
+        with open(os.path.join(path, MANIFEST_FILE), 'r', encoding='utf-8') as f:
+            manifest = json.load(f)
+        if manifest.get('format') != MMAP_FORMAT:
+            raise ValueError(f"Not a memory-mapped model artifact: {path}")
+
+        self.path = path
+        self.manifest = manifest
+        self.classes_ = list(manifest['classes'])
+        self.intercept = np.asarray(manifest['intercept'], dtype=np.float64)
+        self.token_re = re.compile(manifest['token_pattern'])
+        self.lowercase = manifest['lowercase']
+        self.min_n, self.max_n = manifest['ngram_range']
+        self.sublinear_tf = manifest['sublinear_tf']
+        self.norm = manifest['norm']
+        self.proba = manifest['proba']
+        self.sources = manifest.get('sources', {})
+
+        self.terms = np.load(os.path.join(path, TERMS_FILE), mmap_mode=mmap_mode)
+        self.weights = np.load(os.path.join(path, WEIGHTS_FILE), mmap_mode=mmap_mode)
+        self.term_width = self.terms.dtype.itemsize
+
+    def lookup(self, grams):
+        """Row indices of the given n-grams, -1 where a gram is out of vocabulary"""
+        encoded = [g.encode('utf-8') for g in grams]
+        # Longer strings would be truncated by the fixed-width cast and could false-match
+        keys = np.array([e if len(e) <= self.term_width else b'' for e in encoded], dtype=self.terms.dtype)
+        if len(keys) == 0:
+            return np.empty(0, dtype=np.int64)
+        idx = np.searchsorted(self.terms, keys)
+        idx = np.minimum(idx, len(self.terms) - 1)
+        found = (self.terms[idx] == keys) & (keys != b'')
+        return np.where(found, idx, -1)
+
+    def decision_function_clean(self, clean_text):
+        """Raw class scores for an already-preprocessed document"""
+        grams = word_ngrams(clean_text, self.token_re, self.lowercase, self.min_n, self.max_n)
+        if not grams:
+            return self.intercept.tolist()
+
+        unique, counts = np.unique(np.array(grams, dtype=object), return_counts=True)
+        rows = self.lookup(unique)
+        present = rows >= 0
+        if not present.any():
+            return self.intercept.tolist()
+
+        rows = rows[present]
+        tf = counts[present].astype(np.float64)
+        if self.sublinear_tf:
+            tf = 1.0 + np.log(tf)
+
+        table = self.weights[rows]
+        w = tf * table[:, 0]
+        if self.norm == 'l2':
+            tf = tf / np.sqrt(np.dot(w, w))
+        elif self.norm == 'l1':
+            tf = tf / np.abs(w).sum()
+        return (self.intercept + tf @ table[:, 1:]).tolist()
+
+    def predict_proba_clean(self, clean_text):
+        return scores_to_proba(self.decision_function_clean(clean_text), self.proba)
+
+    def predict_proba(self, texts):
+        """Probability matrix for raw texts (preprocessed here)"""
+        return np.array([self.predict_proba_clean(preprocess_text(t)) for t in texts])
+
+    def predict_text(self, text):
+        scores = self.decision_function_clean(preprocess_text(text))
+        if len(scores) == 1:
+            return self.classes_[1 if scores[0] > 0 else 0]
+        return self.classes_[int(np.argmax(scores))]
+
+    def si_probability(self, text):
+        return self.predict_proba_clean(preprocess_text(text))[self.classes_.index('SI')]
+
+
+def convert_pickles(model_path, vectorizer_path, out_dir):
+    """Compile a pickled model + vectorizer pair and export it as a mapped artifact"""
+    model = load_artifact(model_path)
+    vectorizer = load_artifact(vectorizer_path)
+    sources = {
+        'model': file_fingerprint(model_path),
+        'vectorizer': file_fingerprint(vectorizer_path),
+    }
+    compiled = compile_linear_model(model, vectorizer, sources=sources)
+    return export_mmap(compiled, out_dir)
+
+
+def convert_models_dir(models_dir, vectorizer_name=VECTORIZER_FILENAME):
+    """
+    Convert every model pickle in models_dir that pairs with the shared
+    vectorizer. Slim models (paired with their own slim vectorizer) are not
+    converted; models that need extra engineered features are skipped.
+    """
+    vec_path = os.path.join(models_dir, vectorizer_name)
+    converted = []
+    for model_path in sorted(glob.glob(os.path.join(models_dir, '*.pkl'))):
+        name = os.path.basename(model_path)
+        if 'vectorizer' in name or name.endswith(('.compiled.pkl', '.slim.pkl')):
+            continue
+        out_dir = mmap_artifact_dir(models_dir, name)
+        try:
+            convert_pickles(model_path, vec_path, out_dir)
+        except ValueError as e:
+            print(f"⚠️ Skipping {name}: {e}")
+            continue
+        print(f"✅ {name} => {os.path.basename(out_dir)}/")
+        converted.append(out_dir)
+    return converted
+
+
+def compare_load_times(model_path, vectorizer_path, mmap_dir):
+    """Cold-ish load time of the pickles versus the mapped artifact, in ms"""
+    start = time.perf_counter()
+    load_artifact(model_path)
+    load_artifact(vectorizer_path)
+    pickle_ms = (time.perf_counter() - start) * 1000
+
+    start = time.perf_counter()
+    MappedLinearModel(mmap_dir)
+    mmap_ms = (time.perf_counter() - start) * 1000
+    return pickle_ms, mmap_ms
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Convert model pickles into memory-mappable artifacts.")
+    parser.add_argument("--models-dir", default=os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'models'))
+    parser.add_argument("--vectorizer", default=VECTORIZER_FILENAME, help="Vectorizer filename inside models dir.")
+    parser.add_argument("--model", default=None, help="Convert only this model (default: every compatible pickle).")
+    args = parser.parse_args()
+
+    print(f"⏳ Converting pickles in {args.models_dir}...")
+    if args.model:
+        out_dir = mmap_artifact_dir(args.models_dir, args.model)
+        converted = [convert_pickles(os.path.join(args.models_dir, args.model),
+                                     os.path.join(args.models_dir, args.vectorizer), out_dir)]
+    else:
+        converted = convert_models_dir(args.models_dir, args.vectorizer)
+
+    for out_dir in converted:
+        model_name = os.path.basename(out_dir)[:-len(MMAP_SUFFIX)] + '.pkl'
+        pickle_ms, mmap_ms = compare_load_times(
+            os.path.join(args.models_dir, model_name),
+            os.path.join(args.models_dir, args.vectorizer),
+            out_dir,
+        )
+        print(f"⏱️ {model_name}: pickle load {pickle_ms:.1f} ms, mapped load {mmap_ms:.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
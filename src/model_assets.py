@@ -0,0 +1,129 @@
+import os
+import pickle
+import hashlib
+
+import numpy as np
+
+MODEL_FILENAME = 'lr_model.pkl'
+VECTORIZER_FILENAME = 'tfidf_vectorizer.pkl'
+
+
+def find_models_dir(start_dir=None):
+    """
+    Locate the 'models' directory relative to the calling script.
+    Returns None if it cannot be found.
+    """
+    if start_dir is None:
+        start_dir = os.path.dirname(os.path.abspath(__file__))
+
+    possible_paths = [
+        os.path.join(start_dir, 'models'),
+        os.path.join(start_dir, '..', 'models'),
+        os.path.join(start_dir, '..', '..', 'models'),
+    ]
+
+    for path in possible_paths:
+        if os.path.isdir(path):
+            return os.path.normpath(path)
+    return None
+
+
+def load_artifact(path):
+    """
+    Unpickle a model artifact. Some files in models/ were written with
+    joblib.dump rather than pickle.dump, so fall back to joblib for those.
+    """
+    try:
+        with open(path, 'rb') as f:
+            return pickle.load(f)
+    except pickle.UnpicklingError:
+        import joblib
+        return joblib.load(path)
+
+
+def file_fingerprint(path):
+    """SHA-256 of a file's bytes, used to tie derived artifacts to their sources"""
+    h = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            h.update(block)
+    return h.hexdigest()
+
+
+def assets_fingerprint(models_dir=None, model_name=MODEL_FILENAME,
+                       vectorizer_name=VECTORIZER_FILENAME):
+    """Combined fingerprint of a model + vectorizer pair (changes when either is retrained)"""
+    if models_dir is None:
+        models_dir = find_models_dir()
+    h = hashlib.sha256()
+    for name in (model_name, vectorizer_name):
+        h.update(file_fingerprint(os.path.join(models_dir, name)).encode('ascii'))
+    return h.hexdigest()
+
+
+def load_model_and_vectorizer(models_dir=None, model_name=MODEL_FILENAME,
+                              vectorizer_name=VECTORIZER_FILENAME):
+    """
+    Load the trained model and TF-IDF vectorizer pickles.
+    Raises FileNotFoundError if the directory or either artifact is missing.
+    """
+    if models_dir is None:
+        models_dir = find_models_dir()
+    if models_dir is None:
+        raise FileNotFoundError("Could not find 'models' directory.")
+
+    model_path = os.path.join(models_dir, model_name)
+    vec_path = os.path.join(models_dir, vectorizer_name)
+
+    if not os.path.exists(model_path):
+        raise FileNotFoundError(f"Model file missing: {model_path}")
+    if not os.path.exists(vec_path):
+        raise FileNotFoundError(f"Vectorizer file missing: {vec_path}")
+
+    model = load_artifact(model_path)
+    vectorizer = load_artifact(vec_path)
+    return model, vectorizer
+
+
+def mmap_artifact_dir(models_dir, model_name=MODEL_FILENAME):
+    """Where mmap_artifact.py writes the mapped form of model_name (lr_model.pkl -> lr_model.mmap/)"""
+    return os.path.join(models_dir, os.path.splitext(model_name)[0] + '.mmap')
+
+
+def load_assets(models_dir=None, model_name=MODEL_FILENAME, vectorizer_name=VECTORIZER_FILENAME,
+                prefer_mmap=True):
+    """
+    Load scoring assets, preferring the memory-mapped artifact when one
+    exists for model_name (its manifest.json is present and not older than
+    the pickles). Returns (model, vectorizer); vectorizer is None for a
+    mapped model, which does its own TF-IDF lookup. Falls back to the
+    pickles otherwise.
+    """
+    if models_dir is None:
+        models_dir = find_models_dir()
+    if models_dir is None:
+        raise FileNotFoundError("Could not find 'models' directory.")
+
+    mmap_dir = mmap_artifact_dir(models_dir, model_name)
+    manifest = os.path.join(mmap_dir, 'manifest.json')
+    if prefer_mmap and os.path.exists(manifest):
+        from mmap_artifact import MappedLinearModel
+
+        built = os.path.getmtime(manifest)
+        sources = [os.path.join(models_dir, name) for name in (model_name, vectorizer_name)]
+        if any(os.path.exists(p) and os.path.getmtime(p) > built for p in sources):
+            print(f"⚠️ {mmap_dir} is older than the pickles; loading the pickles instead")
+        else:
+            try:
+                return MappedLinearModel(mmap_dir), None
+            except (OSError, ValueError, KeyError) as e:
+                print(f"⚠️ Could not load {mmap_dir} ({e}); loading the pickles instead")
+
+    return load_model_and_vectorizer(models_dir, model_name, vectorizer_name)
+
+
+def predict_proba_clean(model, vectorizer, clean_texts):
+    """Probability matrix for preprocessed texts, for either kind of assets load_assets returns"""
+    if vectorizer is None:
+        return np.array([model.predict_proba_clean(text) for text in clean_texts])
+    return model.predict_proba(vectorizer.transform(clean_texts))
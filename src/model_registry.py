@@ -0,0 +1,251 @@
+import os
+import glob
+import hashlib
+import argparse
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+from model_assets import find_models_dir, load_artifact, file_fingerprint, VECTORIZER_FILENAME
+from text_preprocessing import preprocess_batch
+
+DEFAULT_MAX_RESIDENT = 4
+
+
+class ModelEntry:
+    """A discovered model artifact (not loaded until first use)"""
+
+    def __init__(self, name, path, vectorizer_name=VECTORIZER_FILENAME):
+        self.name = name
+        self.path = path
+        self.vectorizer_name = vectorizer_name
+
+    def __repr__(self):
+        return f"ModelEntry({self.name!r}, vectorizer={self.vectorizer_name!r})"
+
+
+class IncompatibleModelError(ValueError):
+    """The model cannot be fed by its vectorizer alone (e.g. needs engineered features)"""
+
+
+def discover_models(models_dir, vectorizer_map=None):
+    """
+    List model pickles in models_dir without loading them.
+    Files with 'vectorizer' in the name are treated as vectorizers; every
+    model pairs with tfidf_vectorizer.pkl unless vectorizer_map overrides it,
+    except that a suffixed model (lr_model.slim.pkl) pairs with the vectorizer
+    carrying the same suffix (tfidf_vectorizer.slim.pkl) when one exists.
+    """
+    vectorizer_map = vectorizer_map or {}
+    vectorizer_stem = os.path.splitext(VECTORIZER_FILENAME)[0]
+    entries = OrderedDict()
+    for path in sorted(glob.glob(os.path.join(models_dir, '*.pkl'))):
+        filename = os.path.basename(path)
+        if 'vectorizer' in filename or filename.endswith('.compiled.pkl'):
+            continue
+        name = os.path.splitext(filename)[0]
+        vectorizer_name = VECTORIZER_FILENAME
+        if '.' in name:
+            suffixed = f"{vectorizer_stem}.{name.split('.', 1)[1]}.pkl"
+            if os.path.exists(os.path.join(models_dir, suffixed)):
+                vectorizer_name = suffixed
+        entries[name] = ModelEntry(name, path, vectorizer_map.get(name, vectorizer_name))
+    return entries
+
+
+class ModelRegistry:
+    """
+    Lazily loads models on first use and keeps at most max_resident of them
+    in memory (least recently used are evicted). Vectorizers are loaded once
+    and shared, so scoring against several models costs one transform per
+    distinct vectorizer instead of one per model.
+    """
+
+    def __init__(self, models_dir=None, max_resident=DEFAULT_MAX_RESIDENT, vectorizer_map=None):
+        self.models_dir = models_dir or find_models_dir()
+        if self.models_dir is None:
+            raise FileNotFoundError("Could not find 'models' directory.")
+        self.entries = discover_models(self.models_dir, vectorizer_map)
+        self.max_resident = max_resident
+        self._models = OrderedDict()
+        self._vectorizers = {}
+        self._incompatible = {}
+        self._lock = threading.Lock()
+        self._load_locks = {}
+        self.loads = 0
+        self.evictions = 0
+        self.transforms = 0
+
+    def names(self):
+        return list(self.entries)
+
+    def resident(self):
+        return list(self._models)
+
+    def get_vectorizer(self, vectorizer_name):
+        with self._lock:
+            if vectorizer_name not in self._vectorizers:
+                path = os.path.join(self.models_dir, vectorizer_name)
+                self._vectorizers[vectorizer_name] = load_artifact(path)
+            return self._vectorizers[vectorizer_name]
+
+    def fingerprint(self):
+        """Combined fingerprint of every discovered model and its vectorizer (for cache keys)"""
+        h = hashlib.sha256()
+        seen = {}
+        for entry in self.entries.values():
+            for path in (entry.path, os.path.join(self.models_dir, entry.vectorizer_name)):
+                if path not in seen:
+                    seen[path] = file_fingerprint(path) if os.path.exists(path) else 'missing'
+                h.update(seen[path].encode('ascii'))
+        return h.hexdigest()
+
+    def _cached_model(self, name):
+        with self._lock:
+            if name in self._models:
+                self._models.move_to_end(name)
+                return self._models[name]
+            return None
+
+    def get_model(self, name):
+        """Return the loaded model, loading (and possibly evicting another) on first use"""
+        if name not in self.entries:
+            raise KeyError(f"Unknown model '{name}'. Available: {', '.join(self.entries)}")
+
+        model = self._cached_model(name)
+        if model is not None:
+            return model
+
+        # One loader per model: concurrent first requests wait for it instead of unpickling again
+        with self._lock:
+            load_lock = self._load_locks.setdefault(name, threading.Lock())
+        with load_lock:
+            model = self._cached_model(name)
+            if model is not None:
+                return model
+            model = load_artifact(self.entries[name].path)
+            with self._lock:
+                self._models[name] = model
+                self.loads += 1
+                while len(self._models) > self.max_resident:
+                    self._models.popitem(last=False)
+                    self.evictions += 1
+        return model
+
+    def _check_compatible(self, name, model, vectorizer):
+        expected = getattr(model, 'n_features_in_', None)
+        provided = len(getattr(vectorizer, 'vocabulary_', {}))
+        if expected is not None and expected != provided:
+            raise IncompatibleModelError(
+                f"{name} expects {expected} features but {self.entries[name].vectorizer_name} "
+                f"produces {provided}"
+            )
+
+    def score(self, texts, names=None):
+        """
+        Score raw texts against several models.
+        Returns {model_name: result} where result holds 'predictions',
+        'probabilities' (None for models without predict_proba), 'classes'
+        and 'si_probability', or 'error' if the model could not be used.
+        """
+        single = isinstance(texts, str)
+        if single:
+            texts = [texts]
+        names = names or self.names()
+        clean = preprocess_batch(list(texts))
+
+        # Group models by vectorizer so each distinct vectorizer transforms once
+        groups = OrderedDict()
+        for name in names:
+            groups.setdefault(self.entries[name].vectorizer_name, []).append(name)
+
+        results = OrderedDict()
+        for vectorizer_name, group in groups.items():
+            vectorizer = self.get_vectorizer(vectorizer_name)
+            X = None
+            for name in group:
+                if name in self._incompatible:
+                    results[name] = {'error': self._incompatible[name]}
+                    continue
+                try:
+                    model = self.get_model(name)
+                    self._check_compatible(name, model, vectorizer)
+                except IncompatibleModelError as e:
+                    # Remember the verdict and free the slot for usable models
+                    self._incompatible[name] = str(e)
+                    with self._lock:
+                        self._models.pop(name, None)
+                    results[name] = {'error': str(e)}
+                    continue
+                except OSError as e:
+                    results[name] = {'error': str(e)}
+                    continue
+
+                if X is None:
+                    X = vectorizer.transform(clean)
+                    self.transforms += 1
+                results[name] = self._predict(model, X, single)
+        return results
+
+    @staticmethod
+    def _predict(model, X, single):
+        classes = [str(c) for c in model.classes_]
+        if hasattr(model, 'predict_proba'):
+            probs = model.predict_proba(X)
+            predictions = [classes[i] for i in np.argmax(probs, axis=1)]
+        else:
+            probs = None
+            predictions = [str(p) for p in model.predict(X)]
+
+        si_probability = None
+        if probs is not None and 'SI' in classes:
+            si_probability = probs[:, classes.index('SI')].tolist()
+
+        result = {
+            'classes': classes,
+            'predictions': predictions,
+            'probabilities': probs.tolist() if probs is not None else None,
+            'si_probability': si_probability,
+        }
+        if single:
+            result['predictions'] = predictions[0]
+            result['probabilities'] = result['probabilities'][0] if probs is not None else None
+            result['si_probability'] = si_probability[0] if si_probability is not None else None
+        return result
+
+    def stats(self):
+        return {
+            'discovered': len(self.entries),
+            'resident': self.resident(),
+            'max_resident': self.max_resident,
+            'loads': self.loads,
+            'evictions': self.evictions,
+            'transforms': self.transforms,
+        }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Score text against every model in models/ side by side.")
+    parser.add_argument("text", help="Text to score")
+    parser.add_argument("--models-dir", default=None, help="Directory holding the model pickles.")
+    parser.add_argument("--model", action="append", dest="models", help="Restrict to these model names.")
+    parser.add_argument("--max-resident", type=int, default=DEFAULT_MAX_RESIDENT)
+    args = parser.parse_args()
+
+    registry = ModelRegistry(args.models_dir, max_resident=args.max_resident)
+    print(f"📂 Discovered {len(registry.entries)} models in {registry.models_dir}")
+
+    results = registry.score(args.text, names=args.models)
+    for name, result in results.items():
+        if 'error' in result:
+            print(f"   {name:<32} ⚠️ {result['error']}")
+        elif result['si_probability'] is not None:
+            print(f"   {name:<32} {result['predictions']:<6} SI={result['si_probability']:.1%}")
+        else:
+            print(f"   {name:<32} {result['predictions']:<6} (no probabilities)")
+    print(f"📊 {registry.stats()}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,215 @@
+import os
+import json
+import time
+import hashlib
+import argparse
+import itertools
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+from sklearn.feature_extraction.text import TfidfVectorizer
+from sklearn.linear_model import LogisticRegression
+from sklearn.metrics import f1_score
+from sklearn.model_selection import StratifiedKFold
+from sklearn.svm import LinearSVC
+
+from model_assets import file_fingerprint
+from text_preprocessing import preprocess_parallel, STOP_WORDS
+from score import extract_texts
+from feature_store import save_features, load_features, is_feature_store
+
+DEFAULT_CACHE_DIR = os.path.join('data', 'processed', 'feature_cache')
+DEFAULT_FOLDS = 5
+
+# Vectorizer configs to search; the first one is what vectorizer_data.py deploys
+VECTORIZER_GRID = [
+    {'max_features': 5000, 'ngram_range': (1, 2), 'sublinear_tf': True},
+    {'max_features': 10000, 'ngram_range': (1, 2), 'sublinear_tf': True},
+]
+
+CLASSIFIER_GRID = {
+    'logistic_regression': {
+        'C': [0.1, 1.0, 10.0],
+        'class_weight': [None, 'balanced'],
+        'solver': ['lbfgs', 'saga'],
+    },
+    'linear_svc': {
+        'C': [0.1, 1.0],
+        'class_weight': [None, 'balanced'],
+    },
+}
+
+# Per-process cache of memory-mapped matrices, keyed by feature cache path
+_MATRICES = {}
+
+
+def build_classifier(kind, params):
+    if kind == 'logistic_regression':
+        return LogisticRegression(max_iter=1000, random_state=42, **params)
+    if kind == 'linear_svc':
+        return LinearSVC(random_state=42, **params)
+    raise ValueError(f"Unknown classifier: {kind}")
+
+
+def expand_grid(grid):
+    """[(kind, params), ...] for every combination in a {kind: {param: values}} grid"""
+    candidates = []
+    for kind, space in grid.items():
+        keys = list(space)
+        for values in itertools.product(*(space[k] for k in keys)):
+            candidates.append((kind, dict(zip(keys, values))))
+    return candidates
+
+
+def features_key(input_fingerprint, text_column, label_column, vectorizer_params):
+    """Cache key: same data + same preprocessing + same vectorizer config -> same features"""
+    payload = json.dumps({
+        'input': input_fingerprint,
+        'text_column': text_column,
+        'label_column': label_column,
+        'stop_words': sorted(STOP_WORDS),
+        'vectorizer': vectorizer_params,
+    }, sort_keys=True, default=list)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()[:16]
+
+
+def cached_features(input_path, vectorizer_params, cache_dir=DEFAULT_CACHE_DIR,
+                    text_column='combined_text', label_column='prelim_label', n_jobs=None):
+    """
+    Path of the cached feature matrix for this data + config, building it
+    (parallel preprocessing, one TF-IDF fit) only on a cache miss.
+    """
+    key = features_key(file_fingerprint(input_path), text_column, label_column, vectorizer_params)
+    path = os.path.join(cache_dir, key)
+    if is_feature_store(path):
+        print(f"   ♻️ Cache hit {key} for {vectorizer_params}")
+        return path
+
+    print(f"   🧮 Building features {key} for {vectorizer_params}...")
+    df = pd.read_csv(input_path)
+    df = df[df[label_column].notna()]
+    clean = preprocess_parallel(extract_texts(df, text_column), n_jobs=n_jobs)
+    params = dict(vectorizer_params, ngram_range=tuple(vectorizer_params['ngram_range']))
+    X = TfidfVectorizer(**params).fit_transform(clean)
+    save_features(path, X, df[label_column].astype(str).values, extra={'vectorizer': vectorizer_params})
+    return path
+
+
+def fold_assignments(path, y, folds):
+    """Stratified fold id per row, stored next to the cached matrix (workers read it by path)"""
+    fold_path = os.path.join(path, f'folds_{folds}.npy')
+    if not os.path.exists(fold_path):
+        fold_ids = np.empty(len(y), dtype=np.int16)
+        splitter = StratifiedKFold(n_splits=folds, shuffle=True, random_state=42)
+        for fold, (_, test_idx) in enumerate(splitter.split(np.zeros(len(y)), y)):
+            fold_ids[test_idx] = fold
+        np.save(fold_path, fold_ids)
+    return fold_path
+
+
+def _get_matrix(path):
+    if path not in _MATRICES:
+        features = load_features(path)
+        _MATRICES[path] = (features['X'], features['y'])
+    return _MATRICES[path]
+
+
+def evaluate_candidate(task):
+    """Fit one candidate on one fold (runs in a worker); returns a result row"""
+    features_path, fold_path, config_id, kind, params, fold = task
+    X, y = _get_matrix(features_path)
+    fold_ids = np.load(fold_path)
+    train_idx = np.flatnonzero(fold_ids != fold)
+    test_idx = np.flatnonzero(fold_ids == fold)
+    X_train, X_test = X[train_idx], X[test_idx]
+
+    model = build_classifier(kind, params)
+    start = time.perf_counter()
+    model.fit(X_train, y[train_idx])
+    fit_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    pred = model.predict(X_test)
+    predict_seconds = time.perf_counter() - start
+
+    return {
+        'config': config_id,
+        'model': kind,
+        'params': json.dumps(params, sort_keys=True),
+        'fold': fold,
+        'fit_seconds': fit_seconds,
+        'predict_ms_per_post': predict_seconds * 1000 / len(test_idx),
+        'macro_f1': f1_score(y[test_idx], pred, average='macro'),
+    }
+
+
+def run_search(input_path, vectorizer_grid=VECTORIZER_GRID, classifier_grid=CLASSIFIER_GRID,
+               folds=DEFAULT_FOLDS, n_jobs=None, cache_dir=DEFAULT_CACHE_DIR,
+               text_column='combined_text', label_column='prelim_label'):
+    """
+    Evaluate every (vectorizer config, classifier, params) across CV folds.
+    Features are built once per config and memory-mapped by the workers.
+    Returns (per-fold results DataFrame, leaderboard DataFrame).
+    """
+    candidates = expand_grid(classifier_grid)
+    tasks = []
+    for config_id, vectorizer_params in enumerate(vectorizer_grid):
+        path = cached_features(input_path, vectorizer_params, cache_dir, text_column, label_column, n_jobs)
+        y = load_features(path)['y']
+        fold_path = fold_assignments(path, y, folds)
+        for kind, params in candidates:
+            for fold in range(folds):
+                # Tasks carry only paths; each worker maps the matrix itself instead of receiving a copy
+                tasks.append((path, fold_path, config_id, kind, params, fold))
+
+    print(f"⏳ Evaluating {len(candidates)} classifiers x {len(vectorizer_grid)} configs x {folds} folds "
+          f"= {len(tasks)} fits...")
+    with ProcessPoolExecutor(max_workers=n_jobs) as executor:
+        rows = list(executor.map(evaluate_candidate, tasks))
+
+    results = pd.DataFrame(rows)
+    results['vectorizer'] = results['config'].map(lambda i: json.dumps(vectorizer_grid[i], default=list))
+    leaderboard = (
+        results.groupby(['vectorizer', 'model', 'params'], sort=False)
+        .agg(macro_f1=('macro_f1', 'mean'), macro_f1_std=('macro_f1', 'std'),
+             fit_seconds=('fit_seconds', 'mean'), predict_ms_per_post=('predict_ms_per_post', 'mean'))
+        .reset_index()
+        .sort_values('macro_f1', ascending=False, ignore_index=True)
+    )
+    return results, leaderboard
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Parallel CV search over vectorizer and classifier configs.")
+    parser.add_argument("input", help="Labeled raw CSV (same file vectorizer_data.py reads).")
+    parser.add_argument("--text-column", default="combined_text")
+    parser.add_argument("--label-column", default="prelim_label")
+    parser.add_argument("--folds", type=int, default=DEFAULT_FOLDS)
+    parser.add_argument("--jobs", type=int, default=None, help="Worker processes (default: all cores).")
+    parser.add_argument("--cache-dir", default=DEFAULT_CACHE_DIR, help="Where feature matrices are cached.")
+    parser.add_argument("--grid", default=None,
+                        help="JSON file with {'vectorizers': [...], 'classifiers': {...}} to override the defaults.")
+    parser.add_argument("--output", default="search_leaderboard.csv", help="Leaderboard CSV path.")
+    args = parser.parse_args()
+
+    vectorizer_grid, classifier_grid = VECTORIZER_GRID, CLASSIFIER_GRID
+    if args.grid:
+        with open(args.grid, 'r', encoding='utf-8') as f:
+            grid = json.load(f)
+        vectorizer_grid = grid.get('vectorizers', vectorizer_grid)
+        classifier_grid = grid.get('classifiers', classifier_grid)
+
+    start = time.perf_counter()
+    _, leaderboard = run_search(args.input, vectorizer_grid, classifier_grid, args.folds, args.jobs,
+                                args.cache_dir, args.text_column, args.label_column)
+    leaderboard.to_csv(args.output, index=False)
+
+    print(f"\n🏆 Top candidates ({time.perf_counter() - start:.1f}s total):")
+    with pd.option_context('display.max_colwidth', 60, 'display.width', 200):
+        print(leaderboard.head(10).to_string(index=False))
+    print(f"💾 Leaderboard written to: {args.output}")
+
+
+if __name__ == "__main__":
+    main()
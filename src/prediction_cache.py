@@ -0,0 +1,186 @@
+import os
+import time
+import pickle
+import sqlite3
+import hashlib
+import threading
+from collections import OrderedDict
+
+DEFAULT_MAX_ENTRIES = 2048
+DISK_CACHE_FILENAME = 'prediction_cache.sqlite'
+DEFAULT_DISK_MAX_ENTRIES = 100000
+DEFAULT_DISK_MAX_AGE = 30 * 24 * 3600  # seconds
+PRUNE_EVERY = 256  # disk writes between evictions
+
+# Distinguishes "not cached" from a cached None
+_MISSING = object()
+
+
+def make_key(kind, text, fingerprint, *extra):
+    """
+    Cache key: hash of the entry kind, the (normalized) text, the model
+    artifact fingerprint and any extra settings that change the result.
+    """
+    h = hashlib.sha256()
+    for part in (kind, fingerprint) + tuple(str(e) for e in extra) + (text,):
+        h.update(part.encode('utf-8'))
+        h.update(b'\0')
+    return h.hexdigest()
+
+
+class DiskTier:
+    """
+    SQLite-backed key/value store. SQLite handles locking, so one file can
+    be shared by every Streamlit worker process on the host.
+    Entries older than max_age seconds are dropped, and the store is cut
+    back to max_entries (oldest writes first). Pruning runs on open and
+    every PRUNE_EVERY writes.
+    """
+
+    def __init__(self, path, timeout=5.0, max_entries=DEFAULT_DISK_MAX_ENTRIES, max_age=DEFAULT_DISK_MAX_AGE):
+        self.path = path
+        self.timeout = timeout
+        self.max_entries = max_entries
+        self.max_age = max_age
+        self._local = threading.local()
+        self._writes = 0
+        self._writes_lock = threading.Lock()
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        conn = self._conn()
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS cache (key TEXT PRIMARY KEY, value BLOB, created REAL)"
+        )
+        conn.execute("CREATE INDEX IF NOT EXISTS cache_created ON cache (created)")
+        conn.commit()
+        self.prune()
+
+    def _conn(self):
+        # sqlite3 connections cannot be shared across threads
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=self.timeout)
+            conn.execute("PRAGMA journal_mode=WAL")
+            self._local.conn = conn
+        return conn
+
+    def get(self, key, default=None):
+        row = self._conn().execute("SELECT value FROM cache WHERE key = ?", (key,)).fetchone()
+        return default if row is None else pickle.loads(row[0])
+
+    def put(self, key, value):
+        conn = self._conn()
+        conn.execute(
+            "INSERT OR REPLACE INTO cache (key, value, created) VALUES (?, ?, ?)",
+            (key, sqlite3.Binary(pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)), time.time()),
+        )
+        conn.commit()
+        with self._writes_lock:
+            self._writes += 1
+            due = self._writes % PRUNE_EVERY == 0
+        if due:
+            self.prune()
+
+    def prune(self):
+        """Drop expired entries, then the oldest ones beyond max_entries; returns rows deleted"""
+        conn = self._conn()
+        deleted = 0
+        if self.max_age is not None:
+            deleted += conn.execute("DELETE FROM cache WHERE created < ?",
+                                    (time.time() - self.max_age,)).rowcount
+        if self.max_entries is not None:
+            deleted += conn.execute(
+                "DELETE FROM cache WHERE key IN "
+                "(SELECT key FROM cache ORDER BY created DESC LIMIT -1 OFFSET ?)",
+                (self.max_entries,),
+            ).rowcount
+        conn.commit()
+        return deleted
+
+    def __len__(self):
+        return self._conn().execute("SELECT COUNT(*) FROM cache").fetchone()[0]
+
+
+class PredictionCache:
+    """
+    Bounded in-memory LRU with an optional shared on-disk tier.
+    Lookups check memory first, then disk (promoting disk hits into memory).
+    The disk tier is bounded by disk_max_entries and disk_max_age seconds.
+    """
+
+    def __init__(self, max_entries=DEFAULT_MAX_ENTRIES, disk_path=None,
+                 disk_max_entries=DEFAULT_DISK_MAX_ENTRIES, disk_max_age=DEFAULT_DISK_MAX_AGE):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.disk = DiskTier(disk_path, max_entries=disk_max_entries, max_age=disk_max_age) if disk_path else None
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def _remember(self, key, value):
+        self._entries[key] = value
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def get(self, key, default=None):
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return self._entries[key]
+
+        if self.disk is not None:
+            try:
+                value = self.disk.get(key, _MISSING)
+            except sqlite3.Error:
+                value = _MISSING
+            if value is not _MISSING:
+                with self._lock:
+                    self._remember(key, value)
+                    self.hits += 1
+                    self.disk_hits += 1
+                return value
+
+        with self._lock:
+            self.misses += 1
+        return default
+
+    def put(self, key, value):
+        with self._lock:
+            self._remember(key, value)
+        if self.disk is not None:
+            try:
+                self.disk.put(key, value)
+            except sqlite3.Error as e:
+                print(f"⚠️ Disk cache write failed: {e}")
+
+    def get_or_compute(self, key, compute):
+        """Return the cached value for key, computing and storing it on a miss"""
+        value = self.get(key, _MISSING)
+        if value is _MISSING:
+            value = compute()
+            self.put(key, value)
+        return value
+
+    def clear(self):
+        """Drop the in-memory tier (the disk tier is left intact)"""
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        with self._lock:
+            stats = {
+                'entries': len(self._entries),
+                'max_entries': self.max_entries,
+                'hits': self.hits,
+                'disk_hits': self.disk_hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+            }
+        lookups = stats['hits'] + stats['misses']
+        stats['hit_rate'] = stats['hits'] / lookups if lookups else 0.0
+        stats['disk_enabled'] = self.disk is not None
+        return stats
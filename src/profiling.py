@@ -0,0 +1,244 @@
+import os
+import sys
+import json
+import time
+import atexit
+import threading
+import functools
+from datetime import datetime
+
+# Opt-in: SID_PROFILE=1 writes reports to profiles/, SID_PROFILE=<dir> to <dir>
+PROFILE_ENV = 'SID_PROFILE'
+DEFAULT_PROFILE_DIR = 'profiles'
+METRIC_PREFIX = 'sid_stage'
+
+_lock = threading.Lock()
+_stages = {}
+_state = {'enabled': False, 'output_dir': None, 'run': None, 'started': None}
+
+
+def _windows_peak_rss_bytes():
+    """PeakWorkingSetSize from GetProcessMemoryInfo (0 if the call fails)"""
+    import ctypes
+    from ctypes import wintypes
+
+    class PROCESS_MEMORY_COUNTERS(ctypes.Structure):
+        _fields_ = [('cb', wintypes.DWORD), ('PageFaultCount', wintypes.DWORD),
+                    ('PeakWorkingSetSize', ctypes.c_size_t), ('WorkingSetSize', ctypes.c_size_t),
+                    ('QuotaPeakPagedPoolUsage', ctypes.c_size_t), ('QuotaPagedPoolUsage', ctypes.c_size_t),
+                    ('QuotaPeakNonPagedPoolUsage', ctypes.c_size_t), ('QuotaNonPagedPoolUsage', ctypes.c_size_t),
+                    ('PagefileUsage', ctypes.c_size_t), ('PeakPagefileUsage', ctypes.c_size_t)]
+
+    counters = PROCESS_MEMORY_COUNTERS()
+    counters.cb = ctypes.sizeof(counters)
+    process = ctypes.windll.kernel32.GetCurrentProcess()
+    if not ctypes.windll.psapi.GetProcessMemoryInfo(process, ctypes.byref(counters), counters.cb):
+        return 0
+    return counters.PeakWorkingSetSize
+
+
+def process_peak_rss_bytes():
+    """
+    High-water resident set size of the whole process so far, not of any one
+    stage (ru_maxrss is KiB on Linux, bytes on macOS; the peak working set
+    on Windows). A stage's own cost shows up as the growth of this value
+    across it. Returns 0 where neither is available, so profiling can
+    never stop an entry point from starting.
+    """
+    try:
+        import resource
+    except ImportError:
+        if sys.platform == 'win32':
+            try:
+                return _windows_peak_rss_bytes()
+            except (OSError, AttributeError):
+                return 0
+        return 0
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == 'darwin' else peak * 1024
+
+
+def enable(output_dir=DEFAULT_PROFILE_DIR, run_name=None):
+    """Start recording stages; reports are written at exit (and on write_report())"""
+    if _state['enabled']:
+        return
+    if run_name is None:
+        script = os.path.splitext(os.path.basename(sys.argv[0] if sys.argv else ''))[0]
+        run_name = script if script and not script.startswith('-') else 'python'
+    _state.update(
+        enabled=True,
+        output_dir=output_dir,
+        run=run_name,
+        started=datetime.now().isoformat(),
+    )
+    atexit.register(write_report)
+
+
+def is_enabled():
+    return _state['enabled']
+
+
+def _enable_from_env():
+    value = os.environ.get(PROFILE_ENV, '').strip()
+    if value and value.lower() not in ('0', 'false', 'no'):
+        enable(DEFAULT_PROFILE_DIR if value.lower() in ('1', 'true', 'yes') else value)
+
+
+class _Stage:
+    """Measurements for one stage() block; set .items to record how much work it did"""
+
+    __slots__ = ('items',)
+
+    def __init__(self, items=None):
+        self.items = items
+
+
+class _NullStage:
+    """Shared stand-in used when profiling is off, so instrumented code costs ~nothing"""
+
+    items = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def __setattr__(self, name, value):
+        pass
+
+
+_NULL_STAGE = _NullStage()
+
+
+class _StageTimer:
+    __slots__ = ('name', 'stage', 'wall', 'cpu', 'rss')
+
+    def __init__(self, name, items):
+        self.name = name
+        self.stage = _Stage(items)
+
+    def __enter__(self):
+        self.rss = process_peak_rss_bytes()
+        self.cpu = time.process_time()
+        self.wall = time.perf_counter()
+        return self.stage
+
+    def __exit__(self, *exc):
+        wall = time.perf_counter() - self.wall
+        cpu = time.process_time() - self.cpu
+        peak = process_peak_rss_bytes()
+        _record(self.name, wall, cpu, self.stage.items, peak, peak - self.rss)
+        return False
+
+
+def stage(name, items=None):
+    """
+    Context manager timing one pipeline stage:
+
+        with profiling.stage('vectorize', items=len(df)) as s:
+            ...
+            s.items = X.shape[0]   # or set the count once it is known
+    """
+    if not _state['enabled']:
+        return _NULL_STAGE
+    return _StageTimer(name, items)
+
+
+def profiled(name=None, count=None):
+    """
+    Decorator form of stage(). count(result) gives the item count, e.g.
+    @profiled('collect.subreddit', count=len) for a function returning a list.
+    """
+    def decorator(func):
+        stage_name = name or func.__qualname__
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not _state['enabled']:
+                return func(*args, **kwargs)
+            with stage(stage_name) as s:
+                result = func(*args, **kwargs)
+                if count is not None:
+                    s.items = count(result)
+            return result
+        return wrapper
+    return decorator
+
+
+def _record(name, wall, cpu, items, process_peak_rss, rss_growth):
+    with _lock:
+        entry = _stages.setdefault(name, {
+            'calls': 0, 'wall_seconds': 0.0, 'cpu_seconds': 0.0, 'items': 0,
+            'max_wall_seconds': 0.0, 'process_peak_rss_bytes': 0, 'max_rss_growth_bytes': 0,
+        })
+        entry['calls'] += 1
+        entry['wall_seconds'] += wall
+        entry['cpu_seconds'] += cpu
+        entry['items'] += int(items or 0)
+        entry['max_wall_seconds'] = max(entry['max_wall_seconds'], wall)
+        entry['process_peak_rss_bytes'] = max(entry['process_peak_rss_bytes'], process_peak_rss)
+        entry['max_rss_growth_bytes'] = max(entry['max_rss_growth_bytes'], rss_growth)
+
+
+def report():
+    """Snapshot of every recorded stage plus run metadata"""
+    with _lock:
+        stages = {name: dict(entry) for name, entry in _stages.items()}
+    for entry in stages.values():
+        entry['items_per_second'] = entry['items'] / entry['wall_seconds'] if entry['wall_seconds'] else 0.0
+    return {
+        'run': _state['run'],
+        'started': _state['started'],
+        'written': datetime.now().isoformat(),
+        'argv': sys.argv,
+        'python': sys.version.split()[0],
+        'process_peak_rss_bytes': process_peak_rss_bytes(),
+        'stages': stages,
+    }
+
+
+def to_prometheus(data):
+    """Prometheus text exposition format (suitable for node_exporter's textfile collector)"""
+    metrics = [
+        ('calls_total', 'counter', 'Times the stage ran', 'calls'),
+        ('wall_seconds_total', 'counter', 'Wall-clock time spent in the stage', 'wall_seconds'),
+        ('cpu_seconds_total', 'counter', 'Process CPU time spent in the stage', 'cpu_seconds'),
+        ('items_total', 'counter', 'Items processed by the stage', 'items'),
+        ('max_wall_seconds', 'gauge', 'Slowest single run of the stage', 'max_wall_seconds'),
+        ('process_peak_rss_bytes', 'gauge', 'Process-lifetime peak RSS as of the end of the stage',
+         'process_peak_rss_bytes'),
+        ('max_rss_growth_bytes', 'gauge', 'Largest rise of the process peak RSS during one run of the stage',
+         'max_rss_growth_bytes'),
+    ]
+    run = data['run'].replace('"', '')
+    lines = []
+    for suffix, kind, help_text, key in metrics:
+        metric = f'{METRIC_PREFIX}_{suffix}'
+        lines.append(f'# HELP {metric} {help_text}')
+        lines.append(f'# TYPE {metric} {kind}')
+        for name, entry in sorted(data['stages'].items()):
+            stage_label = name.replace('"', '')
+            lines.append(f'{metric}{{run="{run}",stage="{stage_label}"}} {entry[key]}')
+    return "\n".join(lines) + "\n"
+
+
+def write_report(output_dir=None):
+    """Write <run>.json and <run>.prom; no-op unless profiling is enabled"""
+    if not _state['enabled']:
+        return None
+    output_dir = output_dir or _state['output_dir']
+    os.makedirs(output_dir, exist_ok=True)
+    data = report()
+    base = os.path.join(output_dir, data['run'])
+
+    # Write then rename, so a scraper never reads a half-written file
+    for path, text in ((base + '.json', json.dumps(data, indent=2)), (base + '.prom', to_prometheus(data))):
+        tmp_path = path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            f.write(text)
+        os.replace(tmp_path, path)
+    return base
+
+
+_enable_from_env()
@@ -0,0 +1,192 @@
+import os
+import time
+import pickle
+import argparse
+
+import numpy as np
+from sklearn.base import clone
+from sklearn.feature_extraction.text import TfidfVectorizer
+from sklearn.linear_model import LogisticRegression
+from sklearn.metrics import accuracy_score, f1_score
+from sklearn.model_selection import train_test_split
+from sklearn.preprocessing import normalize
+
+from model_assets import find_models_dir, load_model_and_vectorizer, load_artifact, MODEL_FILENAME, VECTORIZER_FILENAME
+from feature_store import load_features
+from text_preprocessing import preprocess_batch
+
+SLIM_MODEL_FILENAME = 'lr_model.slim.pkl'
+SLIM_VECTORIZER_FILENAME = 'tfidf_vectorizer.slim.pkl'
+DEFAULT_KEEP = 2000
+TIMING_DOCS = 2000
+
+
+def feature_importance(model):
+    """
+    Largest absolute weight of each feature across classes. Multinomial
+    coefficients are centered first: a per-feature shift shared by every
+    class does not change the softmax, so it is not real signal.
+    """
+    coef = np.atleast_2d(model.coef_)
+    if coef.shape[0] > 1:
+        coef = coef - coef.mean(axis=0)
+    return np.abs(coef).max(axis=0)
+
+
+def l1_model(C):
+    """L1-penalized LR with the deployed class weighting (penalty spelling differs across sklearn versions)"""
+    params = dict(solver='saga', C=C, max_iter=2000, class_weight='balanced', random_state=42)
+    if LogisticRegression().get_params()['penalty'] == 'deprecated':
+        params['l1_ratio'] = 1.0
+    else:
+        params['penalty'] = 'l1'
+    return LogisticRegression(**params)
+
+
+def select_features(model, X, y, keep=None, threshold=None, l1_C=None):
+    """
+    Column indices to keep (sorted). Either the `keep` largest / above
+    `threshold` by feature_importance(model), or, with l1_C, the columns an
+    L1-penalized refit leaves non-zero for some class.
+    """
+    if l1_C is not None:
+        l1 = l1_model(l1_C).fit(X, y)
+        importance = feature_importance(l1)
+        selected = np.flatnonzero(np.abs(np.atleast_2d(l1.coef_)).max(axis=0) > 0)
+    else:
+        importance = feature_importance(model)
+        if threshold is not None:
+            selected = np.flatnonzero(importance > threshold)
+        else:
+            selected = np.argsort(importance)[::-1][:keep]
+    if keep is not None and len(selected) > keep:
+        selected = selected[np.argsort(importance[selected])[::-1][:keep]]
+    return np.sort(selected)
+
+
+def prune_matrix(X, columns):
+    """
+    Keep `columns` of an l2-normalized TF-IDF matrix and renormalize rows.
+    Equal to transforming with the pruned vectorizer, since each kept
+    column's sublinear tf * idf is unchanged and only the row norm shrinks.
+    """
+    return normalize(X[:, columns], norm='l2', copy=False)
+
+
+def prune_vectorizer(vectorizer, columns):
+    """Vectorizer with a fixed vocabulary of the kept terms and their original idf"""
+    terms = vectorizer.get_feature_names_out()[columns]
+    params = vectorizer.get_params()
+    params.update(vocabulary={term: i for i, term in enumerate(terms)}, max_features=None)
+    slim = TfidfVectorizer(**params)
+    slim.idf_ = vectorizer.idf_[columns]
+    return slim
+
+
+def _artifact_stats(model_path, vectorizer_path, texts):
+    """Bytes on disk, unpickle time and transform time per document for a model/vectorizer pair"""
+    size = os.path.getsize(model_path) + os.path.getsize(vectorizer_path)
+    start = time.perf_counter()
+    load_artifact(model_path)
+    vectorizer = load_artifact(vectorizer_path)
+    load_ms = (time.perf_counter() - start) * 1000
+
+    vectorizer.transform(texts[:10])  # warm-up
+    start = time.perf_counter()
+    vectorizer.transform(texts)
+    transform_us = (time.perf_counter() - start) * 1e6 / len(texts)
+    return {'bytes': size, 'load_ms': load_ms, 'transform_us_per_doc': transform_us}
+
+
+def _timing_texts(n_docs=TIMING_DOCS):
+    """Clean synthetic posts for timing (real posts are not shipped with the repo)"""
+    from synthetic_corpus import CorpusGenerator
+    return preprocess_batch(CorpusGenerator(seed=0).chunk(0, n_docs)['combined_text']).tolist()
+
+
+def evaluate_pruning(model, X, y, keep=None, threshold=None, l1_C=None, test_size=0.2):
+    """
+    Accuracy/macro-F1 of the full-vocabulary model vs. the pruned one on a
+    held-out stratified split. Both are refit on the train split and the
+    features are selected from it too, so the test rows never leak in.
+    """
+    X_train, X_test, y_train, y_test = train_test_split(
+        X, y, test_size=test_size, stratify=y, random_state=42)
+    full = clone(model).fit(X_train, y_train)
+    columns = select_features(full, X_train, y_train, keep, threshold, l1_C)
+    slim_base = l1_model(l1_C) if l1_C is not None else clone(model)
+    slim = slim_base.fit(prune_matrix(X_train, columns), y_train)
+
+    full_pred = full.predict(X_test)
+    slim_pred = slim.predict(prune_matrix(X_test, columns))
+    return {
+        'full_accuracy': accuracy_score(y_test, full_pred),
+        'slim_accuracy': accuracy_score(y_test, slim_pred),
+        'full_macro_f1': f1_score(y_test, full_pred, average='macro'),
+        'slim_macro_f1': f1_score(y_test, slim_pred, average='macro'),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Prune low-weight vocabulary and export a slim model/vectorizer pair.")
+    parser.add_argument("--keep", type=int, default=None,
+                        help=f"Number of features to keep (default {DEFAULT_KEEP} unless --threshold/--l1-C).")
+    parser.add_argument("--threshold", type=float, default=None, help="Keep features with importance above this.")
+    parser.add_argument("--l1-C", type=float, default=None,
+                        help="Select features (and fit the slim model) with L1-penalized LR at this C.")
+    parser.add_argument("--features", default=None, help="Feature store or legacy pickle (default: data/processed).")
+    parser.add_argument("--models-dir", default=None)
+    args = parser.parse_args()
+
+    keep = args.keep
+    if keep is None and args.threshold is None and args.l1_C is None:
+        keep = DEFAULT_KEEP
+
+    models_dir = args.models_dir or find_models_dir()
+    model, vectorizer = load_model_and_vectorizer(models_dir)
+    data = load_features(args.features)
+    X, y = data['X'].astype(np.float64), np.asarray(data['y'])
+    if list(data['feature_names']) != list(vectorizer.get_feature_names_out()):
+        raise ValueError("Feature store columns do not match tfidf_vectorizer.pkl; re-run vectorizer_data.py.")
+
+    print(f"✂️ Selecting features from {X.shape[1]:,}...")
+    columns = select_features(model, X, y, keep, args.threshold, args.l1_C)
+    print(f"   Keeping {len(columns):,} features ({len(columns) / X.shape[1]:.0%})")
+
+    print("📊 Evaluating on a held-out split...")
+    metrics = evaluate_pruning(model, X, y, keep, args.threshold, args.l1_C)
+
+    print("🧠 Fitting the slim model on all data...")
+    slim_model = (l1_model(args.l1_C) if args.l1_C is not None else clone(model)).fit(prune_matrix(X, columns), y)
+    slim_vectorizer = prune_vectorizer(vectorizer, columns)
+
+    slim_model_path = os.path.join(models_dir, SLIM_MODEL_FILENAME)
+    slim_vectorizer_path = os.path.join(models_dir, SLIM_VECTORIZER_FILENAME)
+    with open(slim_model_path, 'wb') as f:
+        pickle.dump(slim_model, f)
+    with open(slim_vectorizer_path, 'wb') as f:
+        pickle.dump(slim_vectorizer, f)
+
+    texts = _timing_texts()
+    full_stats = _artifact_stats(os.path.join(models_dir, MODEL_FILENAME),
+                                 os.path.join(models_dir, VECTORIZER_FILENAME), texts)
+    slim_stats = _artifact_stats(slim_model_path, slim_vectorizer_path, texts)
+
+    print("\n" + "=" * 60)
+    print("PRUNING REPORT")
+    print("=" * 60)
+    print(f"   {'':<24}{'full':>12}{'slim':>12}")
+    print(f"   {'features':<24}{X.shape[1]:>12,}{len(columns):>12,}")
+    print(f"   {'accuracy':<24}{metrics['full_accuracy']:>12.4f}{metrics['slim_accuracy']:>12.4f}")
+    print(f"   {'macro-F1':<24}{metrics['full_macro_f1']:>12.4f}{metrics['slim_macro_f1']:>12.4f}")
+    print(f"   {'artifact size (KB)':<24}{full_stats['bytes'] / 1024:>12.1f}{slim_stats['bytes'] / 1024:>12.1f}")
+    print(f"   {'load time (ms)':<24}{full_stats['load_ms']:>12.2f}{slim_stats['load_ms']:>12.2f}")
+    print(f"   {'transform (us/doc)':<24}{full_stats['transform_us_per_doc']:>12.1f}"
+          f"{slim_stats['transform_us_per_doc']:>12.1f}")
+    print(f"\n   Accuracy delta: {metrics['slim_accuracy'] - metrics['full_accuracy']:+.4f}, "
+          f"macro-F1 delta: {metrics['slim_macro_f1'] - metrics['full_macro_f1']:+.4f}")
+    print(f"💾 Saved {slim_model_path} and {slim_vectorizer_path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,196 @@
+import os
+import time
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from model_assets import load_assets, predict_proba_clean, MODEL_FILENAME, VECTORIZER_FILENAME
+from text_preprocessing import preprocess_batch
+
+DEFAULT_CHUNK_SIZE = 10000
+TEXT_FALLBACK_COLUMNS = ['title', 'body', 'text', 'meme_text']
+
+# Per-process assets, populated by _init_worker
+_ASSETS = {}
+
+
+def _init_worker(models_dir, model_name, vectorizer_name):
+    """Load model and vectorizer once per process (the mapped artifact if one was exported)"""
+    model, vectorizer = load_assets(models_dir, model_name, vectorizer_name)
+    _ASSETS['model'] = model
+    _ASSETS['vectorizer'] = vectorizer
+
+
+def detect_format(path):
+    """Infer 'csv' or 'jsonl' from the file extension"""
+    ext = os.path.splitext(path)[1].lower()
+    if ext in ('.jsonl', '.ndjson', '.json'):
+        return 'jsonl'
+    return 'csv'
+
+
+def iter_chunks(path, chunk_size=DEFAULT_CHUNK_SIZE, fmt=None):
+    """Stream the input file as DataFrame chunks of at most chunk_size rows"""
+    fmt = fmt or detect_format(path)
+    if fmt == 'jsonl':
+        reader = pd.read_json(path, lines=True, chunksize=chunk_size)
+    else:
+        reader = pd.read_csv(path, chunksize=chunk_size)
+    with reader:
+        for chunk in reader:
+            yield chunk
+
+
+def extract_texts(chunk, text_column):
+    """
+    Pull raw text out of a chunk. Falls back to Title + Body style
+    columns (same as vectorizer_data.py) if text_column is absent.
+    """
+    if text_column in chunk.columns:
+        return chunk[text_column].fillna('').astype(str)
+
+    available = [c for c in TEXT_FALLBACK_COLUMNS if c in chunk.columns]
+    if not available:
+        raise KeyError(f"Column '{text_column}' not found and no fallback text columns present.")
+
+    combined = chunk[available[0]].fillna('').astype(str)
+    for col in available[1:]:
+        combined = combined + " " + chunk[col].fillna('').astype(str)
+    return combined
+
+
+def score_texts(texts):
+    """
+    Batched transform + predict_proba over raw texts (list or Series).
+    Returns (predictions, probability matrix, classes).
+    """
+    model = _ASSETS['model']
+    vectorizer = _ASSETS['vectorizer']
+
+    clean = preprocess_batch(texts)
+    probs = predict_proba_clean(model, vectorizer, clean)
+    classes = np.asarray(model.classes_)
+    predictions = classes[np.argmax(probs, axis=1)]
+    return predictions, probs, classes
+
+
+def score_chunk(chunk, text_column, id_columns, include_all_probs=False):
+    """Score one DataFrame chunk and return the output rows as a DataFrame"""
+    texts = extract_texts(chunk, text_column)
+    predictions, probs, classes = score_texts(texts)
+
+    out = pd.DataFrame(index=chunk.index)
+    for col in id_columns:
+        if col in chunk.columns:
+            out[col] = chunk[col].values
+    out['prediction'] = predictions
+
+    si_index = list(classes).index('SI')
+    out['si_probability'] = probs[:, si_index]
+    if include_all_probs:
+        for i, label in enumerate(classes):
+            out[f'prob_{label}'] = probs[:, i]
+    return out
+
+
+def write_chunk(out, output_path, fmt, first):
+    """Append a scored chunk to the output file"""
+    if fmt == 'jsonl':
+        with open(output_path, 'w' if first else 'a', encoding='utf-8') as f:
+            out.to_json(f, orient='records', lines=True, force_ascii=False)
+    else:
+        out.to_csv(output_path, mode='w' if first else 'a', header=first, index=False)
+
+
+def score_file(input_path, output_path, text_column='combined_text', id_columns=('id',),
+               chunk_size=DEFAULT_CHUNK_SIZE, n_jobs=1, include_all_probs=False,
+               models_dir=None, model_name=MODEL_FILENAME, vectorizer_name=VECTORIZER_FILENAME):
+    """
+    Stream input_path in fixed-size chunks, score each chunk in one batched
+    transform/predict call and append results to output_path as we go.
+    With n_jobs > 1 chunks are scored in a process pool; at most 2 * n_jobs
+    chunks are in flight so memory stays flat regardless of input size.
+    """
+    in_fmt = detect_format(input_path)
+    out_fmt = detect_format(output_path)
+    id_columns = list(id_columns)
+
+    out_dir = os.path.dirname(output_path)
+    if out_dir:
+        os.makedirs(out_dir, exist_ok=True)
+
+    start = time.perf_counter()
+    total = 0
+    first = True
+    chunks = iter_chunks(input_path, chunk_size, in_fmt)
+
+    if n_jobs <= 1:
+        _init_worker(models_dir, model_name, vectorizer_name)
+        for chunk in chunks:
+            out = score_chunk(chunk, text_column, id_columns, include_all_probs)
+            write_chunk(out, output_path, out_fmt, first)
+            first = False
+            total += len(out)
+            print(f"   Scored {total:,} rows...")
+    else:
+        max_in_flight = 2 * n_jobs
+        with ProcessPoolExecutor(max_workers=n_jobs, initializer=_init_worker,
+                                 initargs=(models_dir, model_name, vectorizer_name)) as pool:
+            pending = []
+            for chunk in chunks:
+                pending.append(pool.submit(score_chunk, chunk, text_column, id_columns, include_all_probs))
+                # Drain in submission order to preserve row order in the output
+                while len(pending) >= max_in_flight:
+                    out = pending.pop(0).result()
+                    write_chunk(out, output_path, out_fmt, first)
+                    first = False
+                    total += len(out)
+                    print(f"   Scored {total:,} rows...")
+            for future in pending:
+                out = future.result()
+                write_chunk(out, output_path, out_fmt, first)
+                first = False
+                total += len(out)
+                print(f"   Scored {total:,} rows...")
+
+    elapsed = time.perf_counter() - start
+    rate = total / elapsed if elapsed > 0 else 0.0
+    print(f"✅ Scored {total:,} rows in {elapsed:.1f}s ({rate:,.0f} rows/s)")
+    print(f"💾 Predictions written to: {output_path}")
+    return total
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Bulk-score CSV/JSONL posts with the TF-IDF + LR model.")
+    parser.add_argument("input", help="Input .csv or .jsonl file")
+    parser.add_argument("output", help="Output .csv or .jsonl file")
+    parser.add_argument("--text-column", default="combined_text", help="Column holding the raw text.")
+    parser.add_argument("--id-column", action="append", dest="id_columns",
+                        help="Column(s) to copy through to the output (default: id).")
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE, help="Rows per batch.")
+    parser.add_argument("--jobs", type=int, default=1, help="Worker processes (1 = in-process).")
+    parser.add_argument("--all-probs", action="store_true", help="Also write per-class probabilities.")
+    parser.add_argument("--models-dir", default=None, help="Directory holding the model pickles.")
+    parser.add_argument("--model", default=MODEL_FILENAME, help="Model filename inside models dir.")
+    parser.add_argument("--vectorizer", default=VECTORIZER_FILENAME, help="Vectorizer filename inside models dir.")
+    args = parser.parse_args()
+
+    print(f"⏳ Scoring {args.input} in chunks of {args.chunk_size:,} rows ({args.jobs} job(s))...")
+    score_file(
+        args.input,
+        args.output,
+        text_column=args.text_column,
+        id_columns=args.id_columns or ['id'],
+        chunk_size=args.chunk_size,
+        n_jobs=args.jobs,
+        include_all_probs=args.all_probs,
+        models_dir=args.models_dir,
+        model_name=args.model,
+        vectorizer_name=args.vectorizer,
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,211 @@
+import json
+import time
+import queue
+import argparse
+import threading
+from concurrent.futures import Future
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import numpy as np
+
+from model_assets import load_assets, predict_proba_clean
+from compiled_model import compile_verified
+from text_preprocessing import preprocess_batch, preprocess_text
+
+DEFAULT_MAX_BATCH_SIZE = 64
+DEFAULT_MAX_WAIT_MS = 5.0
+MAX_BODY_BYTES = 1 << 20
+
+
+class MicroBatcher:
+    """
+    Collects concurrent scoring requests into micro-batches.
+    A batch is flushed when it reaches max_batch_size or when the oldest
+    request has waited max_wait_ms, then scored with one transform and
+    one predict_proba call. A batch of one goes through fast_model (a
+    CompiledLinearModel) when given, skipping the sparse transform.
+    """
+
+    def __init__(self, model, vectorizer, max_batch_size=DEFAULT_MAX_BATCH_SIZE,
+                 max_wait_ms=DEFAULT_MAX_WAIT_MS, fast_model=None):
+        self.model = model
+        self.vectorizer = vectorizer
+        self.fast_model = fast_model
+        self.classes = [str(c) for c in model.classes_]
+        self.si_index = self.classes.index('SI')
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000.0
+        self._queue = queue.Queue()
+        self._stats_lock = threading.Lock()
+        self.batches = 0
+        self.items = 0
+        self.busy_seconds = 0.0
+        self._thread = threading.Thread(target=self._run, name='micro-batcher', daemon=True)
+        self._thread.start()
+
+    def submit(self, text):
+        """Queue one raw text; returns a Future resolving to its result dict"""
+        future = Future()
+        self._queue.put((text, future))
+        return future
+
+    def _collect(self):
+        batch = [self._queue.get()]
+        deadline = time.monotonic() + self.max_wait
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self):
+        while True:
+            batch = self._collect()
+            texts = [text for text, _ in batch]
+            start = time.perf_counter()
+            try:
+                if len(texts) == 1 and self.fast_model is not None:
+                    probs = np.array([self.fast_model.predict_proba_clean(preprocess_text(texts[0]))])
+                else:
+                    probs = predict_proba_clean(self.model, self.vectorizer, preprocess_batch(texts))
+            except Exception as e:
+                for _, future in batch:
+                    future.set_exception(e)
+                continue
+
+            predictions = np.argmax(probs, axis=1)
+            for i, (_, future) in enumerate(batch):
+                future.set_result({
+                    'prediction': self.classes[predictions[i]],
+                    'si_probability': float(probs[i, self.si_index]),
+                    'probabilities': {c: float(p) for c, p in zip(self.classes, probs[i])},
+                })
+
+            with self._stats_lock:
+                self.batches += 1
+                self.items += len(batch)
+                self.busy_seconds += time.perf_counter() - start
+
+    def stats(self):
+        with self._stats_lock:
+            return {
+                'batches': self.batches,
+                'items': self.items,
+                'avg_batch_size': self.items / self.batches if self.batches else 0.0,
+                'busy_seconds': round(self.busy_seconds, 4),
+                'queue_depth': self._queue.qsize(),
+                'max_batch_size': self.max_batch_size,
+                'max_wait_ms': self.max_wait * 1000.0,
+            }
+
+
+class ScoringServer(ThreadingHTTPServer):
+    daemon_threads = True
+    # The stdlib default listen backlog of 5 resets connections under bursty load
+    request_queue_size = 256
+
+
+def make_handler(batcher, request_timeout=30.0):
+    """Build the request handler class bound to one MicroBatcher"""
+
+    class ScoringHandler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'
+
+        def _send_json(self, status, payload):
+            body = json.dumps(payload).encode('utf-8')
+            self.send_response(status)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_GET(self):
+            if self.path == '/health':
+                self._send_json(200, {'status': 'ok'})
+            elif self.path == '/stats':
+                self._send_json(200, batcher.stats())
+            else:
+                self._send_json(404, {'error': 'not found'})
+
+        def do_POST(self):
+            if self.path != '/predict':
+                self._send_json(404, {'error': 'not found'})
+                return
+
+            length = int(self.headers.get('Content-Length') or 0)
+            if length <= 0 or length > MAX_BODY_BYTES:
+                self._send_json(413 if length > MAX_BODY_BYTES else 400, {'error': 'invalid body size'})
+                return
+            try:
+                payload = json.loads(self.rfile.read(length))
+            except ValueError:
+                self._send_json(400, {'error': 'body must be JSON'})
+                return
+
+            # Accept {"text": "..."} or {"texts": ["...", ...]}
+            if isinstance(payload, dict) and isinstance(payload.get('text'), str):
+                texts, single = [payload['text']], True
+            elif isinstance(payload, dict) and isinstance(payload.get('texts'), list) \
+                    and all(isinstance(t, str) for t in payload['texts']):
+                texts, single = payload['texts'], False
+            else:
+                self._send_json(400, {'error': "expected {'text': str} or {'texts': [str]}"})
+                return
+
+            futures = [batcher.submit(t) for t in texts]
+            try:
+                results = [f.result(timeout=request_timeout) for f in futures]
+            except Exception as e:
+                self._send_json(500, {'error': str(e)})
+                return
+
+            self._send_json(200, results[0] if single else {'results': results})
+
+        def log_message(self, format, *args):
+            # Per-request access logs would dominate at hundreds of req/s
+            pass
+
+    return ScoringHandler
+
+
+def create_server(host='127.0.0.1', port=8000, max_batch_size=DEFAULT_MAX_BATCH_SIZE,
+                  max_wait_ms=DEFAULT_MAX_WAIT_MS, models_dir=None):
+    """Load the model assets and return (server, batcher) without starting to serve"""
+    model, vectorizer = load_assets(models_dir)
+    # A mapped model already scores text by text; pickles get a parity-checked compiled scorer
+    fast_model = compile_verified(model, vectorizer) if vectorizer is not None else None
+    batcher = MicroBatcher(model, vectorizer, max_batch_size=max_batch_size, max_wait_ms=max_wait_ms,
+                           fast_model=fast_model)
+    server = ScoringServer((host, port), make_handler(batcher))
+    return server, batcher
+
+
+def main():
+    parser = argparse.ArgumentParser(description="HTTP scoring service with dynamic micro-batching.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--max-batch-size", type=int, default=DEFAULT_MAX_BATCH_SIZE,
+                        help="Flush a batch once it holds this many texts.")
+    parser.add_argument("--max-wait-ms", type=float, default=DEFAULT_MAX_WAIT_MS,
+                        help="Flush a batch once its oldest text has waited this long.")
+    parser.add_argument("--models-dir", default=None, help="Directory holding the model pickles.")
+    args = parser.parse_args()
+
+    print("⏳ Loading model assets...")
+    server, _ = create_server(args.host, args.port, args.max_batch_size, args.max_wait_ms, args.models_dir)
+    print(f"🚀 Serving on http://{args.host}:{args.port} (POST /predict, GET /health, GET /stats)")
+    print(f"   Micro-batching: max {args.max_batch_size} texts / {args.max_wait_ms} ms")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("\n👋 Shutting down")
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
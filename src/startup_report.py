@@ -0,0 +1,162 @@
+import os
+import ast
+import sys
+import json
+import argparse
+import subprocess
+
+SRC_DIR = os.path.dirname(os.path.abspath(__file__))
+APP_PATH = os.path.join(SRC_DIR, 'app', 'app.py')
+
+
+def app_imports(path=APP_PATH):
+    """
+    Non-stdlib modules app.py imports at top level, in import order, read
+    from its source so the list cannot drift from the app.
+    """
+    with open(path, 'r', encoding='utf-8') as f:
+        tree = ast.parse(f.read(), filename=path)
+
+    modules = []
+    for node in tree.body:
+        if isinstance(node, ast.Import):
+            names = [alias.name for alias in node.names]
+        elif isinstance(node, ast.ImportFrom) and node.level == 0 and node.module:
+            names = [node.module]
+        else:
+            continue
+        for name in names:
+            if name.split('.')[0] not in sys.stdlib_module_names and name not in modules:
+                modules.append(name)
+    return modules
+
+
+# Modules on the app's startup path, in the order app.py imports them
+STARTUP_MODULES = app_imports()
+
+# Heavy dependencies that should only load on first use
+DEFERRED_MODULES = [
+    'lime.lime_text',
+    'nltk',
+]
+
+# Time to unpickle the assets (pulls in sklearn) in the same interpreter
+LOAD_ASSETS_SNIPPET = """
+import time
+from model_assets import load_model_and_vectorizer
+start = time.perf_counter()
+load_model_and_vectorizer()
+print('LOAD_ASSETS_MS', (time.perf_counter() - start) * 1000)
+"""
+
+
+def _run_importtime(code):
+    """Run code in a fresh interpreter with -X importtime; return (stderr, stdout, returncode)"""
+    env = dict(os.environ)
+    env['PYTHONPATH'] = SRC_DIR + os.pathsep + env.get('PYTHONPATH', '')
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', code],
+        capture_output=True, text=True, env=env, cwd=SRC_DIR,
+    )
+    return result.stderr, result.stdout, result.returncode
+
+
+def parse_importtime(stderr):
+    """
+    Parse -X importtime output into {module: cumulative_ms} for top-level
+    imports (nested imports are indented and folded into their parent).
+    """
+    totals = {}
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative_us, name = line[len('import time:'):].split('|')
+        if name[1:].startswith(' '):
+            continue
+        totals[name.strip()] = int(cumulative_us) / 1000.0
+    return totals
+
+
+def measure_module(module):
+    """Cumulative import time of one module in a fresh interpreter (None if not installed)"""
+    stderr, _, code = _run_importtime(f"import {module}")
+    if code != 0:
+        return None
+    totals = parse_importtime(stderr)
+    return totals.get(module, sum(totals.values()))
+
+
+def measure_startup(modules=STARTUP_MODULES, include_assets=True):
+    """
+    Per-module import time along the real startup path, in one interpreter.
+    Also returns which deferred modules got imported eagerly anyway.
+    """
+    code = "\n".join(f"import {m}" for m in modules)
+    code += f"\nimport sys\nprint('EAGER', ','.join(m for m in {DEFERRED_MODULES!r} if m in sys.modules))"
+    if include_assets:
+        code += "\n" + LOAD_ASSETS_SNIPPET
+    stderr, stdout, returncode = _run_importtime(code)
+    if returncode != 0:
+        raise RuntimeError(stderr.strip().splitlines()[-1] if stderr.strip() else "startup probe failed")
+
+    totals = parse_importtime(stderr)
+    report = {m: totals.get(m, 0.0) for m in modules}
+    eager = []
+    for line in stdout.splitlines():
+        if line.startswith('LOAD_ASSETS_MS'):
+            report['load_assets (unpickle)'] = float(line.split()[1])
+        elif line.startswith('EAGER '):
+            eager = [m for m in line[len('EAGER '):].split(',') if m]
+    return report, eager
+
+
+def build_report():
+    startup, eager = measure_startup()
+    deferred = {m: measure_module(m) for m in DEFERRED_MODULES}
+    return {
+        'python': sys.version.split()[0],
+        'startup_ms': startup,
+        'startup_total_ms': round(sum(startup.values()), 1),
+        'deferred_ms': deferred,
+        'deferred_imported_at_startup': eager,
+    }
+
+
+def print_report(report):
+    print("=" * 60)
+    print("STARTUP TIME REPORT")
+    print("=" * 60)
+    print("Startup path (cumulative import time, one interpreter):")
+    for name, ms in report['startup_ms'].items():
+        print(f"   {name:<32} {ms:9.1f} ms")
+    print(f"   {'TOTAL':<32} {report['startup_total_ms']:9.1f} ms")
+    print("\nDeferred until first use (isolated import time):")
+    for name, ms in report['deferred_ms'].items():
+        value = "not installed" if ms is None else f"{ms:9.1f} ms"
+        print(f"   {name:<32} {value}")
+    if report['deferred_imported_at_startup']:
+        print(f"\n⚠️ Imported at startup but should be deferred: {', '.join(report['deferred_imported_at_startup'])}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure app startup time, per imported module.")
+    parser.add_argument("--json", default=None, help="Also write the report as JSON to this path.")
+    parser.add_argument("--budget-ms", type=float, default=None,
+                        help="Exit non-zero if total startup time exceeds this budget.")
+    args = parser.parse_args()
+
+    report = build_report()
+    print_report(report)
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+        print(f"\n💾 Report written to: {args.json}")
+
+    if args.budget_ms is not None and report['startup_total_ms'] > args.budget_ms:
+        print(f"\n❌ Startup took {report['startup_total_ms']:.1f} ms (budget {args.budget_ms:.1f} ms)")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
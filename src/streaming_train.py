@@ -0,0 +1,181 @@
+import os
+import time
+import pickle
+import argparse
+import tempfile
+
+import numpy as np
+import scipy.sparse as sp
+from sklearn.linear_model import SGDClassifier
+from sklearn.metrics import classification_report, f1_score
+
+from text_preprocessing import preprocess_batch
+from hashing_features import HashingTfidfVectorizer, DEFAULT_N_FEATURES
+from score import iter_chunks, extract_texts, DEFAULT_CHUNK_SIZE
+import profiling
+
+DEFAULT_EPOCHS = 3
+STREAMING_MODEL_FILENAME = 'sgd_streaming_model.pkl'
+STREAMING_VECTORIZER_FILENAME = 'hashing_tfidf_vectorizer.pkl'
+
+
+def balanced_class_weight(class_counts):
+    """Same weights as class_weight='balanced', which partial_fit does not accept"""
+    total = sum(class_counts.values())
+    return {c: total / (len(class_counts) * n) for c, n in class_counts.items()}
+
+
+def _labeled_rows(chunk, text_column, label_column):
+    chunk = chunk[chunk[label_column].notna()]
+    texts = extract_texts(chunk, text_column)
+    return chunk, preprocess_batch(texts).tolist(), chunk[label_column].astype(str).values
+
+
+def featurize_pass(input_path, spill_dir, text_column='combined_text', label_column='prelim_label',
+                   chunk_size=DEFAULT_CHUNK_SIZE, holdout_column=None, holdout_value='test',
+                   n_features=DEFAULT_N_FEATURES):
+    """
+    Single streaming pass over the corpus: clean and hash each chunk, update
+    document frequencies and class counts, and spill the hashed counts to
+    spill_dir so later epochs never re-read or re-clean the raw text.
+    Returns (vectorizer, class_counts, spilled chunk paths).
+    """
+    vectorizer = HashingTfidfVectorizer(n_features=n_features)
+    class_counts = {}
+    spilled = []
+
+    for i, chunk in enumerate(iter_chunks(input_path, chunk_size)):
+        chunk, clean, y = _labeled_rows(chunk, text_column, label_column)
+        if not len(y):
+            continue
+        counts = vectorizer.hash_counts(clean)
+
+        if holdout_column and holdout_column in chunk.columns:
+            holdout = (chunk[holdout_column].astype(str) == holdout_value).values
+        else:
+            holdout = np.zeros(len(y), dtype=bool)
+
+        # IDF and class weights come from training rows only
+        train_counts = counts[~holdout]
+        vectorizer.partial_fit_counts(train_counts)
+        for label, n in zip(*np.unique(y[~holdout], return_counts=True)):
+            class_counts[label] = class_counts.get(label, 0) + int(n)
+
+        path = os.path.join(spill_dir, f'chunk_{i:06d}')
+        sp.save_npz(path + '.npz', counts)
+        np.save(path + '.labels.npy', y.astype('U'))
+        np.save(path + '.holdout.npy', holdout)
+        spilled.append(path)
+        print(f"   Hashed {vectorizer.n_documents:,} training posts "
+              f"(peak RSS {profiling.process_peak_rss_bytes() / 2 ** 20:.0f} MB)...")
+
+    vectorizer.finalize()
+    return vectorizer, class_counts, spilled
+
+
+def _load_spilled(path):
+    counts = sp.load_npz(path + '.npz').tocsr()
+    y = np.load(path + '.labels.npy')
+    holdout = np.load(path + '.holdout.npy')
+    return counts, y, holdout
+
+
+def train_streaming(input_path, text_column='combined_text', label_column='prelim_label',
+                    chunk_size=DEFAULT_CHUNK_SIZE, epochs=DEFAULT_EPOCHS, alpha=1e-5,
+                    holdout_column='split', holdout_value='test', n_features=DEFAULT_N_FEATURES,
+                    spill_dir=None, random_state=42):
+    """
+    Out-of-core training: one featurization pass, then `epochs` passes of
+    SGDClassifier.partial_fit (logistic loss) over the spilled chunks in
+    shuffled order. Memory stays bounded by chunk_size, not corpus size.
+    Returns (model, vectorizer, report dict).
+    """
+    start = time.perf_counter()
+    with tempfile.TemporaryDirectory(dir=spill_dir) as tmp:
+        vectorizer, class_counts, spilled = featurize_pass(
+            input_path, tmp, text_column, label_column, chunk_size,
+            holdout_column, holdout_value, n_features,
+        )
+        if not class_counts:
+            raise ValueError(f"No labeled rows found in {input_path} (label column '{label_column}').")
+        classes = np.array(sorted(class_counts))
+        featurize_seconds = time.perf_counter() - start
+
+        model = SGDClassifier(
+            loss='log_loss',
+            alpha=alpha,
+            class_weight=balanced_class_weight(class_counts),
+            random_state=random_state,
+        )
+        rng = np.random.default_rng(random_state)
+        for epoch in range(epochs):
+            for idx in rng.permutation(len(spilled)):
+                counts, y, holdout = _load_spilled(spilled[idx])
+                if (~holdout).any():
+                    X = vectorizer.transform_counts(counts[~holdout])
+                    model.partial_fit(X, y[~holdout], classes=classes)
+            print(f"   Epoch {epoch + 1}/{epochs} done "
+                  f"(peak RSS {profiling.process_peak_rss_bytes() / 2 ** 20:.0f} MB)")
+
+        y_true, y_pred = [], []
+        for path in spilled:
+            counts, y, holdout = _load_spilled(path)
+            if holdout.any():
+                y_true.extend(y[holdout])
+                y_pred.extend(model.predict(vectorizer.transform_counts(counts[holdout])))
+
+    report = {
+        'train_documents': vectorizer.n_documents,
+        'class_counts': class_counts,
+        'featurize_seconds': featurize_seconds,
+        'total_seconds': time.perf_counter() - start,
+        'peak_rss_mb': profiling.process_peak_rss_bytes() / 2 ** 20,
+        'holdout_documents': len(y_true),
+    }
+    if y_true:
+        report['holdout_macro_f1'] = f1_score(y_true, y_pred, average='macro')
+        report['holdout_report'] = classification_report(y_true, y_pred, zero_division=0)
+    return model, vectorizer, report
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Out-of-core training: hashed TF-IDF + SGD logistic regression.")
+    parser.add_argument("input", help="Labeled .csv or .jsonl corpus (streamed, never fully loaded).")
+    parser.add_argument("--text-column", default="combined_text")
+    parser.add_argument("--label-column", default="prelim_label")
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE, help="Rows held in memory at once.")
+    parser.add_argument("--epochs", type=int, default=DEFAULT_EPOCHS)
+    parser.add_argument("--alpha", type=float, default=1e-5, help="SGD regularization strength.")
+    parser.add_argument("--n-features", type=int, default=DEFAULT_N_FEATURES, help="Hashing space size.")
+    parser.add_argument("--holdout-column", default="split", help="Column marking evaluation rows (if present).")
+    parser.add_argument("--holdout-value", default="test")
+    parser.add_argument("--spill-dir", default=None, help="Where to spill hashed chunks (default: system temp).")
+    parser.add_argument("--output-dir", default="models")
+    args = parser.parse_args()
+
+    print(f"⏳ Streaming {args.input} in chunks of {args.chunk_size:,} rows...")
+    model, vectorizer, report = train_streaming(
+        args.input, args.text_column, args.label_column, args.chunk_size, args.epochs, args.alpha,
+        args.holdout_column, args.holdout_value, args.n_features, args.spill_dir,
+    )
+    print(f"✅ Trained on {report['train_documents']:,} posts in {report['total_seconds']:.1f}s "
+          f"(featurization {report['featurize_seconds']:.1f}s, peak RSS {report['peak_rss_mb']:.0f} MB)")
+    if 'holdout_macro_f1' in report:
+        print(f"📊 Holdout ({report['holdout_documents']:,} posts) macro-F1: {report['holdout_macro_f1']:.4f}")
+        print(report['holdout_report'])
+
+    os.makedirs(args.output_dir, exist_ok=True)
+    model_path = os.path.join(args.output_dir, STREAMING_MODEL_FILENAME)
+    vectorizer_path = os.path.join(args.output_dir, STREAMING_VECTORIZER_FILENAME)
+    with open(model_path, 'wb') as f:
+        pickle.dump(model, f)
+    with open(vectorizer_path, 'wb') as f:
+        pickle.dump(vectorizer, f)
+    print(f"💾 Saved model to: {model_path}")
+    print(f"💾 Saved vectorizer to: {vectorizer_path}")
+    print(f"👉 Score with: python src/score.py IN OUT --model {STREAMING_MODEL_FILENAME} "
+          f"--vectorizer {STREAMING_VECTORIZER_FILENAME}")
+
+
+if __name__ == "__main__":
+    main()
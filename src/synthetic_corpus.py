@@ -0,0 +1,167 @@
+import os
+import time
+import argparse
+
+import numpy as np
+import pandas as pd
+
+from text_preprocessing import STOP_WORDS_PATH
+
+# Label mix of the collected dataset (data/raw/post_ids.csv)
+LABEL_MIX = {'MH': 0.398, 'HUMOR': 0.301, 'SI': 0.183, 'NEU': 0.118}
+
+# Lognormal word-count model per label: (median words, sigma). Posts span
+# 15-2,932 words, most 50-500; memes and titles in HUMOR run much shorter.
+LENGTH_MODEL = {'SI': (90, 0.8), 'MH': (110, 0.8), 'NEU': (60, 0.7), 'HUMOR': (20, 0.9)}
+MIN_WORDS, MAX_WORDS = 15, 2932
+
+# Share of tokens drawn from the label's cue words (the rest is shared background)
+CUE_RATE = 0.08
+CUE_WORDS = {
+    'SI': "die dying suicide suicidal kill myself end it all goodbye overdose pills rope bridge "
+          "burden worthless hopeless trapped plan note tonight final can't anymore no point".split(),
+    'MH': "depression depressed anxiety anxious therapy therapist medication meds panic attack "
+          "lonely numb exhausted diagnosed bpd episode struggling cope coping vent sad".split(),
+    'HUMOR': "lol lmao meme memes funny joke dank bruh upvote literally me irl when you "
+             "ratio cringe based fr tho deadass".split(),
+    'NEU': "college class exam semester professor assignment internship roommate campus "
+           "placement job weekend city trip hostel canteen".split(),
+}
+# Cues that bleed across classes, as in real posts (MH posts mention SI words and vice versa)
+CUE_OVERLAP = {'SI': ['MH'], 'MH': ['SI'], 'HUMOR': ['SI'], 'NEU': []}
+OVERLAP_RATE = 0.25
+
+# Reddit artifacts the preprocessing has to strip
+ARTIFACTS = ["https://i.redd.it/abc123.jpg", "www.example.com", "u/throwaway_123", "r/SuicideWatch",
+             "r/memes", "2am", "24/7", ":(", ":)", "!!!", "...", "i'm", "don't", "won't", "can't"]
+ARTIFACT_RATE = 0.01
+
+BACKGROUND_VOCAB_SIZE = 20000
+STOP_WORD_RATE = 0.4
+SPLITS = ('train', 'val', 'test')
+SPLIT_WEIGHTS = (0.8, 0.1, 0.1)
+
+
+def _pseudo_words(n, rng):
+    """Deterministic pronounceable filler vocabulary"""
+    consonants = list("bcdfghklmnprstvwz")
+    vowels = list("aeiou")
+    words = set()
+    while len(words) < n:
+        syllables = rng.integers(1, 4)
+        words.add("".join(rng.choice(consonants) + rng.choice(vowels) for _ in range(syllables)))
+    # Shuffle so Zipf ranks are not tied to alphabetical order
+    return rng.permutation(np.array(sorted(words), dtype=object))
+
+
+def _stop_words():
+    with open(STOP_WORDS_PATH, 'r', encoding='utf-8') as f:
+        return np.array([line.strip() for line in f if line.strip()], dtype=object)
+
+
+class CorpusGenerator:
+    """
+    Deterministic Reddit-like corpus: the same (seed, n_docs, chunk_size)
+    always yields the same posts. Background words follow a Zipf law,
+    about 40% of tokens are stopwords, CUE_RATE of tokens carry label signal
+    and a few Reddit artifacts (URLs, mentions, emoticons) are mixed in.
+    """
+
+    def __init__(self, seed=0):
+        self.seed = seed
+        rng = np.random.default_rng(seed)
+        self.background = _pseudo_words(BACKGROUND_VOCAB_SIZE, rng)
+        ranks = np.arange(1, len(self.background) + 1)
+        self.background_cdf = np.cumsum(1.0 / ranks) / np.sum(1.0 / ranks)
+        self.stop_words = _stop_words()
+        self.artifacts = np.array(ARTIFACTS, dtype=object)
+        self.labels = np.array(list(LABEL_MIX), dtype=object)
+        self.label_p = np.array(list(LABEL_MIX.values())) / sum(LABEL_MIX.values())
+        self.cues = {label: np.array(words, dtype=object) for label, words in CUE_WORDS.items()}
+
+    def _lengths(self, labels, rng):
+        lengths = np.empty(len(labels), dtype=np.int64)
+        for label, (median, sigma) in LENGTH_MODEL.items():
+            mask = labels == label
+            lengths[mask] = rng.lognormal(np.log(median), sigma, mask.sum())
+        return np.clip(lengths, MIN_WORDS, MAX_WORDS)
+
+    def _cue_tokens(self, word_labels, rng):
+        tokens = np.empty(len(word_labels), dtype=object)
+        for label, cues in self.cues.items():
+            mask = word_labels == label
+            n = int(mask.sum())
+            if not n:
+                continue
+            pool = [cues] + [self.cues[other] for other in CUE_OVERLAP[label]]
+            if len(pool) > 1:
+                borrowed = rng.random(n) < OVERLAP_RATE
+                picks = rng.choice(cues, n)
+                picks[borrowed] = rng.choice(np.concatenate(pool[1:]), int(borrowed.sum()))
+            else:
+                picks = rng.choice(cues, n)
+            tokens[mask] = picks
+        return tokens
+
+    def chunk(self, start, n_docs):
+        """Posts start .. start + n_docs as a DataFrame (seeded by position, so chunks are reproducible)"""
+        rng = np.random.default_rng([self.seed, start])
+        labels = rng.choice(self.labels, n_docs, p=self.label_p)
+        lengths = self._lengths(labels, rng)
+        total = int(lengths.sum())
+
+        words = self.background[np.searchsorted(self.background_cdf, rng.random(total))]
+        kind = rng.random(total)
+        stop = kind < STOP_WORD_RATE
+        words[stop] = rng.choice(self.stop_words, int(stop.sum()))
+        cue = (kind >= STOP_WORD_RATE) & (kind < STOP_WORD_RATE + CUE_RATE)
+        word_labels = np.repeat(labels, lengths)
+        words[cue] = self._cue_tokens(word_labels[cue], rng)
+        artifact = kind > 1.0 - ARTIFACT_RATE
+        words[artifact] = rng.choice(self.artifacts, int(artifact.sum()))
+
+        bounds = np.concatenate([[0], np.cumsum(lengths)])
+        texts = [" ".join(words[b:e]).capitalize() for b, e in zip(bounds[:-1], bounds[1:])]
+
+        ids = [f"syn{start + i:09d}" for i in range(n_docs)]
+        splits = rng.choice(np.array(SPLITS, dtype=object), n_docs, p=SPLIT_WEIGHTS)
+        return pd.DataFrame({
+            'id': ids,
+            'combined_text': texts,
+            'prelim_label': labels,
+            'split': splits,
+        })
+
+    def iter_chunks(self, n_docs, chunk_size=50000):
+        for start in range(0, n_docs, chunk_size):
+            yield self.chunk(start, min(chunk_size, n_docs - start))
+
+
+def generate_corpus(path, n_docs, seed=0, chunk_size=50000):
+    """Stream n_docs synthetic posts to a CSV without holding them all in memory"""
+    out_dir = os.path.dirname(path)
+    if out_dir:
+        os.makedirs(out_dir, exist_ok=True)
+    generator = CorpusGenerator(seed)
+    for i, chunk in enumerate(generator.iter_chunks(n_docs, chunk_size)):
+        chunk.to_csv(path, mode='w' if i == 0 else 'a', header=(i == 0), index=False)
+    return path
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate a deterministic synthetic Reddit-like corpus.")
+    parser.add_argument("output", help="Output CSV path.")
+    parser.add_argument("--docs", type=int, default=10000, help="Number of posts.")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--chunk-size", type=int, default=50000)
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    generate_corpus(args.output, args.docs, args.seed, args.chunk_size)
+    elapsed = time.perf_counter() - start
+    print(f"✅ Wrote {args.docs:,} posts to {args.output} in {elapsed:.1f}s "
+          f"({os.path.getsize(args.output) / 1e6:.1f} MB)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,119 @@
+import os
+import re
+from concurrent.futures import ProcessPoolExecutor
+
+# --- Compiled patterns (built once at import) ---
+URL_PATTERN = re.compile(r'http\S+|www\S+|https\S+', flags=re.MULTILINE)
+USER_PATTERN = re.compile(r'u/\S+')
+SUBREDDIT_PATTERN = re.compile(r'r/\S+')
+NON_ALPHA_PATTERN = re.compile(r'[^a-zA-Z\s]')
+
+# List of negations to KEEP (Critical for SI detection: "I do NOT want to live")
+NEGATIONS = frozenset({'no', 'not', 'nor', 'neither', 'never', "don't", "won't", "can't", "cannot"})
+
+# NLTK's English stopword list, bundled so startup never imports nltk or hits nltk.download
+STOP_WORDS_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'resources', 'stopwords_english.txt')
+
+
+def _load_stop_words():
+    """Standard English stopwords from the bundled list (NLTK corpus as a fallback)"""
+    if os.path.exists(STOP_WORDS_PATH):
+        with open(STOP_WORDS_PATH, 'r', encoding='utf-8') as f:
+            return frozenset(line.strip() for line in f if line.strip())
+
+    import nltk
+    from nltk.corpus import stopwords
+    try:
+        words = stopwords.words('english')
+    except LookupError:
+        nltk.download('stopwords', quiet=True)
+        words = stopwords.words('english')
+    return frozenset(words)
+
+
+# Final stopword list = Standard - Negations
+STOP_WORDS = _load_stop_words() - NEGATIONS
+
+
+def _remove_stop_words(text):
+    return " ".join(w for w in text.split() if w not in STOP_WORDS)
+
+
+def preprocess_text(text):
+    """
+    Preprocessing pipeline shared by training and serving:
+    - Lowercasing
+    - URL removal
+    - Reddit user/subreddit mentions replaced with placeholders
+    - Special characters/numbers removed
+    - Stopword removal with negation preservation (clinical priority)
+    """
+    if not isinstance(text, str):
+        return ""
+
+    text = text.lower()
+    text = URL_PATTERN.sub('', text)
+    text = USER_PATTERN.sub('USER', text)
+    text = SUBREDDIT_PATTERN.sub('SUBREDDIT', text)
+    text = NON_ALPHA_PATTERN.sub('', text)
+
+    return _remove_stop_words(text)
+
+
+def preprocess_batch(texts):
+    """
+    Apply preprocess_text to many texts at once.
+    A pandas Series is cleaned column-wise with the .str accessor and returned
+    as a Series with the same index; any other iterable returns a list.
+    Output is identical to calling preprocess_text on each element.
+    """
+    try:
+        import pandas as pd
+    except ImportError:
+        pd = None
+
+    if pd is not None and isinstance(texts, pd.Series):
+        # Non-string values become NaN under .str and map to "" like preprocess_text
+        is_str = texts.map(lambda t: isinstance(t, str))
+        s = texts.where(is_str, '').astype(str).str.lower()
+        s = s.str.replace(URL_PATTERN, '', regex=True)
+        s = s.str.replace(USER_PATTERN, 'USER', regex=True)
+        s = s.str.replace(SUBREDDIT_PATTERN, 'SUBREDDIT', regex=True)
+        s = s.str.replace(NON_ALPHA_PATTERN, '', regex=True)
+        return s.map(_remove_stop_words)
+
+    return [preprocess_text(t) for t in texts]
+
+
+DEFAULT_PREPROCESS_CHUNK_SIZE = 20000
+# Below this many rows per worker, process start-up costs more than it saves
+MIN_PARALLEL_CHUNK_SIZE = 1000
+
+
+def preprocess_parallel(texts, n_jobs=None, chunk_size=DEFAULT_PREPROCESS_CHUNK_SIZE):
+    """
+    preprocess_batch spread over a process pool.
+    The input is split into contiguous chunks that are cleaned in worker
+    processes and reassembled in their original order, so the result
+    (Series with the same index, or list) matches preprocess_batch exactly.
+    n_jobs=None uses every core; n_jobs=1 or a single chunk runs in-process.
+    """
+    n_jobs = n_jobs or os.cpu_count() or 1
+    n = len(texts)
+    # At least one chunk per worker, each between MIN_PARALLEL_CHUNK_SIZE and chunk_size rows
+    chunk_size = max(MIN_PARALLEL_CHUNK_SIZE, min(chunk_size, -(-n // n_jobs)))
+    if n_jobs == 1 or n <= chunk_size:
+        return preprocess_batch(texts)
+
+    is_series = hasattr(texts, 'iloc')
+    chunks = [texts.iloc[i:i + chunk_size] if is_series else list(texts[i:i + chunk_size])
+              for i in range(0, n, chunk_size)]
+
+    with ProcessPoolExecutor(max_workers=n_jobs) as executor:
+        # map() yields results in submission order, preserving row order
+        cleaned = list(executor.map(preprocess_batch, chunks))
+
+    if is_series:
+        import pandas as pd
+        return pd.concat(cleaned)
+    return [t for chunk in cleaned for t in chunk]
@@ -2,15 +2,132 @@ import pandas as pd
 import numpy as np
 import pickle
 import os
+import time
+import argparse
 from sklearn.feature_extraction.text import TfidfVectorizer
 from sklearn.linear_model import LogisticRegression
+from sklearn.metrics import f1_score
+from sklearn.model_selection import train_test_split
+
+from model_assets import load_artifact
+from feature_store import load_features, is_feature_store, DEFAULT_STORE_PATH, LEGACY_PICKLE_PATH
+import profiling
+
+# Largest macro-F1 drop (vs. a cold fit) accepted before an incremental model is deployed
+DEFAULT_TOLERANCE = 0.005
+# Share of rows held out (stratified) to score the warm and cold fits on
+DEFAULT_HOLDOUT = 0.2
+
+
+def build_model(**overrides):
+    """Logistic Regression with the project's deployed parameters"""
+    params = dict(max_iter=1000, class_weight='balanced', random_state=42)
+    params.update(overrides)
+    return LogisticRegression(**params)
+
+
+def align_coefficients(base_model, feature_names, n_features):
+    """
+    Map the deployed model's coefficients onto the current feature columns.
+    Models saved by this script carry feature_names_ and are aligned by term
+    (terms new to the vocabulary start at 0); older models are only reused
+    when their width matches. Returns (coef, intercept) or None.
+    """
+    base_names = getattr(base_model, 'feature_names_', None)
+    if base_names is not None and feature_names is not None:
+        column = {term: i for i, term in enumerate(base_names)}
+        coef = np.zeros((base_model.coef_.shape[0], n_features))
+        for j, term in enumerate(feature_names):
+            i = column.get(term)
+            if i is not None:
+                coef[:, j] = base_model.coef_[:, i]
+        return coef, base_model.intercept_.copy()
+
+    if base_model.coef_.shape[1] == n_features:
+        return base_model.coef_.copy(), base_model.intercept_.copy()
+    return None
+
+
+def warm_start_fit(X, y, base_model, feature_names=None):
+    """
+    Fit starting from base_model's coefficients; lbfgs then only iterates
+    until the updated data converges. Falls back to a cold fit when the
+    classes or features cannot be matched.
+    """
+    model = build_model(warm_start=True)
+    classes = np.unique(y)
+    aligned = align_coefficients(base_model, feature_names, X.shape[1])
+
+    if aligned is None or list(base_model.classes_) != list(classes):
+        print("⚠️ Deployed model does not match the current features/classes. Fitting from scratch.")
+    else:
+        model.coef_, model.intercept_ = aligned
+    model.fit(X, y)
+    return model
+
+
+def holdout_split(y, fraction=DEFAULT_HOLDOUT, seed=42):
+    """Stratified (train_rows, heldout_rows) indices for the warm vs. cold comparison"""
+    return train_test_split(np.arange(len(y)), test_size=fraction, stratify=y, random_state=seed)
+
+
+def timed_fit(fit):
+    start = time.perf_counter()
+    model = fit()
+    return model, time.perf_counter() - start
+
+
+def compare_fits(X, y, warm_model, warm_seconds, cold_model, cold_seconds):
+    """
+    Time saved and metric drift of the warm-started model vs. the cold fit.
+    X, y must be held-out rows that neither model was fitted on.
+    """
+    warm_pred = warm_model.predict(X)
+    cold_pred = cold_model.predict(X)
+    warm_f1 = f1_score(y, warm_pred, average='macro')
+    cold_f1 = f1_score(y, cold_pred, average='macro')
+    return {
+        'warm_seconds': warm_seconds,
+        'cold_seconds': cold_seconds,
+        'seconds_saved': cold_seconds - warm_seconds,
+        'warm_iterations': int(np.max(warm_model.n_iter_)),
+        'cold_iterations': int(np.max(cold_model.n_iter_)),
+        'warm_macro_f1': warm_f1,
+        'cold_macro_f1': cold_f1,
+        'macro_f1_drop': cold_f1 - warm_f1,
+        'prediction_agreement': float(np.mean(warm_pred == cold_pred)),
+        'max_coef_diff': float(np.max(np.abs(warm_model.coef_ - cold_model.coef_))),
+    }
+
+
+def print_comparison(report, tolerance):
+    print("---")
+    print(f"⏱️ Warm start: {report['warm_seconds']:.2f}s ({report['warm_iterations']} iterations)")
+    print(f"⏱️ Cold fit:   {report['cold_seconds']:.2f}s ({report['cold_iterations']} iterations)")
+    print(f"   Time saved: {report['seconds_saved']:.2f}s")
+    print(f"📊 Macro-F1 warm {report['warm_macro_f1']:.4f} vs cold {report['cold_macro_f1']:.4f} "
+          f"(drop {report['macro_f1_drop']:+.4f}, tolerance {tolerance})")
+    print(f"   Prediction agreement: {report['prediction_agreement']:.2%}, "
+          f"max coefficient difference {report['max_coef_diff']:.2e}")
+
 
 def main():
+    parser = argparse.ArgumentParser(description="Train and deploy the Logistic Regression model.")
+    parser.add_argument("--incremental", action="store_true",
+                        help="Warm-start from the deployed models/lr_model.pkl instead of fitting from scratch.")
+    parser.add_argument("--skip-cold-check", action="store_true",
+                        help="With --incremental, skip the reference cold fit (no time/metric comparison).")
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE,
+                        help="Max held-out macro-F1 drop vs. the cold fit before refusing to deploy.")
+    parser.add_argument("--holdout", type=float, default=DEFAULT_HOLDOUT,
+                        help="Fraction of rows held out to compare the warm and cold fits.")
+    args = parser.parse_args()
+
     print("⏳ Loading processed data...")
     # 1. Load your clean data (We need the dataframe you used in vectorize_data.py)
     # Since you haven't shared how you load 'train', 'val', 'test', we will recreate
     # the vectorizer and model on the FULL dataset for the best possible demo.
-    
+
     # Path to your data (Adjust if your CSV is named differently)
     # Using the same path logic as your vectorize_data.py
     try:
@@ -21,39 +138,74 @@ def main():
         pass
 
     # --- THE SHORTCUT ---
-    # Since you already ran vectorize_data.py, you have 'data/processed/features_tfidf.pkl'
+    # Since you already ran vectorize_data.py, you have 'data/processed/features_tfidf/'
     # This file contains X (features) and y (labels). We can just load it and train!
-    
-    features_path = 'data/processed/features_tfidf.pkl'
+
+    # The split feature store is memory-mapped; the old pickle is still accepted
+    features_path = DEFAULT_STORE_PATH if is_feature_store(DEFAULT_STORE_PATH) else LEGACY_PICKLE_PATH
     if not os.path.exists(features_path):
         print(f"❌ Error: {features_path} not found. Run 'src/vectorize_data.py' first.")
         return
 
     print(f"📂 Loading features from {features_path}...")
-    with open(features_path, 'rb') as f:
-        data = pickle.load(f)
-    
+    data = load_features(features_path)
+
     X = data['X']
     y = data['y']
-    
+    feature_names = data.get('feature_names')
+
+    output_dir = 'models'
+    model_path = os.path.join(output_dir, 'lr_model.pkl')
+
     # 2. Train the Model (Your exact parameters)
-    print("🧠 Training Logistic Regression...")
-    model = LogisticRegression(
-        max_iter=1000,
-        class_weight='balanced',
-        random_state=42
-    )
-    model.fit(X, y)
+    if args.incremental and os.path.exists(model_path):
+        print(f"🔁 Warm-starting Logistic Regression from {model_path}...")
+        base_model = load_artifact(model_path)
+        if args.skip_cold_check:
+            with profiling.stage('train_deploy.fit_warm', items=X.shape[0]):
+                model, warm_seconds = timed_fit(lambda: warm_start_fit(X, y, base_model, feature_names))
+        else:
+            # Both fits see the same training rows and are scored on rows neither saw
+            train_rows, heldout_rows = holdout_split(y, args.holdout)
+            X_train, y_train = X[train_rows], y[train_rows]
+            print(f"   Comparing on {len(heldout_rows):,} held-out rows ({len(train_rows):,} for fitting)")
+            with profiling.stage('train_deploy.fit_warm', items=len(train_rows)):
+                model, warm_seconds = timed_fit(
+                    lambda: warm_start_fit(X_train, y_train, base_model, feature_names))
+
+            print("🧊 Fitting from scratch for comparison...")
+            with profiling.stage('train_deploy.fit_cold', items=len(train_rows)):
+                cold_model, cold_seconds = timed_fit(lambda: build_model().fit(X_train, y_train))
+            report = compare_fits(X[heldout_rows], y[heldout_rows], model, warm_seconds, cold_model, cold_seconds)
+            print_comparison(report, args.tolerance)
+            if report['macro_f1_drop'] > args.tolerance:
+                print("❌ Warm-started model is outside tolerance. Deploying the cold fit instead.")
+                model = cold_model
+
+            # Deploy a model fitted on every row; starting from the chosen fit keeps this cheap
+            print("🔁 Refitting the chosen model on all rows...")
+            with profiling.stage('train_deploy.fit_final', items=X.shape[0]):
+                model = warm_start_fit(X, y, model, feature_names)
+    else:
+        if args.incremental:
+            print(f"⚠️ {model_path} not found. Fitting from scratch.")
+        print("🧠 Training Logistic Regression...")
+        model = build_model()
+        with profiling.stage('train_deploy.fit', items=X.shape[0]):
+            model.fit(X, y)
     print("✅ Model trained successfully.")
 
+    # Remember the column terms so the next incremental run can align coefficients.
+    # A plain list of str pickles far smaller than a fixed-width numpy string array.
+    if feature_names is not None:
+        model.feature_names_ = list(map(str, feature_names))
+
     # 3. Save the Model (Crucial Step for App)
-    output_dir = 'models'
     os.makedirs(output_dir, exist_ok=True)
-    
-    model_path = os.path.join(output_dir, 'lr_model.pkl')
+
     with open(model_path, 'wb') as f:
         pickle.dump(model, f)
-    
+
     print(f"💾 Saved model to: {model_path}")
     print("---")
     print("👉 Now you can run 'streamlit run src/app/app.py'")
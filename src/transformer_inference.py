@@ -0,0 +1,183 @@
+import time
+import argparse
+
+import numpy as np
+
+DEFAULT_MAX_LENGTH = 128
+DEFAULT_BATCH_SIZE = 16
+# Share of the token budget kept from the start of a long post; the rest
+# comes from its end, where posts often state intent most directly
+DEFAULT_HEAD_FRACTION = 0.25
+
+# Label orders used when fine-tuning DistilBERT in notebooks/SID.ipynb
+MULTICLASS_LABELS = ['HUMOR', 'MH', 'NEU', 'SI']
+BINARY_LABELS = ['SAFE', 'SI']
+
+
+def _default_labels(config, num_labels):
+    """Class names from the model config, falling back to the notebook's label maps"""
+    id2label = getattr(config, 'id2label', None) or {}
+    names = [id2label.get(i) for i in range(num_labels)]
+    if all(names) and not all(str(n).startswith('LABEL_') for n in names):
+        return [str(n) for n in names]
+    if num_labels == len(MULTICLASS_LABELS):
+        return list(MULTICLASS_LABELS)
+    if num_labels == len(BINARY_LABELS):
+        return list(BINARY_LABELS)
+    return [f'LABEL_{i}' for i in range(num_labels)]
+
+
+def head_tail_truncate(ids, budget, head_fraction=DEFAULT_HEAD_FRACTION):
+    """Keep the first head_fraction of the budget and fill the rest from the end"""
+    if len(ids) <= budget:
+        return ids
+    head = int(budget * head_fraction)
+    tail = budget - head
+    return ids[:head] + (ids[-tail:] if tail else [])
+
+
+def length_batches(lengths, batch_size):
+    """
+    Group indices into batches of similar length (sorted by length), so each
+    batch is padded only to its own longest sequence.
+    """
+    order = np.argsort(lengths, kind='stable')
+    return [order[i:i + batch_size] for i in range(0, len(order), batch_size)]
+
+
+def padding_efficiency(lengths, batch_size, max_length=None, bucketed=True):
+    """Real tokens / padded tokens for a batching strategy (1.0 means no padding waste)"""
+    lengths = np.asarray(lengths)
+    if len(lengths) == 0:
+        return 1.0
+    if not bucketed:
+        padded = len(lengths) * max_length
+    else:
+        padded = sum(len(b) * lengths[b].max() for b in length_batches(lengths, batch_size))
+    return float(lengths.sum()) / padded
+
+
+class TransformerClassifier:
+    """
+    CPU inference wrapper around a fine-tuned AutoModelForSequenceClassification.
+    Inputs are tokenized once, truncated head+tail, bucketed by length and
+    dynamically padded per batch. torch/transformers are imported on
+    construction, so modules that only reference this class stay cheap.
+    """
+
+    def __init__(self, model_dir, max_length=DEFAULT_MAX_LENGTH, batch_size=DEFAULT_BATCH_SIZE,
+                 device='cpu', labels=None, num_threads=None, head_fraction=DEFAULT_HEAD_FRACTION):
+        import torch
+        from transformers import AutoTokenizer, AutoModelForSequenceClassification
+
+        if num_threads:
+            torch.set_num_threads(num_threads)
+
+        self.torch = torch
+        self.tokenizer = AutoTokenizer.from_pretrained(model_dir)
+        self.model = AutoModelForSequenceClassification.from_pretrained(model_dir)
+        self.model.to(device)
+        self.model.eval()
+        self.device = device
+        self.max_length = max_length
+        self.batch_size = batch_size
+        self.head_fraction = head_fraction
+        self.classes_ = list(labels) if labels else _default_labels(self.model.config, self.model.config.num_labels)
+
+    def encode(self, texts):
+        """Token ids (with special tokens) per text, truncated head+tail to max_length"""
+        texts = ["" if not isinstance(t, str) else t for t in texts]
+        budget = self.max_length - self.tokenizer.num_special_tokens_to_add(pair=False)
+        raw = self.tokenizer(texts, add_special_tokens=False, truncation=False)['input_ids']
+        return [
+            self.tokenizer.build_inputs_with_special_tokens(head_tail_truncate(ids, budget, self.head_fraction))
+            for ids in raw
+        ]
+
+    def _forward(self, batch_ids, pad_to=None):
+        torch = self.torch
+        padding = 'max_length' if pad_to else True
+        inputs = self.tokenizer.pad({'input_ids': batch_ids}, padding=padding, max_length=pad_to,
+                                    return_tensors='pt')
+        inputs = {k: v.to(self.device) for k, v in inputs.items()}
+        logits = self.model(**inputs).logits
+        return torch.softmax(logits, dim=-1).cpu().numpy()
+
+    def predict_proba(self, texts):
+        """Softmax probabilities for raw texts, in input order"""
+        encoded = self.encode(texts)
+        out = np.zeros((len(encoded), len(self.classes_)), dtype=np.float64)
+        lengths = [len(ids) for ids in encoded]
+        with self.torch.inference_mode():
+            for batch in length_batches(lengths, self.batch_size):
+                out[batch] = self._forward([encoded[i] for i in batch])
+        return out
+
+    def predict_proba_naive(self, texts):
+        """Baseline for benchmarking: input order, every batch padded to max_length"""
+        encoded = self.encode(texts)
+        out = np.zeros((len(encoded), len(self.classes_)), dtype=np.float64)
+        with self.torch.inference_mode():
+            for start in range(0, len(encoded), self.batch_size):
+                batch = encoded[start:start + self.batch_size]
+                out[start:start + len(batch)] = self._forward(batch, pad_to=self.max_length)
+        return out
+
+    def predict(self, texts):
+        probs = self.predict_proba(texts)
+        return [self.classes_[i] for i in np.argmax(probs, axis=1)]
+
+
+def benchmark(classifier, texts, repeats=1):
+    """Throughput of bucketed/dynamic padding versus naive fixed-length batching"""
+    lengths = [len(ids) for ids in classifier.encode(texts)]
+    results = {}
+    for name, fn in (('naive_fixed_length', classifier.predict_proba_naive),
+                     ('bucketed_dynamic', classifier.predict_proba)):
+        fn(texts[:classifier.batch_size])  # warm-up
+        start = time.perf_counter()
+        for _ in range(repeats):
+            probs = fn(texts)
+        elapsed = (time.perf_counter() - start) / repeats
+        results[name] = {'seconds': elapsed, 'posts_per_second': len(texts) / elapsed, 'probs': probs}
+
+    results['naive_fixed_length']['padding_efficiency'] = padding_efficiency(
+        lengths, classifier.batch_size, classifier.max_length, bucketed=False)
+    results['bucketed_dynamic']['padding_efficiency'] = padding_efficiency(
+        lengths, classifier.batch_size, bucketed=True)
+    results['max_abs_diff'] = float(np.max(np.abs(
+        results['naive_fixed_length']['probs'] - results['bucketed_dynamic']['probs'])))
+    return results
+
+
+def main():
+    import pandas as pd
+
+    parser = argparse.ArgumentParser(description="Benchmark CPU transformer inference strategies.")
+    parser.add_argument("--model-dir", required=True, help="Directory of the fine-tuned DistilBERT model.")
+    parser.add_argument("--input", required=True, help="CSV with the texts to score.")
+    parser.add_argument("--text-column", default="combined_text")
+    parser.add_argument("--limit", type=int, default=1000, help="Number of posts to benchmark on.")
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE)
+    parser.add_argument("--max-length", type=int, default=DEFAULT_MAX_LENGTH)
+    parser.add_argument("--threads", type=int, default=None, help="torch intra-op threads.")
+    parser.add_argument("--head-fraction", type=float, default=DEFAULT_HEAD_FRACTION)
+    args = parser.parse_args()
+
+    texts = pd.read_csv(args.input, nrows=args.limit)[args.text_column].fillna('').astype(str).tolist()
+    classifier = TransformerClassifier(args.model_dir, max_length=args.max_length, batch_size=args.batch_size,
+                                       num_threads=args.threads, head_fraction=args.head_fraction)
+    print(f"⏳ Benchmarking {len(texts):,} posts (batch {args.batch_size}, max_length {args.max_length}, "
+          f"{classifier.torch.get_num_threads()} threads)...")
+
+    results = benchmark(classifier, texts)
+    for name in ('naive_fixed_length', 'bucketed_dynamic'):
+        r = results[name]
+        print(f"   {name:<20} {r['posts_per_second']:8.1f} posts/s  "
+              f"({r['seconds']:.2f}s, padding efficiency {r['padding_efficiency']:.0%})")
+    speedup = results['bucketed_dynamic']['posts_per_second'] / results['naive_fixed_length']['posts_per_second']
+    print(f"🚀 Speedup: {speedup:.2f}x (max prob difference {results['max_abs_diff']:.2e})")
+
+
+if __name__ == "__main__":
+    main()